@@ -0,0 +1,169 @@
+import os
+import sqlite3
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+
+from service_guard import get_guard
+
+DEFAULT_PATH = os.getenv("ARTICLE_MIRROR_PATH", ".cache/articles.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    link TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_ts ON articles (ts);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _to_ts(value) -> float:
+    # 기존 스크립트와 동일하게 timezone 없는 시각은 UTC로 취급
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _to_iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+class ArticleMirror:
+    """Supabase articles 테이블의 로컬 SQLite 미러.
+
+    sync()는 마지막으로 받은 created_at(watermark) 이후의 행만 가져오고,
+    recent()는 임의의 기간을 로컬 인덱스 범위 조회로 돌려줍니다.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, retention_days: int = 45):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.retention_days = retention_days
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _pull(self, supabase, start: str, page_size: int) -> int:
+        """created_at >= start 인 행을 (created_at, 같은 시각 내 offset) keyset으로 모두 받아 upsert"""
+        offset = 0
+        total = 0
+        while True:
+            query = (
+                supabase.table("articles")
+                .select("title, link, created_at")
+                .gte("created_at", start)
+                .order("created_at")
+                .order("link")  # 같은 시각 내 순서를 고정해야 offset이 안정적
+                .range(offset, offset + page_size - 1)
+            )
+            rows = get_guard("supabase").call(query.execute).data or []
+            if not rows:
+                return total
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO articles (link, title, created_at, ts) VALUES (?, ?, ?, ?)",
+                [(r["link"], r["title"], r["created_at"], _to_ts(r["created_at"])) for r in rows],
+            )
+            total += len(rows)
+            last = rows[-1]["created_at"]
+            same = sum(1 for r in rows if r["created_at"] == last)
+            if last == start:
+                # 같은 시각의 행이 한 페이지를 넘는 경우
+                offset += len(rows)
+            else:
+                start = last
+                offset = same
+
+    def sync(self, supabase, since, page_size: int = 1000, overlap_minutes: int = 10) -> int:
+        """since 이후 구간이 로컬에 모두 있도록 증분 동기화하고 새로 받은 행 수를 반환"""
+        since_ts = _to_ts(since)
+        synced_from = self._meta("synced_from")
+        watermark = self._meta("watermark")
+
+        if synced_from is None or since_ts < float(synced_from):
+            # 처음이거나 더 긴 기간을 요청받은 경우 since부터 다시 채움 (upsert라 중복 무해)
+            start_ts = since_ts
+        elif watermark is not None:
+            # 커밋 지연으로 늦게 보이는 행을 위해 watermark보다 조금 앞에서 시작
+            start_ts = float(watermark) - overlap_minutes * 60
+        else:
+            start_ts = since_ts
+
+        pulled = self._pull(supabase, _to_iso(start_ts), page_size)
+
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).timestamp()
+        self.conn.execute("DELETE FROM articles WHERE ts < ?", (cutoff,))
+        max_ts = self.conn.execute("SELECT max(ts) FROM articles").fetchone()[0]
+        if max_ts is not None:
+            self._set_meta("watermark", max(max_ts, float(watermark or 0)))
+        new_from = since_ts if synced_from is None else min(since_ts, float(synced_from))
+        self._set_meta("synced_from", max(new_from, cutoff))
+        self.conn.commit()
+        return pulled
+
+    def recent(self, since):
+        """since 이후 기사(title, link)를 created_at 순으로 조회"""
+        rows = self.conn.execute(
+            "SELECT title, link FROM articles WHERE ts >= ? ORDER BY ts",
+            (_to_ts(since),),
+        ).fetchall()
+        return [{"title": title, "link": link} for title, link in rows]
+
+    def between(self, start, end):
+        """start 이상 end 미만 기사(title, link)를 created_at 순으로 조회"""
+        rows = self.conn.execute(
+            "SELECT title, link FROM articles WHERE ts >= ? AND ts < ? ORDER BY ts",
+            (_to_ts(start), _to_ts(end)),
+        ).fetchall()
+        return [{"title": title, "link": link} for title, link in rows]
+
+    def snapshot(self, since):
+        """since 이후 기사를 메모리로 읽어 여러 보고서가 나눠 쓰는 ArticleSnapshot으로 반환"""
+        rows = self.conn.execute(
+            "SELECT ts, title, link FROM articles WHERE ts >= ? ORDER BY ts",
+            (_to_ts(since),),
+        ).fetchall()
+        return ArticleSnapshot(rows)
+
+    def close(self):
+        self.conn.close()
+
+
+class ArticleSnapshot:
+    """ArticleMirror에서 한 번 읽은 구간을 메모리에 둔 읽기 전용 미러.
+
+    ArticleMirror와 같은 recent()/between()을 제공하고 sync()/close()는 아무것도 하지 않으므로,
+    여러 보고서를 한 프로세스에서 실행할 때 기사 조회를 한 번으로 줄이는 데 씁니다.
+    여러 스레드에서 동시에 읽어도 됩니다.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.ts = [row[0] for row in rows]
+
+    def sync(self, supabase, since, **kwargs) -> int:
+        return 0
+
+    def recent(self, since):
+        return self.between(since, None)
+
+    def between(self, start, end):
+        lo = bisect_left(self.ts, _to_ts(start))
+        hi = len(self.ts) if end is None else bisect_left(self.ts, _to_ts(end))
+        return [{"title": title, "link": link} for _, title, link in self.rows[lo:hi]]
+
+    def close(self):
+        pass
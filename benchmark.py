@@ -0,0 +1,612 @@
+"""운영 서비스 없이 일간/주간/월간 파이프라인 전체를 측정하는 벤치마크.
+
+Supabase(PostgREST), OpenAI Responses, Notion API는 지연 시간을 흉내 내는 로컬 대역으로,
+SMTP는 localhost에서 실제 소켓으로 메일을 받는 싱크 서버로 바꿔 끼우고
+합성 데이터(기본: 기사 5만 건, 구독자 10만 명)로 각 스크립트의 main()을 실행합니다.
+단계별 지연/처리량을 JSON으로 출력하므로 결과 파일을 쌓아 회귀를 추적할 수 있습니다.
+
+한계: Supabase/OpenAI/Notion 대역은 HTTP 서버가 아니라 SDK 클라이언트 자리에 끼우는 프로세스 내 객체라서
+SDK의 요청 직렬화/응답 파싱, httpx 연결 풀, TLS 비용은 측정에 들어가지 않습니다 (지연은 sleep으로만 흉내 냄).
+실제 HTTP 경로까지 보려면 cassette.py로 녹화한 실행을 재생하세요.
+--memory를 주면 tracemalloc으로 최대 할당량도 기록하지만, 할당마다 추적 비용이 붙어 같은 실행의
+시간 값이 느려지므로 시간 비교용 결과와는 따로 실행하세요.
+
+    python benchmark.py --flows daily weekly --articles 5000 --subscribers 2000 --output bench.json
+    python benchmark.py --flows weekly --articles 5000 --subscribers 2000 --memory
+"""
+import argparse
+import bisect
+import contextlib
+import importlib
+import json
+import os
+import platform
+import random
+import re
+import resource
+import smtplib
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+FLOWS = {
+    "daily": "daily_trend_report",
+    "weekly": "main",
+    "monthly": "monthly_trend_report",
+}
+
+_WORDS = (
+    "OpenAI", "Google", "Microsoft", "Meta", "Anthropic", "NVIDIA", "삼성", "네이버", "카카오", "LG",
+    "모델", "GPU", "에이전트", "로봇", "규제", "투자", "반도체", "데이터센터", "오픈소스", "멀티모달",
+    "launches", "raises", "announces", "agent", "benchmark", "chip", "policy", "funding", "reasoning", "video",
+)
+
+
+class FakeHTTPError(Exception):
+    """대역 서비스가 내는 HTTP 오류 (SDK 예외처럼 status/headers를 가짐)"""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+
+
+class Faults:
+    """rate 비율의 호출을 일시적 오류(503)로 실패시킴 (재시도 경로 측정용)"""
+
+    def __init__(self, rate, seed=7):
+        self.rate = rate
+        self.injected = 0
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def maybe_fail(self):
+        if not self.rate:
+            return
+        with self._lock:
+            fail = self._rnd.random() < self.rate
+            self.injected += fail
+        if fail:
+            raise FakeHTTPError(503)
+
+
+# --- Supabase(PostgREST) 대역 ---------------------------------------------------
+
+class _Query:
+    def __init__(self, table, latency, faults):
+        self.table = table
+        self.latency = latency
+        self.faults = faults
+        self.filters = []
+        self.orders = []
+        self.offset = 0
+        self.count = None
+
+    def select(self, columns):
+        self.columns = [c.strip() for c in columns.split(",")]
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, "eq", value))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append((column, "gt", value))
+        return self
+
+    def gte(self, column, value):
+        self.filters.append((column, "gte", value))
+        return self
+
+    def lt(self, column, value):
+        self.filters.append((column, "lt", value))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append(column)
+        return self
+
+    def range(self, start, end):
+        self.offset, self.count = start, end - start + 1
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def execute(self):
+        time.sleep(self.latency)
+        self.faults.maybe_fail()
+        rows, start = self.table.scan(self.orders, self.filters)
+        data = []
+        skip = self.offset
+        for row in rows[start:] if start else rows:
+            if not all(_match(row[c], op, v) for c, op, v in self.filters):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            data.append({c: row[c] for c in self.columns})
+            if self.count is not None and len(data) >= self.count:
+                break
+        self.table.requests += 1
+        return SimpleNamespace(data=data)
+
+
+def _match(actual, op, value):
+    if op == "eq":
+        return actual == value
+    if op == "gt":
+        return actual > value
+    if op == "gte":
+        return actual >= value
+    return actual < value
+
+
+class FakeTable:
+    """sort_keys 순으로 정렬해 두고, 같은 순서로 조회하면 첫 범위 조건을 이진 탐색해 페이지 단위로 읽는 테이블"""
+
+    def __init__(self, rows, sort_keys):
+        self.sort_keys = list(sort_keys)
+        self.rows = sorted(rows, key=lambda r: tuple(r[k] for k in self.sort_keys))
+        self._first = [r[self.sort_keys[0]] for r in self.rows]
+        self.requests = 0
+
+    def scan(self, orders, filters):
+        if orders and orders != self.sort_keys[:len(orders)]:
+            key = lambda r: tuple(r[k] for k in orders)  # noqa: E731
+            return sorted(self.rows, key=key), 0
+        for column, op, value in filters:
+            if column == self.sort_keys[0] and op in ("gt", "gte"):
+                find = bisect.bisect_right if op == "gt" else bisect.bisect_left
+                return self.rows, find(self._first, value)
+        return self.rows, 0
+
+
+class FakeSupabase:
+    def __init__(self, tables, latency, faults):
+        self.tables = tables
+        self.latency = latency
+        self.faults = faults
+
+    def table(self, name):
+        return _Query(self.tables[name], self.latency, self.faults)
+
+    @property
+    def requests(self):
+        return sum(t.requests for t in self.tables.values())
+
+
+# --- OpenAI Responses 대역 -------------------------------------------------------
+
+class _Responses:
+    def __init__(self, ttft, per_delta):
+        self.ttft = ttft
+        self.per_delta = per_delta
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, stream=False, **request):
+        with self._lock:
+            self.calls += 1
+        text = _fake_report(request)
+        prompt_bytes = sum(len(m["content"].encode("utf-8")) for m in request["input"])
+        usage = SimpleNamespace(input_tokens=prompt_bytes // 3, output_tokens=len(text.encode("utf-8")) // 3)
+        response = SimpleNamespace(output_text=text, output=[], usage=usage)
+        time.sleep(self.ttft)
+        if not stream:
+            time.sleep(self.per_delta * (len(text) // 40 + 1))
+            return response
+        return self._events(text, response)
+
+    def _events(self, text, response):
+        for i in range(0, len(text), 40):
+            time.sleep(self.per_delta)
+            yield SimpleNamespace(type="response.output_text.delta", delta=text[i:i + 40])
+        yield SimpleNamespace(type="response.completed", response=response)
+
+
+class FakeOpenAI:
+    def __init__(self, ttft, per_delta):
+        self.responses = _Responses(ttft, per_delta)
+
+
+def _fake_report(request):
+    prompt = request["input"][-1]["content"]
+    ids = sorted(set(re.findall(r"\b(a\d+)\b", prompt)))[:40] or ["a1"]
+    rnd = random.Random(len(prompt))
+    link = lambda: f"[{rnd.choice(_WORDS)}]({rnd.choice(ids)})"  # noqa: E731
+    if "기사 ID 목록의 일부" in prompt:
+        # 월간 map 단계 부분 요약 요청
+        return "\n".join(f"- {link()} 관련 {rnd.choice(_WORDS)} 소식 요약" for _ in range(15))
+    lines = ["# AI 트렌드 분석 보고서", "", "이번 기간 주요 흐름을 정리했습니다.", "", "---", "## 주요 트렌드"]
+    for n in range(1, 5):
+        lines.append(f"### {n}. {rnd.choice(_WORDS)}와 {rnd.choice(_WORDS)}")
+        lines += [f"- **{link()}** 관련 발표가 이어지며 *{rnd.choice(_WORDS)}* 경쟁이 심화" for _ in range(4)]
+    for section in ("주요 기업 동향", "기술 트렌드"):
+        lines += ["", "---", f"## {section}"]
+        lines += [f"- {link()}가 {rnd.choice(_WORDS)} 관련 계획을 공개" for _ in range(5)]
+    lines += ["", "---", "## 마무리 인사이트", "전반적으로 " + ", ".join(rnd.choice(_WORDS) for _ in range(12)) + " 흐름이 이어졌습니다."]
+    return "\n".join(lines)
+
+
+# --- Notion API 대역 -------------------------------------------------------------
+
+class FakeNotion:
+    """호출마다 지연을 주고 Notion API 한도(children 100개, rich_text 2000자/100개)를 검사"""
+
+    def __init__(self, latency, faults):
+        self.latency = latency
+        self.faults = faults
+        self.calls = 0
+        self.block_count = 0
+        self._lock = threading.Lock()
+        self.pages = SimpleNamespace(create=self._create, update=self._update)
+        self.blocks = SimpleNamespace(children=SimpleNamespace(append=self._append))
+
+    def _call(self, children=()):
+        time.sleep(self.latency)
+        self.faults.maybe_fail()
+        if len(children) > 100:
+            raise ValueError(f"children 한도 초과: {len(children)}")
+        for block in children:
+            items = block.get(block["type"], {}).get("rich_text", [])
+            if len(items) > 100 or any(len(i["text"]["content"]) > 2000 for i in items):
+                raise ValueError("rich_text 한도 초과")
+        with self._lock:
+            self.calls += 1
+            self.block_count += len(children)
+
+    def _create(self, parent, properties, children=()):
+        self._call(children)
+        return {"id": "page-1", "url": "https://www.notion.so/page-1"}
+
+    def _append(self, block_id, children):
+        self._call(children)
+        return {}
+
+    def _update(self, page_id, **kwargs):
+        self._call()
+        return {}
+
+
+# --- SMTP 싱크 -------------------------------------------------------------------
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        self.reply("220 bench-sink ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line[:4].upper()
+            if verb == b"EHLO":
+                self.wfile.write(b"250-bench-sink\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif verb == b"AUTH":
+                self.reply("235 ok")
+            elif verb == b"DATA":
+                self.reply("354 end with .")
+                size = 0
+                for data in iter(self.rfile.readline, b""):
+                    if data == b".\r\n":
+                        break
+                    size += len(data)
+                if not sink.enter():
+                    self.reply("450 4.2.1 too many concurrent messages")
+                    continue
+                try:
+                    time.sleep(sink.latency)
+                finally:
+                    sink.leave()
+                sink.record(size)
+                self.reply("250 queued")
+            elif verb == b"QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """localhost에서 메일을 받아 개수/바이트만 세는 SMTP 서버 (AUTH는 모두 허용).
+
+    limit이 있으면 동시에 처리 중인 메시지가 limit개를 넘을 때 450으로 거절합니다 (Gmail 속도 제한 흉내).
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency=0.0, limit=0):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.sink = self
+        self.latency = latency
+        self.limit = limit
+        self.active = 0
+        self.messages = 0
+        self.bytes = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def enter(self) -> bool:
+        with self._lock:
+            if self.limit and self.active >= self.limit:
+                self.throttled += 1
+                return False
+            self.active += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+
+    def record(self, size):
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+
+    def smtp(self, *args, **kwargs):
+        """smtplib.SMTP_SSL(host, port) 자리에 끼울 평문 연결"""
+        return smtplib.SMTP(*self.server_address, timeout=kwargs.get("timeout", 30))
+
+
+def _sink_pool(mailer, sink):
+    class SinkPool(mailer.SMTPPool):
+        def _connect(self):
+            smtp = sink.smtp(timeout=self.timeout)
+            smtp.login(self.user, self.password)
+            return mailer._Session(smtp)
+    return SinkPool
+
+
+# --- 합성 데이터 -----------------------------------------------------------------
+
+def synthetic_articles(count, days=31, seed=1):
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(count):
+        created = now - timedelta(seconds=rnd.uniform(0, days * 86400))
+        created = created.replace(microsecond=rnd.randint(1, 999999))
+        if i and rnd.random() < 0.15:
+            # 같은 소식을 여러 매체가 다룬 기사 (제목이 조금씩 다름)
+            title = rows[rnd.randrange(len(rows))]["title"] + " - 속보"
+        else:
+            title = " ".join(rnd.choice(_WORDS) for _ in range(8))
+        rows.append({
+            "title": title,
+            "link": f"https://news.example.com/{i}?utm_source=rss",
+            "created_at": created.isoformat(),
+        })
+    return rows
+
+
+def synthetic_subscribers(count):
+    return [
+        {"email": f"user{i:07d}@example.com", "token": f"tok{i:07d}", "subscribed": True}
+        for i in range(count)
+    ]
+
+
+# --- 실행 ------------------------------------------------------------------------
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    def wrap(self, name, fn):
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stage = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+                stage["seconds"] += time.perf_counter() - t0
+                stage["calls"] += 1
+        return timed
+
+
+def _configure(args, workdir, mirror_name):
+    os.environ.update({
+        "ARTICLE_MIRROR_PATH": os.path.join(workdir, f"{mirror_name}.sqlite3"),
+        "LLM_CACHE_DIR": os.path.join(workdir, "llm"),
+        "LLM_CACHE_BYPASS": "1",
+        "NOTION_STREAMING": "1" if args.streaming else "",
+        "SEND_WORKERS": str(args.send_workers),
+        "SEND_RATE_PER_SEC": "1000000",
+        "EMAIL_SENDER": "bench@example.com",
+        "EMAIL_PASSWORD": "x",
+        "EMAIL_RECIPIENT": "bench@example.com",
+        "IMPORT_BUDGET_MS": "0",
+        "CHECKPOINT_PATH": os.path.join(workdir, "checkpoints.sqlite3"),
+        "DIGEST_STORE_PATH": os.path.join(workdir, "digests.sqlite3"),
+        "ROLLUP_DIGESTS": "1" if args.rollup else "",
+        "TOPIC_DIGEST": "1" if args.topic_digest else "",
+    })
+
+
+def _services(args, tables):
+    import service_guard
+
+    # 서비스별 한도/차단기 상태를 실행마다 새로 시작
+    service_guard.get_guard.cache_clear()
+    faults = Faults(args.fault_rate)
+    return SimpleNamespace(
+        supabase=FakeSupabase(tables, args.postgrest_ms / 1000, faults),
+        openai=FakeOpenAI(args.openai_ttft_ms / 1000, args.openai_delta_ms / 1000),
+        notion=FakeNotion(args.notion_ms / 1000, faults),
+        sink=SMTPSink(args.smtp_ms / 1000, args.smtp_limit),
+        faults=faults,
+    )
+
+
+def _patch(mod, services, args, timer):
+    """스크립트 모듈의 외부 서비스와 단계 함수를 대역/시간 측정 래퍼로 교체"""
+    import article_mirror
+    import mailer
+
+    flow = mod.flow
+    mod.get_supabase = lambda: services.supabase
+    mod.get_openai = flow.get_openai = lambda: services.openai
+    flow.get_notion = lambda: services.notion
+    mod.ArticleMirror = lambda: article_mirror.ArticleMirror(os.environ["ARTICLE_MIRROR_PATH"])
+    if hasattr(mod, "delivery"):
+        delivery = mod.delivery
+        delivery.get_supabase = lambda: services.supabase
+        delivery.smtp_pool = _sink_pool(mailer, services.sink)(delivery.sender, "x", size=args.send_workers)
+        base = delivery.scheduler
+        delivery.scheduler = type("TimedScheduler", (base,), {"run": timer.wrap("email", base.run)})
+    if hasattr(mod, "smtplib"):
+        mod.smtplib = SimpleNamespace(SMTP_SSL=services.sink.smtp)
+
+    # 공통 흐름(report_flow.ReportFlow)의 단계는 인스턴스 속성을, 보고서별 함수는 모듈 속성을 감쌈
+    for stage, attr in (("fetch_articles", "fetch_articles"), ("digests", "fetch_digests"), ("dedup", "dedupe"),
+                        ("generate", "generate_report"), ("notion", "create_notion_page")):
+        if getattr(flow, attr) is not None:
+            setattr(flow, attr, timer.wrap(stage, getattr(flow, attr)))
+    if hasattr(mod, "send_email"):
+        mod.send_email = timer.wrap("email", mod.send_email)
+    base_page = flow.stream_page
+    flow.stream_page = type("TimedStreamPage", (base_page,), {"finish": timer.wrap("notion", base_page.finish)})
+
+
+def _measure(args, services, timer, import_seconds, run):
+    if args.memory:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        run()
+    total = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] if args.memory else None
+    if args.memory:
+        tracemalloc.stop()
+    services.sink.shutdown()
+    services.sink.server_close()
+
+    import service_guard
+
+    email = timer.stages.get("email", {}).get("seconds") or 0.0
+    return {
+        "import_seconds": round(import_seconds, 4),
+        "total_seconds": round(total, 4),
+        "stages": {k: {"seconds": round(v["seconds"], 4), "calls": v["calls"]} for k, v in timer.stages.items()},
+        "postgrest_requests": services.supabase.requests,
+        "openai_calls": services.openai.responses.calls,
+        "notion_calls": services.notion.calls,
+        "notion_blocks": services.notion.block_count,
+        "emails_sent": services.sink.messages,
+        "email_bytes": services.sink.bytes,
+        "emails_per_second": round(services.sink.messages / email, 1) if email else None,
+        "smtp_throttled": services.sink.throttled,
+        "faults_injected": services.faults.injected,
+        "guards": {name: service_guard.get_guard(name).snapshot() for name in service_guard.SERVICES},
+        "peak_traced_memory_bytes": peak,
+        # --memory로 실행했으면 시간 값에 tracemalloc 추적 비용이 들어 있음
+        "timings_include_tracemalloc": bool(args.memory),
+    }
+
+
+def run_flow(flow, args, tables, workdir):
+    _configure(args, workdir, flow)
+    services = _services(args, tables)
+    timer = StageTimer()
+
+    t0 = time.perf_counter()
+    mod = importlib.import_module(FLOWS[flow])
+    import_seconds = time.perf_counter() - t0
+    _patch(mod, services, args, timer)
+
+    result = _measure(args, services, timer, import_seconds, mod.main)
+    result["run_metrics"] = {k: v for k, v in mod.metrics.record().items() if k in ("counters", "distributions")}
+    return result
+
+
+def run_runner(args, tables, workdir):
+    """run_reports.py로 여러 보고서를 기사 조회를 공유하며 동시에 실행 (stages는 보고서별 합계)"""
+    _configure(args, workdir, "runner")
+    services = _services(args, tables)
+    timer = StageTimer()
+
+    t0 = time.perf_counter()
+    import article_mirror
+    import run_reports
+    mods = [importlib.import_module(FLOWS[flow]) for flow in args.flows]
+    import_seconds = time.perf_counter() - t0
+    for mod in mods:
+        _patch(mod, services, args, timer)
+        mod.metrics.write = lambda *a, **k: None
+    run_reports.get_supabase = lambda: services.supabase
+    run_reports.ArticleMirror = lambda: article_mirror.ArticleMirror(os.environ["ARTICLE_MIRROR_PATH"])
+    run_reports.fetch_shared_articles = timer.wrap("shared_fetch", run_reports.fetch_shared_articles)
+
+    return _measure(args, services, timer, import_seconds, lambda: run_reports.main(args.flows))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", nargs="+", choices=sorted(FLOWS), default=["daily", "weekly", "monthly"])
+    parser.add_argument("--articles", type=int, default=50_000)
+    parser.add_argument("--subscribers", type=int, default=100_000)
+    parser.add_argument("--postgrest-ms", type=float, default=20)
+    parser.add_argument("--openai-ttft-ms", type=float, default=800)
+    parser.add_argument("--openai-delta-ms", type=float, default=10)
+    parser.add_argument("--notion-ms", type=float, default=150)
+    parser.add_argument("--smtp-ms", type=float, default=0)
+    parser.add_argument("--send-workers", type=int, default=8)
+    parser.add_argument("--smtp-limit", type=int, default=0, help="SMTP 싱크의 동시 처리 한도 (넘으면 450, 0이면 없음)")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="PostgREST/Notion 호출 중 503으로 실패시킬 비율")
+    parser.add_argument("--streaming", action="store_true", help="NOTION_STREAMING=1로 실행")
+    parser.add_argument("--rollup", action="store_true",
+                        help="ROLLUP_DIGESTS=1로 실행 (주간/월간을 일별 요약으로 작성)")
+    parser.add_argument("--topic-digest", action="store_true", help="TOPIC_DIGEST=1로 실행 (NumPy 필요)")
+    parser.add_argument("--runner", action="store_true",
+                        help="flows를 각각 실행하는 대신 run_reports.py로 한 번에 실행")
+    parser.add_argument("--memory", action="store_true",
+                        help="tracemalloc으로 최대 할당량 측정 (추적 비용으로 시간 값이 느려지므로 시간 비교와 따로 실행)")
+    parser.add_argument("--output", help="결과 JSON을 저장할 경로 (생략 시 표준 출력)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    tables = {
+        "articles": FakeTable(synthetic_articles(args.articles), ("created_at", "link")),
+        "subscribers": FakeTable(synthetic_subscribers(args.subscribers), ("email",)),
+    }
+    print(f"합성 데이터 준비: {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    result = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        # 외부 서비스 대역의 종류 (in-process: SDK 자리의 객체라 HTTP/직렬화 비용이 빠짐)
+        "service_doubles": {"supabase": "in-process", "openai": "in-process", "notion": "in-process",
+                            "smtp": "localhost socket"},
+        "flows": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.runner:
+            print(f"[runner] {' '.join(args.flows)} 실행 중...", file=sys.stderr)
+            result["runner"] = run_runner(args, tables, workdir)
+        else:
+            for flow in args.flows:
+                print(f"[{flow}] 실행 중...", file=sys.stderr)
+                result["flows"][flow] = run_flow(flow, args, tables, workdir)
+    result["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
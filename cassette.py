@@ -0,0 +1,557 @@
+"""실제 실행의 외부 I/O를 카세트로 녹화하고, 네트워크 없이 같은 응답/지연으로 재생하는 도구.
+
+Supabase/OpenAI/Notion은 모두 httpx(최신 openai SDK는 httpx2)로 통신하므로 HTTPTransport에서
+요청과 응답(스트리밍이면 조각별 도착 시각까지)을, Gmail은 smtplib.SMTP_SSL 호출(연결/로그인/발송/종료)의 결과와 걸린 시간을 기록합니다.
+녹화를 시작할 때 로컬 상태(.cache의 기사 미러, 일별 요약, 체크포인트, LLM 캐시)도 함께 복사해 두고,
+재생할 때는 임시 디렉터리에 복원한 뒤 시계를 녹화 시각으로 돌려 같은 기간을 다루게 합니다.
+
+    python cassette.py record cassettes/weekly main.py
+    python cassette.py replay cassettes/weekly --latency-scale 0.5
+    python -m cProfile -o weekly.prof cassette.py replay cassettes/weekly
+
+카세트에는 구독자 이메일/토큰과 보고서 내용이 그대로 들어가므로 저장소에 올리지 마세요 (/cassettes/는 .gitignore).
+요청 헤더(API 키)는 기록하지 않습니다.
+"""
+import argparse
+import base64
+import builtins
+import datetime as _datetime
+import json
+import os
+import runpy
+import shutil
+import smtplib
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from urllib.parse import urlsplit
+
+# 녹화 시 함께 복사하는 로컬 상태 (환경 변수, 기본 경로). 재생은 복사본으로만 실행
+STATE_PATHS = {
+    "ARTICLE_MIRROR_PATH": ".cache/articles.sqlite3",
+    "DIGEST_STORE_PATH": ".cache/digests.sqlite3",
+    "CHECKPOINT_PATH": ".cache/checkpoints.sqlite3",
+    "LLM_CACHE_DIR": ".cache/llm",
+    "BATCH_DIR": ".cache/batches",
+}
+
+# 실행 경로를 바꾸는 비밀이 아닌 설정. 녹화 후(.env를 읽은 뒤) 값을 저장해 재생 때 그대로 씀
+CONFIG_ENV = (
+    "SUPABASE_URL", "NOTION_DATABASE_ID", "EMAIL_SENDER", "EMAIL_RECIPIENT", "NOTION_STREAMING",
+    "ROLLUP_DIGESTS", "TOPIC_DIGEST", "OPENAI_BATCH", "OPENAI_BATCH_POLL", "MAP_MODEL", "MAP_WORKERS",
+    "MAP_CHUNK_TOKENS", "MAP_REDUCE_TOKEN_BUDGET", "SEND_WORKERS", "SEND_RATE_PER_SEC", "SEND_DAILY_LIMIT",
+    "SUBSCRIBER_PAGE_SIZE", "GEN_FALLBACKS", "GEN_ATTEMPT_TIMEOUT", "GEN_HEDGE_AFTER",
+    "LLM_CACHE_BYPASS", "LLM_CACHE_TTL_HOURS", "CHECKPOINT_RESET",
+)
+
+# 재생 시 SDK 클라이언트 생성에 필요한 자리표시 값 (실제 요청은 나가지 않음).
+# 프로파일러를 붙이면 모듈 로드가 느려지므로 import 시간 검사도 끔
+REPLAY_ENV = {
+    "SUPABASE_KEY": "replay.replay.replay",
+    "OPENAI_API_KEY": "replay",
+    "NOTION_TOKEN": "replay",
+    "EMAIL_PASSWORD": "replay",
+    "IMPORT_BUDGET_MS": "0",
+}
+
+
+# SDK가 쓰는 httpx 호환 패키지 (설치된 것만 가로챔)
+HTTP_MODULES = ("httpx", "httpx2")
+
+
+def _http_modules():
+    for name in HTTP_MODULES:
+        try:
+            yield __import__(name)
+        except ImportError:
+            continue
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _text(value):
+    return value.decode("utf-8", "replace") if isinstance(value, bytes) else value
+
+
+class Cassette:
+    """카세트 디렉터리 (meta.json, exchanges.jsonl, state/)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.meta_path = os.path.join(path, "meta.json")
+        self.exchanges_path = os.path.join(path, "exchanges.jsonl")
+        self.state_dir = os.path.join(path, "state")
+
+    def read_meta(self) -> dict:
+        with open(self.meta_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_meta(self, meta: dict):
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    def exchanges(self):
+        with open(self.exchanges_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+# --- 녹화 -------------------------------------------------------------------------
+
+class Recorder:
+    """교환(요청/응답 한 쌍)을 끝나는 순서대로 exchanges.jsonl에 바로 씀 (실행이 죽어도 그때까지는 남음)"""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+        self.started = time.perf_counter()
+        self.counts = Counter()
+        os.makedirs(cassette.path, exist_ok=True)
+        self._file = open(cassette.exchanges_path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def offset(self) -> float:
+        return round(time.perf_counter() - self.started, 6)
+
+    def add(self, entry: dict):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.counts[entry.get("host") or entry["kind"]] += 1
+
+    def close(self):
+        self._file.close()
+
+
+def _recording_stream(httpx, stream, started, entry, recorder):
+    class RecordingStream(httpx.SyncByteStream):
+        def __init__(self):
+            self.chunks = []
+            self.done = False
+
+        def __iter__(self):
+            for chunk in stream:
+                self.chunks.append([round(time.perf_counter() - started, 6), _b64(chunk)])
+                yield chunk
+            self._finish()
+
+        def _finish(self):
+            if not self.done:
+                self.done = True
+                entry["chunks"] = self.chunks
+                recorder.add(entry)
+
+        def close(self):
+            try:
+                stream.close()
+            finally:
+                self._finish()
+
+    return RecordingStream()
+
+
+def record_http(recorder: Recorder):
+    for httpx in _http_modules():
+        _record_transport(httpx, recorder)
+
+
+def _record_transport(httpx, recorder):
+    original = httpx.HTTPTransport.handle_request
+
+    def handle_request(self, request):
+        body = request.read()
+        url = urlsplit(str(request.url))
+        entry = {
+            "kind": "http", "t": recorder.offset(), "method": request.method, "host": url.netloc,
+            "path": url.path, "query": url.query, "request_bytes": len(body),
+        }
+        started = time.perf_counter()
+        try:
+            response = original(self, request)
+        except Exception as e:
+            entry.update(elapsed=round(time.perf_counter() - started, 6), error=type(e).__name__, message=str(e))
+            recorder.add(entry)
+            raise
+        entry.update(
+            elapsed=round(time.perf_counter() - started, 6),
+            status=response.status_code,
+            headers=[[_text(k), _text(v)] for k, v in response.headers.raw],
+        )
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_recording_stream(httpx, response.stream, started, entry, recorder),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    httpx.HTTPTransport.handle_request = handle_request
+
+
+def _smtp_error(e) -> dict:
+    data = {"type": type(e).__name__, "message": str(e)}
+    if isinstance(e, smtplib.SMTPResponseException):
+        data.update(code=e.smtp_code, message=_text(e.smtp_error))
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        data["recipients"] = {addr: [code, _text(msg)] for addr, (code, msg) in e.recipients.items()}
+    return data
+
+
+def _smtp_result(result):
+    if isinstance(result, tuple):
+        return [_text(v) for v in result]
+    if isinstance(result, dict):
+        return {addr: [code, _text(msg)] for addr, (code, msg) in result.items()}
+    return _text(result)
+
+
+class RecordingSMTP:
+    """smtplib.SMTP_SSL 자리에서 실제 연결을 감싸 호출마다 결과와 걸린 시간을 기록"""
+
+    factory = None
+    recorder = None
+
+    def __init__(self, *args, **kwargs):
+        self._smtp = self._call("connect", None, type(self).factory, *args, **kwargs)
+
+    def _call(self, op, size, fn, *args, **kwargs):
+        recorder = type(self).recorder
+        entry = {"kind": "smtp", "t": recorder.offset(), "op": op}
+        if size is not None:
+            entry["bytes"] = size
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            entry.update(elapsed=round(time.perf_counter() - started, 6), error=_smtp_error(e))
+            recorder.add(entry)
+            raise
+        entry["elapsed"] = round(time.perf_counter() - started, 6)
+        if op != "connect":
+            entry["result"] = _smtp_result(result)
+        recorder.add(entry)
+        return result
+
+    def login(self, user, password, **kwargs):
+        return self._call("login", None, self._smtp.login, user, password, **kwargs)
+
+    def sendmail(self, from_addr, to_addrs, msg, *args, **kwargs):
+        return self._call("send", len(msg), self._smtp.sendmail, from_addr, to_addrs, msg, *args, **kwargs)
+
+    def send_message(self, msg, *args, **kwargs):
+        return self._call("send", len(msg.as_bytes()), self._smtp.send_message, msg, *args, **kwargs)
+
+    def noop(self):
+        return self._call("noop", None, self._smtp.noop)
+
+    def quit(self):
+        return self._call("quit", None, self._smtp.quit)
+
+    def close(self):
+        self._smtp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.quit()
+        except smtplib.SMTPServerDisconnected:
+            pass
+        finally:
+            self.close()
+
+
+def record_smtp(recorder: Recorder):
+    smtplib.SMTP_SSL = type("SMTP_SSL", (RecordingSMTP,), {"factory": smtplib.SMTP_SSL, "recorder": recorder})
+
+
+def snapshot_state(cassette: Cassette) -> list:
+    """로컬 상태 파일/디렉터리를 카세트의 state/로 복사하고 복사한 항목의 환경 변수 이름을 반환"""
+    copied = []
+    for name, default in STATE_PATHS.items():
+        src = os.getenv(name, default)
+        dst = os.path.join(cassette.state_dir, name, os.path.basename(default))
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, dirs_exist_ok=True)
+        elif os.path.isfile(src):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+        else:
+            continue
+        copied.append(name)
+    return copied
+
+
+# --- 재생 -------------------------------------------------------------------------
+
+class Player:
+    """녹화된 교환을 (종류, 호스트, 경로) 또는 (smtp, 동작)별 대기열로 나눠 순서대로 꺼내 줌.
+
+    쿼리 문자열/요청 본문은 실행 시각에 따라 달라지므로 맞추지 않고 같은 엔드포인트의 다음 응답을 씁니다.
+    """
+
+    def __init__(self, exchanges, latency_scale: float = 1.0):
+        self.latency_scale = latency_scale
+        self.queues = defaultdict(deque)
+        for entry in exchanges:
+            self.queues[self.key(entry)].append(entry)
+        self.recorded = len(exchanges)
+        self.replayed = Counter()
+        self.missing = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(entry):
+        if entry["kind"] == "http":
+            return ("http", entry["method"], entry["host"], entry["path"])
+        return ("smtp", entry["op"])
+
+    def take(self, key):
+        with self._lock:
+            queue = self.queues.get(key)
+            if not queue:
+                self.missing[" ".join(key)] += 1
+                return None
+            self.replayed[" ".join(key[:3])] += 1
+            return queue.popleft()
+
+    def sleep(self, seconds: float):
+        if seconds > 0 and self.latency_scale > 0:
+            time.sleep(seconds * self.latency_scale)
+
+    def summary(self) -> str:
+        left = sum(len(q) for q in self.queues.values())
+        text = f"재생: {sum(self.replayed.values())}/{self.recorded}건 사용, 남은 응답 {left}건"
+        if self.missing:
+            text += ", 녹화에 없던 요청: " + ", ".join(f"{k} x{n}" for k, n in self.missing.items())
+        return text
+
+
+def _replay_stream(httpx, entry, player):
+    class ReplayStream(httpx.SyncByteStream):
+        def __iter__(self):
+            previous = entry["elapsed"]
+            for offset, chunk in entry.get("chunks", []):
+                player.sleep(offset - previous)
+                previous = offset
+                yield base64.b64decode(chunk)
+
+    return ReplayStream()
+
+
+def replay_http(player: Player):
+    for httpx in _http_modules():
+        _replay_transport(httpx, player)
+
+
+def _replay_transport(httpx, player):
+    def handle_request(self, request):
+        request.read()
+        url = urlsplit(str(request.url))
+        entry = player.take(("http", request.method, url.netloc, url.path))
+        if entry is None:
+            raise httpx.ConnectError(f"카세트에 {request.method} {url.netloc}{url.path} 응답이 없습니다.", request=request)
+        player.sleep(entry["elapsed"])
+        if "error" in entry:
+            error = getattr(httpx, entry["error"], httpx.TransportError)
+            raise error(entry["message"], request=request)
+        return httpx.Response(
+            status_code=entry["status"],
+            headers=[(k.encode("latin-1"), v.encode("latin-1")) for k, v in entry["headers"]],
+            stream=_replay_stream(httpx, entry, player),
+            request=request,
+        )
+
+    httpx.HTTPTransport.handle_request = handle_request
+
+
+def _raise_smtp(data):
+    cls = getattr(smtplib, data["type"], None) or getattr(builtins, data["type"], None)
+    if cls is smtplib.SMTPRecipientsRefused:
+        raise cls({addr: (code, msg.encode()) for addr, (code, msg) in data["recipients"].items()})
+    if isinstance(cls, type) and issubclass(cls, smtplib.SMTPResponseException):
+        try:
+            raise cls(data["code"], data["message"].encode())
+        except TypeError:
+            raise cls(data["code"], data["message"].encode(), "")
+    if isinstance(cls, type) and issubclass(cls, OSError):
+        raise cls(data["message"])
+    raise RuntimeError(f"{data['type']}: {data['message']}")
+
+
+class ReplaySMTP:
+    """녹화된 SMTP 호출 결과를 같은 지연으로 돌려주는 smtplib.SMTP_SSL 대역"""
+
+    player = None
+
+    def __init__(self, *args, **kwargs):
+        self._play("connect")
+
+    def _play(self, op):
+        player = type(self).player
+        entry = player.take(("smtp", op))
+        if entry is None:
+            if op in ("quit", "noop"):
+                return (250, "ok")
+            raise smtplib.SMTPServerDisconnected(f"카세트에 SMTP {op} 기록이 없습니다.")
+        player.sleep(entry["elapsed"])
+        if "error" in entry:
+            _raise_smtp(entry["error"])
+        result = entry.get("result")
+        if isinstance(result, dict):
+            return {addr: (code, msg.encode()) for addr, (code, msg) in result.items()}
+        return tuple(result) if isinstance(result, list) else result
+
+    def login(self, user, password, **kwargs):
+        return self._play("login")
+
+    def sendmail(self, from_addr, to_addrs, msg, *args, **kwargs):
+        return self._play("send")
+
+    def send_message(self, msg, *args, **kwargs):
+        return self._play("send")
+
+    def noop(self):
+        return self._play("noop")
+
+    def quit(self):
+        return self._play("quit")
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.quit()
+
+
+def replay_smtp(player: Player):
+    smtplib.SMTP_SSL = type("SMTP_SSL", (ReplaySMTP,), {"player": player})
+
+
+def shift_clock(recorded_at: float):
+    """datetime.now()/time.time()이 녹화 시작 시각부터 흐르도록 맞춤 (보고서 기간과 캐시 만료 판정을 녹화와 같게)"""
+    offset = recorded_at - time.time()
+    real_time = time.time
+
+    class ShiftedDatetime(_datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return super().now(tz) + _datetime.timedelta(seconds=offset)
+
+        @classmethod
+        def today(cls):
+            return cls.now()
+
+        @classmethod
+        def utcnow(cls):
+            return super().utcnow() + _datetime.timedelta(seconds=offset)
+
+    _datetime.datetime = ShiftedDatetime
+    time.time = lambda: real_time() + offset
+
+
+def restore_state(cassette: Cassette, workdir: str):
+    """녹화 때 복사한 로컬 상태를 workdir에 복원하고, 상태 경로 환경 변수가 모두 복사본을 가리키게 함"""
+    for name, default in STATE_PATHS.items():
+        base = os.path.basename(default)
+        target = os.path.join(workdir, name, base)
+        source = os.path.join(cassette.state_dir, name, base)
+        if os.path.isdir(source):
+            shutil.copytree(source, target)
+        elif os.path.isfile(source):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+        os.environ[name] = target
+
+
+# --- 실행 -------------------------------------------------------------------------
+
+def _run_script(script: str, script_args):
+    sys.argv = [script] + list(script_args)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return 0
+
+
+def record(path: str, script: str, script_args) -> int:
+    cassette = Cassette(path)
+    recorder = Recorder(cassette)
+    meta = {
+        "version": 1,
+        "script": script,
+        "args": list(script_args),
+        "recorded_at": time.time(),
+        "state": snapshot_state(cassette),
+    }
+    cassette.write_meta(meta)
+    record_http(recorder)
+    record_smtp(recorder)
+    print(f"녹화 시작: {script} -> {path}")
+    started = time.perf_counter()
+    try:
+        code = _run_script(script, script_args)
+    finally:
+        recorder.close()
+        meta.update(
+            seconds=round(time.perf_counter() - started, 3),
+            counts=dict(recorder.counts),
+            env={name: os.environ[name] for name in CONFIG_ENV if name in os.environ},
+        )
+        cassette.write_meta(meta)
+        print(f"녹화 완료: {sum(recorder.counts.values())}건 ({', '.join(f'{k} {n}' for k, n in recorder.counts.items())})")
+    return code
+
+
+def replay(path: str, latency_scale: float = 1.0, script: str = None, script_args=None) -> int:
+    cassette = Cassette(path)
+    meta = cassette.read_meta()
+    player = Player(cassette.exchanges(), latency_scale)
+    workdir = tempfile.mkdtemp(prefix="cassette-")
+    restore_state(cassette, workdir)
+    os.environ.setdefault("RUN_METRICS_DIR", os.path.join(path, "replay_runs"))
+    for name, value in {**meta.get("env", {}), **REPLAY_ENV}.items():
+        os.environ.setdefault(name, value)
+    shift_clock(meta["recorded_at"])
+    replay_http(player)
+    replay_smtp(player)
+    script = script or meta["script"]
+    print(f"재생 시작: {script} (녹화 {meta.get('seconds')}s, 지연 x{latency_scale})")
+    started = time.perf_counter()
+    try:
+        code = _run_script(script, meta.get("args", []) if script_args is None else script_args)
+    finally:
+        print(f"{player.summary()} ({time.perf_counter() - started:.1f}s)")
+        shutil.rmtree(workdir, ignore_errors=True)
+    return code
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="스크립트를 실제 서비스로 실행하며 외부 I/O를 녹화")
+    rec.add_argument("cassette", help="카세트 디렉터리")
+    rec.add_argument("script", help="실행할 스크립트 (main.py, daily_trend_report.py, monthly_trend_report.py 등)")
+    rec.add_argument("args", nargs=argparse.REMAINDER, help="스크립트에 넘길 인자")
+    play = sub.add_parser("replay", help="녹화한 응답으로 네트워크 없이 다시 실행")
+    play.add_argument("cassette", help="카세트 디렉터리")
+    play.add_argument("--latency-scale", type=float, default=1.0,
+                      help="녹화된 지연에 곱할 배율 (1: 원래대로, 0: 지연 없이)")
+    play.add_argument("--script", help="녹화와 다른 스크립트로 재생 (기본: 녹화한 스크립트)")
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        return record(args.cassette, args.script, args.args)
+    return replay(args.cassette, args.latency_scale, args.script)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
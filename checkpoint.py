@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stages (
+    period TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (period, name)
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    period TEXT NOT NULL,
+    email TEXT NOT NULL,
+    sent_at REAL NOT NULL,
+    PRIMARY KEY (period, email)
+);
+"""
+
+
+class RunCheckpoint:
+    """보고서 기간(period)별로 완료된 단계와 수신자별 발송 기록을 남기는 SQLite 체크포인트.
+
+    같은 기간을 다시 실행하면 저장된 보고서/Notion URL을 그대로 쓰고,
+    발송 기록(ledger)에 있는 수신자는 건너뛰므로 중간에 죽은 실행을 이어서 끝낼 수 있습니다.
+    발송 직후 바로 기록하므로 중복 발송은 기록 직전에 죽은 경우의 1통으로 제한됩니다.
+    """
+
+    def __init__(self, period: str, path: str = DEFAULT_PATH, retention_days: int = 120):
+        self.period = period
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            self.conn.execute("DELETE FROM stages WHERE updated < ?", (cutoff,))
+            self.conn.execute("DELETE FROM deliveries WHERE sent_at < ?", (cutoff,))
+            self.conn.commit()
+
+    def get(self, name: str):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM stages WHERE period = ? AND name = ?", (self.period, name)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, name: str, value: str):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO stages (period, name, value, updated) VALUES (?, ?, ?, ?)",
+                (self.period, name, value, time.time()),
+            )
+            self.conn.commit()
+
+    def delete(self, name: str):
+        with self._lock:
+            self.conn.execute("DELETE FROM stages WHERE period = ? AND name = ?", (self.period, name))
+            self.conn.commit()
+
+    def delivered(self) -> set:
+        """이 기간에 이미 발송한 이메일 주소"""
+        with self._lock:
+            rows = self.conn.execute("SELECT email FROM deliveries WHERE period = ?", (self.period,)).fetchall()
+        return {email for (email,) in rows}
+
+    def mark_sent(self, email: str):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO deliveries (period, email, sent_at) VALUES (?, ?, ?)",
+                (self.period, email, time.time()),
+            )
+            self.conn.commit()
+
+    def reset(self):
+        """이 기간의 단계/발송 기록을 모두 지움 (처음부터 다시 실행할 때)"""
+        with self._lock:
+            self.conn.execute("DELETE FROM stages WHERE period = ?", (self.period,))
+            self.conn.execute("DELETE FROM deliveries WHERE period = ?", (self.period,))
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
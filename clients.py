@@ -0,0 +1,39 @@
+import functools
+import os
+import time
+
+# 스크립트 시작부터 모듈 로드가 끝날 때까지 허용하는 시간(ms). 0이면 검사하지 않음
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "500"))
+
+
+def check_import_budget(started: float, budget_ms: float = IMPORT_BUDGET_MS):
+    """started(time.perf_counter 값) 이후 경과 시간이 budget_ms를 넘으면 경고를 출력.
+
+    SDK를 모듈 최상단에서 import하는 코드가 다시 들어오면 기사가 없는 날의 실행도
+    느려지므로, 스크립트 import 직후 호출해 로그에 드러나게 합니다.
+    느린 러너 때문에 보고서 발송이 멈추면 안 되므로 여기서는 실패시키지 않고,
+    한도는 tests/test_import_budget.py가 강제합니다 (측정은 benchmark.py).
+    """
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if budget_ms and elapsed_ms > budget_ms:
+        print(f"경고: 모듈 로드 시간 초과 {elapsed_ms:.0f}ms > {budget_ms:.0f}ms (IMPORT_BUDGET_MS)")
+    return elapsed_ms
+
+
+# 외부 서비스 클라이언트는 처음 필요할 때 SDK를 import해 만들고 이후 같은 객체를 재사용
+@functools.lru_cache(maxsize=None)
+def get_supabase():
+    from supabase import create_client
+    return create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+
+@functools.lru_cache(maxsize=None)
+def get_openai():
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+@functools.lru_cache(maxsize=None)
+def get_notion():
+    from notion_client import Client as NotionClient
+    return NotionClient(auth=os.getenv("NOTION_TOKEN"))
@@ -0,0 +1,188 @@
+import json
+import math
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from dedup import dedupe_articles
+from topics import cluster_titles, count_companies
+
+DEFAULT_PATH = os.getenv("DIGEST_STORE_PATH", ".cache/digests.sqlite3")
+
+# render_digests 결과를 프롬프트에 넣을 때 쓰는 목록 설명
+ROLLUP_LABEL = ("일별 요약 목록 ([날짜]마다 그날의 기사 수, 기업별 언급 수, 일간 보고서의 주요 트렌드, "
+                "토픽별 기사 수와 대표 기사. \"유사 기사 N건\"은 같은 소식을 다룬 기사 수)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_digests (
+    day TEXT PRIMARY KEY,
+    body TEXT NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+
+def day_windows(now, days: int):
+    """now에서 끝나는 24시간 구간 days개를 오래된 순으로 [(날짜 키, 시작, 끝), ...] 반환.
+
+    일간 실행은 실행 시각 기준 최근 24시간을 다루므로 구간의 끝 날짜를 키로 씁니다.
+    """
+    windows = []
+    for i in reversed(range(days)):
+        end = now - timedelta(days=i)
+        windows.append((end.strftime("%Y-%m-%d"), end - timedelta(days=1), end))
+    return windows
+
+
+def make_digest(articles, headlines=(), max_topics: int = 8, per_topic: int = 3) -> dict:
+    """중복 제거된 하루치 기사로 주간/월간 보고서에 넘길 요약(dict)을 만듦.
+
+    headlines에는 그날 일간 보고서의 트렌드 소제목을 넣습니다 (없으면 기사 묶음만 저장).
+    NumPy가 없어 토픽을 묶을 수 없으면 많이 다뤄진 기사를 하나의 묶음으로 저장합니다.
+    """
+    titles = [a["title"] for a in articles]
+    weights = [a.get("dup_count", 1) for a in articles]
+    weight = lambda group: sum(a.get("dup_count", 1) for a in group)  # noqa: E731
+    result = cluster_titles(titles) if articles else None
+    topics = []
+    if result is not None:
+        labels, scores, terms = result
+        groups = {}
+        for article, label, score in zip(articles, labels, scores):
+            if label >= 0:
+                groups.setdefault(label, []).append((score, article))
+        for label, members in sorted(groups.items(), key=lambda item: -weight(a for _, a in item[1])):
+            if len(members) < 2:
+                continue
+            members.sort(key=lambda m: -m[0] * (1 + math.log(m[1].get("dup_count", 1))))
+            topics.append({
+                "terms": terms[label],
+                "count": weight(a for _, a in members),
+                "articles": [_compact(a) for _, a in members[:per_topic]],
+            })
+            if len(topics) == max_topics:
+                break
+    if not topics and articles:
+        top = sorted(articles, key=lambda a: -a.get("dup_count", 1))
+        topics.append({"terms": [], "count": weight(articles), "articles": [_compact(a) for a in top[:per_topic * 3]]})
+    return {
+        "articles": sum(weights),
+        "companies": count_companies(titles, weights)[:10],
+        "headlines": list(headlines),
+        "topics": topics,
+    }
+
+
+def _compact(article):
+    return {"title": article["title"], "link": article["link"], "dup_count": article.get("dup_count", 1)}
+
+
+def headlines_of(doc):
+    """일간 보고서 문서 트리에서 트렌드 소제목(### ...)만 추출"""
+    return ["".join(span.text for span in node.spans) for node in doc if node.kind == "heading_3"]
+
+
+def render_digests(digests, refs, max_topics: int = 8, per_topic: int = 3) -> str:
+    """[(날짜 키, 요약), ...]을 프롬프트용 텍스트로 (기사 링크는 refs의 짧은 ID로).
+
+    기간이 길수록 max_topics/per_topic을 줄여 날마다 큰 토픽의 대표 기사만 남깁니다.
+    """
+    lines = []
+    for day, digest in digests:
+        header = f"[{day}] 기사 {digest['articles']}건"
+        if digest["companies"]:
+            header += " | 기업: " + ", ".join(f"{name} {count}" for name, count in digest["companies"])
+        lines.append(header)
+        if digest["headlines"]:
+            lines.append("주요 트렌드: " + " / ".join(digest["headlines"]))
+        for topic in digest["topics"][:max_topics]:
+            name = " · ".join(topic["terms"]) or "주요 기사"
+            lines.append(f"* {name} (기사 {topic['count']}건)")
+            lines.extend("  " + refs.article_line(a) for a in topic["articles"][:per_topic])
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+
+class DigestStore:
+    """일간 실행이 남기는 날짜별 요약 저장소 (SQLite, 주간/월간 보고서가 읽음)"""
+
+    def __init__(self, path: str = DEFAULT_PATH, retention_days: int = 62):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute("DELETE FROM daily_digests WHERE created < ?", (time.time() - retention_days * 86400,))
+        self.conn.commit()
+
+    def put(self, day: str, digest: dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO daily_digests (day, body, created) VALUES (?, ?, ?)",
+            (day, json.dumps(digest, ensure_ascii=False), time.time()),
+        )
+        self.conn.commit()
+
+    def get_many(self, days) -> dict:
+        days = list(days)
+        if not days:
+            return {}
+        rows = self.conn.execute(
+            f"SELECT day, body FROM daily_digests WHERE day IN ({','.join('?' * len(days))})", days
+        ).fetchall()
+        return {day: json.loads(body) for day, body in rows}
+
+    def close(self):
+        self.conn.close()
+
+
+def collect_digests(store, now, days: int, load_articles):
+    """now까지 days일의 [(날짜 키, 요약), ...]. 저장된 요약이 없는 날만 기사 원본으로 요약을 만듦.
+
+    load_articles(start, end)는 구간 안의 기사(title, link)를 돌려주는 함수로, 빠진 날마다 호출합니다.
+    새로 만든 요약도 저장해 다음 실행에서 재사용합니다 (그날 일간 실행이 저장하면 덮어씀).
+    반환값의 두 번째 항목은 원본 기사로 채운 날짜 목록입니다.
+    """
+    windows = day_windows(now, days)
+    stored = store.get_many(key for key, _, _ in windows)
+    missing = [key for key, _, _ in windows if key not in stored]
+    for key, start, end in windows:
+        if key in stored:
+            continue
+        day_articles = dedupe_articles(load_articles(start, end))
+        if day_articles:
+            stored[key] = make_digest(day_articles)
+            store.put(key, stored[key])
+    return [(key, stored[key]) for key, _, _ in windows if key in stored], missing
+
+
+def load_daily_digests(days: int, open_mirror, get_supabase, metrics=None, now=None):
+    """now(기본: 현재 시각)까지 최근 days일의 일별 요약 (주간/월간 보고서의 fetch_digests 공용).
+
+    일간 실행이 저장한 요약이 없는 날만 open_mirror()로 연 기사 미러를 get_supabase()로 동기화해
+    기사 원본으로 요약하며, 빠진 날이 없으면 미러를 열지 않습니다.
+    스크립트 모듈의 ArticleMirror/get_supabase를 바꿔 끼우는 run_reports.py, benchmark.py가 그대로 적용되도록
+    둘 다 호출할 때 찾는 함수로 받습니다.
+    """
+    now = now or datetime.now()
+    mirror = None
+
+    def load_articles(start, end):
+        nonlocal mirror
+        if mirror is None:
+            mirror = open_mirror()
+            mirror.sync(get_supabase(), since=now - timedelta(days=days))
+        return mirror.between(start, end)
+
+    store = DigestStore()
+    try:
+        digests, missing = collect_digests(store, now, days, load_articles)
+    finally:
+        store.close()
+        if mirror is not None:
+            mirror.close()
+    if metrics is not None:
+        metrics.incr("digests.stored", days - len(missing))
+        metrics.incr("digests.rebuilt", len(missing))
+    if missing:
+        print(f"저장된 일별 요약이 없는 {len(missing)}일은 기사 원본으로 요약했습니다: {', '.join(missing)}")
+    return digests
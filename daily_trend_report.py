@@ -1,46 +1,67 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
 import os
-import json
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from openai import OpenAI
-from notion_client import Client as NotionClient
-import re
-import smtplib
-from email.mime.text import MIMEText
-import markdown
-from email.message import EmailMessage
+from clients import check_import_budget, get_supabase
+from article_mirror import ArticleMirror
+from daily_digest import DigestStore, headlines_of, make_digest
+from link_refs import LinkRefs, REF_RULE
+from llm import SYSTEM_PROMPT
+from generation_policy import GenerationPolicy
+from llm_cache import ResponseCache
+from report_flow import ReportFlow, SubscriberDelivery, report_footer
+from run_metrics import RunMetrics
+from topics import DIGEST_LABEL, build_digest
 
 # 환경 변수 로드
 load_dotenv()
+check_import_budget(_IMPORT_STARTED)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-EMAIL_SENDER = os.getenv("EMAIL_SENDER")
-EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
-UNSUB_BASE = "https://corocmnneqzimohtrhuf.supabase.co/functions/v1/unsubscribe"  # 프로젝트 도메인으로 교체
-SUB_BASE = "https://corocmnneqzimohtrhuf.supabase.co/functions/v1/subscribe"
+# 1이면 LLM 응답을 스트리밍으로 받아 Notion 페이지를 생성과 동시에 작성
+NOTION_STREAMING = os.getenv("NOTION_STREAMING", "").lower() in ("1", "true", "yes")
+# 1이면 기사 목록을 토픽별로 묶고 기업별 언급 수를 붙여 프롬프트에 넣음 (NumPy 필요, 프롬프트 형태가 바뀌므로 기본은 끔)
+TOPIC_DIGEST = os.getenv("TOPIC_DIGEST", "").lower() in ("1", "true", "yes")
+# 1이면 이번 기간의 체크포인트(보고서/Notion URL/발송 기록)를 지우고 처음부터 실행
+CHECKPOINT_RESET = os.getenv("CHECKPOINT_RESET", "").lower() in ("1", "true", "yes")
 
+REPORT_FOOTER = report_footer("24시간")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
-notion_client = NotionClient(auth=NOTION_TOKEN)
 
-def get_subscribers():
-    resp = supabase.table("subscribers").select("email, token").eq("subscribed", True).execute()
-    return resp.data or []
+# Supabase/OpenAI/Notion 클라이언트는 clients의 get_*()로 처음 쓸 때 생성 (기사가 없는 날은 SDK를 로드하지 않음)
+# LLM 응답 디스크 캐시 (LLM_CACHE_BYPASS=1 이면 캐시를 읽지 않음)
+llm_cache = ResponseCache.from_env()
+# 보고서 생성 지연 SLO (GEN_ATTEMPT_TIMEOUT, GEN_HEDGE_AFTER, GEN_FALLBACKS로 조정)
+gen_policy = GenerationPolicy.from_env()
+# 단계별 시간/토큰/발송 바이트 기록 (실행이 끝나면 runs/에 JSON으로 저장)
+metrics = RunMetrics("daily")
+# 구독자 발송 (SEND_WORKERS, SEND_RATE_PER_SEC, SEND_DAILY_LIMIT, SUBSCRIBER_PAGE_SIZE로 조정)
+delivery = SubscriberDelivery.from_env(metrics, ["안녕하세요,", "일간 AI 주요 트렌드가 생성되었습니다."])
 
 
+@metrics.timed("get_recent_articles")
 def get_recent_articles():
     one_day_ago = datetime.now() - timedelta(days=1)
-    response = supabase.table("articles").select("title, link").gte("created_at", one_day_ago.isoformat() + "Z").execute()
-    return response.data if response.data else []
-
-def generate_ai_trend_report_with_gpt(articles):
-    article_list_str = "\n".join([f"- [{a['title']}]({a['link']})" for a in articles])
+    mirror = ArticleMirror()
+    try:
+        mirror.sync(get_supabase(), since=one_day_ago)
+        return mirror.recent(one_day_ago)
+    finally:
+        mirror.close()
+
+def build_report_request(articles, digests=None):
+    """보고서 생성 요청(Responses API 파라미터)과 기사 링크 표(LinkRefs)를 만듦 (일간은 digests를 쓰지 않음)"""
+    # URL 대신 짧은 기사 ID로 전달하고, 중복 제거 단계에서 묶인 기사 수를 함께 표시
+    refs = LinkRefs()
+    # 비슷한 기사를 토픽으로 미리 묶어 두면 모델이 분류에 쓰는 추론 토큰이 줄어듦
+    digest = build_digest(articles, refs, max_topics=15, per_topic=10) if TOPIC_DIGEST else None
+    if digest:
+        article_list_str = digest
+        list_label = DIGEST_LABEL
+    else:
+        article_list_str = "\n".join([refs.article_line(a) for a in articles])
+        list_label = "기사 목록 (\"유사 기사 N건\"은 같은 소식을 다룬 기사 수)"
 
     prompt = f"""당신의 역할:
 당신은 인공지능(AI) 산업 전반의 기술, 비즈니스, 정책 흐름을 분석하는 전문 애널리스트입니다.
@@ -80,246 +101,56 @@ google, Microsoft, OpenAI, meta, alphabet 등 주요 기업의 최근 동향을
 
 **출력 규칙**:
 - 최종 보고서 전체 분량은 공백 포함 2000자 이내로 작성.
+{REF_RULE}
 
-기사 목록:
+{list_label}:
 {article_list_str}
 
 데일리 AI 트렌드 분석 보고서:
 """
 
-    def _extract_text(resp):
-        # 1) SDK 최신 경로
-        if hasattr(resp, "output_text") and resp.output_text:
-            return resp.output_text
-
-        # 2) 구조 파싱
-        parts = []
-        for item in getattr(resp, "output", []) or []:
-            if getattr(item, "type", None) in ("message", "text", "output_text"):
-                content = getattr(item, "content", None)
-                if isinstance(content, list):
-                    for c in content:
-                        if getattr(c, "type", None) in ("text", "output_text"):
-                            parts.append(str(getattr(c, "text", "")))
-                elif content:
-                    parts.append(str(content))
-        return "\n".join(p for p in parts if p).strip()
-
+    request = {
+        "model": "gpt-5",
+        "input": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        "max_output_tokens": 10000,  # 배치 모드니까 넉넉하게
+        "reasoning": {"effort": "medium"},
+    }
+    return request, refs
+
+
+@metrics.timed("store_digest")
+def store_digest(articles, doc):
+    """주간/월간 보고서가 원본 기사 대신 쓰도록 오늘의 토픽/기업 집계와 트렌드 소제목을 저장"""
     try:
-        resp = openai_client.responses.create(
-            model="gpt-5",
-            input=[
-                {"role": "system", "content": "You are an expert AI trend analyst and report writer. Reply with Markdown only, no explanations."},
-                {"role": "user", "content": prompt},
-            ],
-            max_output_tokens=10000,  # 배치 모드니까 넉넉하게
-            reasoning={"effort": "medium"},
-        )
-
-        text = _extract_text(resp)
-
-        # 만약 여전히 비면 raw 출력 확인
-        if not text:
-            print("DEBUG raw response:", resp)
-            return None
-
-        return text
-
+        store = DigestStore()
+        try:
+            store.put(datetime.now().strftime("%Y-%m-%d"), make_digest(articles, headlines_of(doc)))
+        finally:
+            store.close()
     except Exception as e:
-        import traceback
-        print("ChatGPT API 호출 오류:", repr(e))
-        traceback.print_exc()
-        return None
-
-
-def parse_rich_text(text: str):
-    # Markdown 링크 및 bold 텍스트를 함께 처리
-    link_pattern = r'\[([^\]]+)\]\((https?://[^\)]+)\)'
-    bold_pattern = r'\*\*([^\*]+)\*\*'
-    segments = []
-    last_end = 0
-
-    # 링크 우선 처리
-    for match in re.finditer(link_pattern, text):
-        start, end = match.span()
-
-        # 이전 일반 텍스트 (굵게 포함 가능)
-        if start > last_end:
-            interim_text = text[last_end:start]
-            segments.extend(process_text_styles(interim_text))
-
-        # 링크 추가
-        link_text = match.group(1)
-        link_url = match.group(2)
-        segments.append({
-            "type": "text",
-            "text": {"content": link_text, "link": {"url": link_url}},
-            "annotations": {"bold": False}
-        })
-
-        last_end = end
-
-    # 남은 텍스트 처리
-    if last_end < len(text):
-        segments.extend(process_text_styles(text[last_end:]))
-
-    return segments
-
-def process_text_styles(text: str):
-    segments = []
-    last_end = 0
-
-    # **굵게** 또는 *기울임* 모두 처리
-    pattern = r'(\*.\*\*|\*.*\*)'
-    for match in re.finditer(pattern, text):
-        start, end = match.span()
-        if start > last_end:
-            segments.append({
-                "type": "text",
-                "text": {"content": text[last_end:start]},
-                "annotations": {"bold": False, "italic": False}
-            })
-
-        content = match.group(0)
-        clean_content = content.strip('*')
-        is_bold = content.startswith('**')
-        is_italic = not is_bold  # 간단한 처리
-
-        segments.append({
-            "type": "text",
-            "text": {"content": clean_content},
-            "annotations": {"bold": is_bold, "italic": is_italic}
-        })
-
-        last_end = end
-
-    if last_end < len(text):
-        segments.append({
-            "type": "text",
-            "text": {"content": text[last_end:]},
-            "annotations": {"bold": False, "italic": False}
-        })
-
-    return segments
-
-def markdown_to_notion_blocks(md_text: str):
-    lines = md_text.splitlines()
-    blocks = []
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        if line == "---": # Check for horizontal rule
-            blocks.append({"object": "block", "type": "divider", "divider": {}})
-        elif line.startswith("### "):
-            blocks.append({"object": "block", "type": "heading_3", "heading_3": {"rich_text": parse_rich_text(line[4:])}})
-        elif line.startswith("## "):
-            blocks.append({"object": "block", "type": "heading_2", "heading_2": {"rich_text": parse_rich_text(line[3:])}})
-        elif line.startswith("# "):
-            blocks.append({"object": "block", "type": "heading_1", "heading_1": {"rich_text": parse_rich_text(line[2:])}})
-        elif line.startswith("- "):
-            blocks.append({"object": "block", "type": "bulleted_list_item", "bulleted_list_item": {"rich_text": parse_rich_text(line[2:])}})
-        else:
-            blocks.append({"object": "block", "type": "paragraph", "paragraph": {"rich_text": parse_rich_text(line)}})
-    return blocks
-
-def create_notion_page(title, content):
-    try:
-        children = markdown_to_notion_blocks(content)
-        response = notion_client.pages.create(
-            parent={"database_id": NOTION_DATABASE_ID},
-            properties={"제목": {"title": [{"text": {"content": title}}]}},
-            children=children
-        )
-        return response["url"]
-    except Exception as e:
-        print(f"Notion 페이지 생성 오류: {e}")
-        return None
-
-
-def build_footer(unsub_url: str, sub_url: str):
-    return f"""
-<hr>
-<p style="font-size:12px;color:#666">
-  이 메일은 구독자에게 발송되었습니다.
-  <a href="{sub_url}">구독하기</a> · <a href="{unsub_url}">구독취소</a>
-</p>"""
-
-def send_one(subject, html_body, to_email, token):
-    unsub_url = f"{UNSUB_BASE}?token={token}"
-    resub_url = f"{SUB_BASE}?token={token}"
-    full_html = html_body + build_footer(unsub_url, resub_url)
-
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = EMAIL_SENDER
-    msg["To"] = to_email
-    msg["List-Unsubscribe"] = f"<{unsub_url}>"
-    msg["List-Unsubscribe-Post"] = "List-Unsubscribe=One-Click"
-
-    msg.set_content("HTML email")
-    msg.add_alternative(full_html, subtype="html")
-
-    with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-        smtp.login(EMAIL_SENDER, EMAIL_PASSWORD)
-        smtp.send_message(msg)
-
-
+        print(f"일별 요약 저장 오류: {e}")
+
+flow = ReportFlow(
+    "daily", metrics, llm_cache, gen_policy,
+    build_request=build_report_request,
+    fetch_articles=get_recent_articles,
+    send_report=delivery,
+    on_generated=store_digest,
+    footer=REPORT_FOOTER,
+    database_id=NOTION_DATABASE_ID,
+    period="최근 24시간",
+    streaming=NOTION_STREAMING,
+    reset=CHECKPOINT_RESET,
+)
+
+def main():
+    flow.run(f"일간 AI 주요 트렌드 ({(datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')})")
 
 if __name__ == "__main__":
-    print("Supabase에서 기사 제목과 링크를 가져옵니다...")
-    articles = get_recent_articles()
-    
-    if not articles:
-        print("새로운 기사가 없습니다.")
-    else:
-        print(f"{len(articles)}개의 기사를 찾았습니다. ChatGPT로 보고서 생성을 시작합니다...")
-        report_content = generate_ai_trend_report_with_gpt(articles)
-        
-        if report_content:
-            report_content += (
-                "\n\n---\n\n"
-                "본 보고서는 국내외 주요 AI 전문 언론사의 최근 24시간 기사 내용을 기반으로 **ChatGPT**가 종합·작성한 자료입니다.\n"
-                "*(국내: AI TIMES, Mirakle AI, 로봇신문 / 해외: MIT Technology Review, The Verge, VentureBeat, Techcrunch)*"
-            )
-            print("보고서 생성 완료. Notion 페이지를 생성합니다...")
-            page_title = f"일간 AI 주요 트렌드 ({(datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')})"
-            notion_url = create_notion_page(page_title, report_content)
-            
-            if notion_url:
-                print(f"Notion 페이지 생성 완료: {notion_url}")
-                # Convert markdown to HTML for email body
-                html_report_content = markdown.markdown(report_content)
-                email_body = f"""<html>
-<head>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;700&display=swap');
-        body {{
-            font-family: 'Inter', sans-serif;
-        }}
-    </style>
-</head>
-<body>
-    <p>안녕하세요,</p>
-    <p>일간 AI 주요 트렌드가 생성되었습니다.</p>
-    <p><a href=\"{notion_url}\">Notion 링크</a></p>
-    
-    {html_report_content}
-</body>
-</html>"""
-                subs = get_subscribers()
-                if not subs:
-                    print("구독자가 없습니다.")
-                else:
-                    for s in subs:
-                        send_one(
-                            subject=page_title,
-                            html_body=email_body,  # 위에서 만든 보고서 HTML
-                            to_email=s["email"],
-                            token=s["token"],
-                  )
-
-            else:
-                print("Notion 페이지 생성에 실패했습니다.")
-        else:
-            print("ChatGPT 보고서 생성에 실패했습니다.")
+    try:
+        main()
+    finally:
+        metrics.write()
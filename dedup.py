@@ -0,0 +1,100 @@
+import random
+import re
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 기사 식별과 무관한 추적용 쿼리 파라미터
+_TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "source", "cmpid", "ncid"}
+
+_NUM_PERM = 24
+_BANDS = 8
+_ROWS = _NUM_PERM // _BANDS
+# 고정 시드의 XOR 마스크로 해시 함수 군을 흉내냄 — 실행마다 같은 결과가 나오도록
+_MASKS = [random.Random(i).getrandbits(32) for i in range(_NUM_PERM)]
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def canonicalize_url(url: str) -> str:
+    """utm_* 등 추적 파라미터, fragment, www., 끝 슬래시를 제거한 정규화 URL"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme,
+                       host, path, urlencode(sorted(query)), ""))
+
+
+def _shingles(title: str, n: int = 3):
+    # 한국어는 띄어쓰기가 불규칙하므로 단어 대신 문자 n-gram 사용
+    text = _NON_WORD.sub(" ", title.lower()).strip()
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _minhash(shingles):
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    return [min(map(mask.__xor__, hashes)) for mask in _MASKS]
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def dedupe_articles(articles, threshold: float = 0.7):
+    """같은 기사(정규화 URL 동일) 및 제목이 거의 같은 기사를 하나로 합침.
+
+    MinHash + LSH banding으로 후보 쌍만 비교하므로 전체 비교(O(n^2)) 없이 동작합니다.
+    각 그룹의 첫 기사를 대표로 남기고 dup_count에 묶인 기사 수를 기록합니다.
+    """
+    # 1) 정규화 URL이 같은 기사 병합
+    by_url = {}
+    unique = []
+    for a in articles:
+        key = canonicalize_url(a["link"])
+        if key in by_url:
+            by_url[key]["dup_count"] += 1
+            continue
+        item = dict(a, dup_count=1)
+        by_url[key] = item
+        unique.append(item)
+
+    # 2) 제목 near-duplicate 병합
+    shingles = [_shingles(a["title"]) for a in unique]
+    parent = list(range(len(unique)))
+    buckets = {}
+    for i, sh in enumerate(shingles):
+        if not sh:
+            continue
+        sig = _minhash(sh)
+        for b in range(_BANDS):
+            band = (b, tuple(sig[b * _ROWS:(b + 1) * _ROWS]))
+            for j in buckets.setdefault(band, []):
+                ri, rj = _find(parent, i), _find(parent, j)
+                if ri == rj:
+                    continue
+                sj = shingles[j]
+                if len(sh & sj) / len(sh | sj) >= threshold:
+                    parent[max(ri, rj)] = min(ri, rj)
+            buckets[band].append(i)
+
+    result = []
+    for i, item in enumerate(unique):
+        root = _find(parent, i)
+        if root == i:
+            result.append(item)
+        else:
+            unique[root]["dup_count"] += item["dup_count"]
+    return result
@@ -0,0 +1,127 @@
+import math
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+
+from llm import extract_text
+
+
+def looks_like_report(text) -> bool:
+    """보고서로 쓸 수 있는 응답인지 (비어 있지 않고 ## 섹션이 하나 이상 있음)"""
+    return bool(text and text.strip()) and "## " in text
+
+
+def parse_fallbacks(spec: str):
+    """"model:effort" 목록(쉼표 구분)을 [(이름, 요청 덮어쓰기), ...]로 변환.
+
+    model이나 effort를 비우면 원래 요청 값을 그대로 씁니다. 예: ":low,gpt-5-mini:low"
+    """
+    steps = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, effort = item.partition(":")
+        overrides = {}
+        if model:
+            overrides["model"] = model
+        if effort:
+            overrides["reasoning"] = {"effort": effort}
+        name = "-".join(filter(None, (model, effort and f"effort-{effort}")))
+        steps.append((name, overrides))
+    return steps
+
+
+class GenerationPolicy:
+    """보고서 생성 호출의 지연 SLO 정책.
+
+    주 요청을 보낸 뒤 hedge_after초 안에 유효한 응답이 없으면 대체 경로(fallbacks)의 다음 요청을
+    함께 보내고(hedge), 실패하거나 attempt_timeout을 넘긴 시도가 있으면 다음 경로를 바로 시작합니다.
+    가장 먼저 도착한 유효한 응답을 쓰며, 늦게 끝난 나머지 시도의 결과는 버립니다.
+    시도는 daemon 스레드에서 SDK 재시도 없이(max_retries=0) 보내므로, 버린 시도가 실행 종료를 붙잡거나
+    SDK가 몰래 다시 생성하지 않습니다 (재시도는 이 정책의 대체 경로만).
+    hedge_after가 0이면 hedge 없이 실패/시간 초과 때만 다음 경로로 넘어갑니다.
+    """
+
+    def __init__(self, fallbacks=(), attempt_timeout: float = 420.0, hedge_after: float = 180.0,
+                 validate=looks_like_report):
+        self.fallbacks = list(fallbacks)
+        self.attempt_timeout = attempt_timeout
+        self.hedge_after = hedge_after
+        self.validate = validate
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            fallbacks=parse_fallbacks(os.getenv("GEN_FALLBACKS", ":low,gpt-5-mini:low")),
+            attempt_timeout=float(os.getenv("GEN_ATTEMPT_TIMEOUT", "420")),
+            hedge_after=float(os.getenv("GEN_HEDGE_AFTER", "180")),
+        )
+
+    def _attempt(self, client, name, request, results, metrics):
+        started = time.perf_counter()
+        try:
+            resp = client.responses.create(**request, timeout=self.attempt_timeout)
+            if metrics is not None:
+                metrics.add_usage(getattr(resp, "usage", None))
+            text = extract_text(resp)
+            outcome = "ok" if self.validate(text) else "invalid"
+        except Exception as e:
+            text, outcome = None, type(e).__name__
+        results.put((name, text if outcome == "ok" else None, outcome, time.perf_counter() - started))
+
+    def run(self, client, request: dict, metrics=None):
+        """정책에 따라 생성하고 (텍스트, 선택된 경로 이름)을 반환. 모든 경로가 실패하면 (None, None).
+
+        metrics(RunMetrics)를 넘기면 선택된 경로, 시도 내역, 걸린 시간을 span/카운터로 남깁니다.
+        """
+        steps = [("primary", request)] + [(name, {**request, **overrides}) for name, overrides in self.fallbacks]
+        results = queue.Queue()
+        running = {}  # 이름 -> 제한 시각
+        attempts = []
+        winner = None
+        launched = 0
+        next_hedge = math.inf
+        started = time.perf_counter()
+        if hasattr(client, "with_options"):
+            client = client.with_options(max_retries=0)
+        span = metrics.span("generate_policy") if metrics is not None else nullcontext({})
+        with span as attrs:
+            while winner is None:
+                now = time.perf_counter()
+                if launched < len(steps) and (not running or now >= next_hedge):
+                    name, step_request = steps[launched]
+                    running[name] = now + self.attempt_timeout
+                    threading.Thread(target=self._attempt, args=(client, name, step_request, results, metrics),
+                                     name=f"generate-{name}", daemon=True).start()
+                    launched += 1
+                    next_hedge = now + self.hedge_after if self.hedge_after > 0 else math.inf
+                    continue
+                if not running:
+                    break
+                wake = min(min(running.values()), next_hedge if launched < len(steps) else math.inf)
+                try:
+                    name, text, outcome, seconds = results.get(timeout=max(0.0, wake - now))
+                except queue.Empty:
+                    # 제한 시각을 넘긴 시도는 포기 (응답이 늦게 와도 쓰지 않음)
+                    for name, deadline in list(running.items()):
+                        if deadline <= time.perf_counter():
+                            del running[name]
+                            attempts.append(f"{name}:timeout")
+                    continue
+                if name not in running:
+                    continue
+                del running[name]
+                attempts.append(f"{name}:{outcome} {seconds:.1f}s")
+                if text is not None:
+                    winner = (name, text)
+            # 이긴 응답보다 늦은 시도는 결과를 기다리지 않음
+            attempts.extend(f"{name}:abandoned" for name in running)
+            total = time.perf_counter() - started
+            path = winner[0] if winner else None
+            attrs.update(path=path or "failed", attempts=launched, detail=", ".join(attempts))
+
+        print(f"보고서 생성 경로: {path or '실패'} ({total:.1f}s, {', '.join(attempts)})")
+        if metrics is not None:
+            metrics.incr(f"generate.path.{path or 'failed'}")
+            metrics.observe("generate_seconds", total)
+        return (winner[1], path) if winner else (None, None)
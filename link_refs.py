@@ -0,0 +1,54 @@
+import re
+
+# [텍스트](대상) 형식의 Markdown 링크
+_LINK = re.compile(r"\[([^\]]+)\]\(\s*([^)\s]+)\s*\)")
+# 링크 없이 단독으로 쓰인 [a17]
+_BARE_REF = re.compile(r"\[(a\d+)\](?!\()")
+
+REF_RULE = "- 링크에는 URL 대신 기사 목록의 기사 ID를 사용해 [핵심 키워드](a17) 형식으로 작성. 목록에 없는 ID나 URL은 쓰지 말 것."
+
+
+class LinkRefs:
+    """프롬프트의 기사 URL을 짧은 ID(a1, a2, ...)로 바꾸고 응답에서 다시 URL로 복원.
+
+    모델은 ID만 보고 쓰므로 입력/출력 토큰이 줄고, expand()는 표에 없는 링크를
+    모두 일반 텍스트로 바꾸므로 지어낸 URL이 보고서에 남지 않습니다.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self._ids = {}
+
+    def ref(self, url: str) -> str:
+        ref_id = self._ids.get(url)
+        if ref_id is None:
+            self.urls.append(url)
+            ref_id = f"a{len(self.urls)}"
+            self._ids[url] = ref_id
+        return ref_id
+
+    def url(self, ref_id: str):
+        if ref_id.startswith("a") and ref_id[1:].isdigit():
+            index = int(ref_id[1:]) - 1
+            if 0 <= index < len(self.urls):
+                return self.urls[index]
+        return None
+
+    def expand(self, md_text: str) -> str:
+        def link(match):
+            text, target = match.group(1), match.group(2)
+            url = self.url(target) or (target if target in self._ids else None)
+            return f"[{text}]({url})" if url else text
+
+        def bare(match):
+            url = self.url(match.group(1))
+            return f"[기사]({url})" if url else ""
+
+        return _BARE_REF.sub(bare, _LINK.sub(link, md_text))
+
+    def article_line(self, article) -> str:
+        """프롬프트용 기사 한 줄: '- a17: 제목 (유사 기사 N건)'"""
+        line = f"- {self.ref(article['link'])}: {article['title']}"
+        if article.get("dup_count", 1) > 1:
+            line += f" (유사 기사 {article['dup_count']}건)"
+        return line
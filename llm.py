@@ -0,0 +1,59 @@
+SYSTEM_PROMPT = "You are an expert AI trend analyst and report writer. Reply with Markdown only, no explanations."
+
+
+def extract_text(resp):
+    """Responses API 응답에서 텍스트만 추출"""
+    # 1) SDK 최신 경로
+    if hasattr(resp, "output_text") and resp.output_text:
+        return resp.output_text
+
+    # 2) 구조 파싱
+    parts = []
+    for item in getattr(resp, "output", []) or []:
+        if getattr(item, "type", None) in ("message", "text", "output_text"):
+            content = getattr(item, "content", None)
+            if isinstance(content, list):
+                for c in content:
+                    if getattr(c, "type", None) in ("text", "output_text"):
+                        parts.append(str(getattr(c, "text", "")))
+            elif content:
+                parts.append(str(content))
+    return "\n".join(p for p in parts if p).strip()
+
+
+def estimate_tokens(text: str) -> int:
+    # 토크나이저 없이 쓰는 보수적 추정치: 영어는 ~4바이트, 한국어는 ~3바이트(1글자)당 1토큰
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def stream_text(client, request: dict, on_line, on_usage=None) -> str:
+    """stream=True로 응답을 받으며 완성된 줄마다 on_line(line)을 호출하고 전체 텍스트를 반환.
+
+    on_usage를 넘기면 완료 이벤트의 토큰 사용량(usage)을 전달합니다.
+    """
+    parts = []
+    buffer = ""
+    final = None
+    for event in client.responses.create(**request, stream=True):
+        kind = getattr(event, "type", "")
+        if kind == "response.output_text.delta":
+            parts.append(event.delta)
+            buffer += event.delta
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                on_line(line)
+        elif kind == "response.completed":
+            final = getattr(event, "response", None)
+            if on_usage is not None:
+                on_usage(getattr(final, "usage", None))
+        elif kind in ("response.failed", "error"):
+            raise RuntimeError(f"스트리밍 응답 오류: {event!r}")
+    if buffer:
+        on_line(buffer)
+    text = "".join(parts).strip()
+    if not text and final is not None:
+        # delta 이벤트 없이 완료된 경우 최종 응답에서 추출
+        text = extract_text(final)
+        for line in text.splitlines():
+            on_line(line)
+    return text
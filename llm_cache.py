@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import time
+
+DEFAULT_DIR = os.getenv("LLM_CACHE_DIR", ".cache/llm")
+
+
+class ResponseCache:
+    """모델/파라미터/프롬프트 해시를 키로 LLM 응답 텍스트를 저장하는 디스크 캐시.
+
+    같은 요청으로 재실행하면 API를 다시 호출하지 않고 저장된 응답을 돌려줍니다.
+    저장한 지(created) ttl_hours가 지난 항목과, 전체 크기가 max_bytes를 넘을 때
+    오래 쓰지 않은(파일 mtime) 항목부터 지웁니다. 읽을 때 mtime을 갱신해도 만료 시각은 늘어나지 않습니다.
+    bypass=True면 캐시를 읽지 않고 새로 받은 응답으로 덮어씁니다.
+    """
+
+    def __init__(self, path: str = DEFAULT_DIR, ttl_hours: float = 72, max_bytes: int = 50 * 1024 * 1024,
+                 bypass: bool = False):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        os.makedirs(path, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            ttl_hours=float(os.getenv("LLM_CACHE_TTL_HOURS", "72")),
+            bypass=os.getenv("LLM_CACHE_BYPASS", "").lower() in ("1", "true", "yes"),
+        )
+
+    @staticmethod
+    def key(request: dict) -> str:
+        raw = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    @staticmethod
+    def _load(path: str):
+        """(저장 시각, 항목). created가 없는 예전 항목은 mtime을 저장 시각으로 봄"""
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+        return entry.get("created") or os.path.getmtime(path), entry
+
+    def get(self, request: dict):
+        if self.bypass:
+            return None
+        path = self._file(self.key(request))
+        try:
+            created, entry = self._load(path)
+            if time.time() - created > self.ttl:
+                os.remove(path)
+                return None
+            text = entry["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(path)  # 최근 사용 시각 갱신 (크기 기준 정리 시 LRU 순서)
+        return text
+
+    def put(self, request: dict, text: str):
+        path = self._file(self.key(request))
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": request.get("model"), "created": time.time(), "text": text}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self):
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.path, name)
+            try:
+                st = os.stat(path)
+                created, _ = self._load(path)
+            except (OSError, ValueError):
+                continue
+            if now - created > self.ttl:
+                os.remove(path)
+            else:
+                entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
@@ -0,0 +1,378 @@
+import base64
+import queue
+import quopri
+import random
+import smtplib
+import threading
+import time
+import uuid
+from email.policy import SMTP as SMTP_POLICY
+
+from service_guard import CircuitOpenError, ServiceGuard, get_guard
+
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 465
+
+# 세션이 끊겼다고 보고 새로 연결해야 하는 오류
+_RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class _Session:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+
+
+class SMTPPool:
+    """로그인된 SMTP 세션을 재사용하는 연결 풀.
+
+    세션마다 최대 max_per_conn 통까지 연속 발송하고, 한도에 도달하거나
+    서버가 연결을 끊으면 새 세션으로 교체합니다. 스레드 간 공유가 가능합니다.
+    """
+
+    def __init__(self, user, password, host=SMTP_HOST, port=SMTP_PORT,
+                 size: int = 3, max_per_conn: int = 100, timeout: float = 30):
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+        self.max_per_conn = max_per_conn
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _connect(self) -> _Session:
+        smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.login(self.user, self.password)
+        except Exception:
+            _quit(smtp)
+            raise
+        return _Session(smtp)
+
+    def _acquire(self) -> _Session:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, session, reuse: bool):
+        if reuse and not self._closed and session.sent < self.max_per_conn:
+            self._idle.put(session)
+        else:
+            _quit(session.smtp)
+        self._slots.release()
+
+    def _deliver(self, session, msg, from_addr, to_addrs):
+        if isinstance(msg, (bytes, str)):
+            session.smtp.sendmail(from_addr or self.user, to_addrs, msg)
+        else:
+            session.smtp.send_message(msg, from_addr, to_addrs)
+        session.sent += 1
+
+    def send(self, msg, from_addr=None, to_addrs=None):
+        """메시지 1통 발송. EmailMessage 또는 직렬화된 bytes(이 경우 to_addrs 필수)를 받습니다."""
+        if self._closed:
+            raise RuntimeError("SMTPPool이 이미 닫혔습니다.")
+        session = self._acquire()
+        try:
+            try:
+                self._deliver(session, msg, from_addr, to_addrs)
+            except _RECONNECT_ERRORS:
+                # 유휴 중 끊긴 세션일 수 있으므로 새 세션으로 한 번만 재시도
+                _quit(session.smtp)
+                session.sent = self.max_per_conn  # 재연결 실패 시 풀에 되돌리지 않도록
+                session = self._connect()
+                self._deliver(session, msg, from_addr, to_addrs)
+        except _RECONNECT_ERRORS:
+            self._release(session, reuse=False)
+            raise
+        except smtplib.SMTPResponseException as e:
+            # 수신자/본문 단위 거절은 세션을 그대로 재사용, 421은 서버가 연결을 닫는 응답
+            self._release(session, reuse=e.smtp_code != 421)
+            raise
+        except smtplib.SMTPRecipientsRefused:
+            self._release(session, reuse=True)
+            raise
+        except Exception:
+            self._release(session, reuse=False)
+            raise
+        self._release(session, reuse=True)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            _quit(session.smtp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _quit(smtp):
+    try:
+        smtp.quit()
+    except Exception:
+        try:
+            smtp.close()
+        except Exception:
+            pass
+
+
+# --- 사전 렌더링된 메시지 템플릿 ---
+def _header(name: str, value: str) -> bytes:
+    # RFC 2047 인코딩/줄바꿈 접기 + CR/LF 헤더 주입 차단
+    _, header = SMTP_POLICY.header_store_parse(name, value)
+    return header.fold(policy=SMTP_POLICY).encode("ascii")
+
+
+def _qp(text: str) -> bytes:
+    data = text.replace("\r\n", "\n").encode("utf-8")
+    return quopri.encodestring(data).replace(b"\n", b"\r\n")
+
+
+def _b64(text: str, pad: bool = False) -> bytes:
+    data = text.replace("\r\n", "\n").replace("\n", "\r\n").encode("utf-8")
+    if pad:
+        # 3바이트 단위로 맞춰 두면 패딩(=) 없이 끝나므로 뒤에 푸터를 따로 인코딩해 이어 붙일 수 있음
+        data += b" " * (-len(data) % 3)
+    return base64.encodebytes(data).replace(b"\n", b"\r\n")
+
+
+def _encoder(body: str):
+    """본문을 더 짧게 인코딩하는 방식 (한글 위주면 base64가 quoted-printable의 절반 이하)"""
+    qp, b64 = _qp(body), _b64(body, pad=True)
+    if len(b64) < len(qp):
+        return "base64", b64, _b64
+    return "quoted-printable", qp, _qp
+
+
+class MessageTemplate:
+    """수신자와 무관한 부분을 한 번만 직렬화해 두는 multipart/alternative 메시지.
+
+    본문 텍스트/HTML은 생성 시 한 번만 인코딩하고, render()는 수신자별
+    To / List-Unsubscribe 헤더와 두 파트의 푸터만 같은 방식으로 인코딩해 이어 붙입니다.
+    파트마다 quoted-printable과 base64 중 짧은 쪽을 씁니다. quoted-printable은 줄 단위 인코딩이라
+    본문을 줄바꿈으로 끝내면, base64는 본문을 3바이트 단위로 맞추면 그대로 연결할 수 있습니다.
+    """
+
+    def __init__(self, subject: str, from_addr: str, html_body: str, text_body: str):
+        self.from_addr = from_addr
+        boundary = f"=_{uuid.uuid4().hex}"
+        if not html_body.endswith("\n"):
+            html_body += "\n"
+        if not text_body.endswith("\n"):
+            text_body += "\n"
+        text_cte, text_encoded, self._text_encode = _encoder(text_body)
+        html_cte, html_encoded, self._html_encode = _encoder(html_body)
+        self._head = b"".join([
+            _header("Subject", subject),
+            _header("From", from_addr),
+        ])
+        self._body_head = b"".join([
+            _header("List-Unsubscribe-Post", "List-Unsubscribe=One-Click"),
+            b"MIME-Version: 1.0\r\n",
+            f'Content-Type: multipart/alternative; boundary="{boundary}"\r\n\r\n'.encode("ascii"),
+            f"--{boundary}\r\n".encode("ascii"),
+            b'Content-Type: text/plain; charset="utf-8"\r\n',
+            f"Content-Transfer-Encoding: {text_cte}\r\n\r\n".encode("ascii"),
+            text_encoded,
+        ])
+        self._html_head = b"".join([
+            f"--{boundary}\r\n".encode("ascii"),
+            b'Content-Type: text/html; charset="utf-8"\r\n',
+            f"Content-Transfer-Encoding: {html_cte}\r\n\r\n".encode("ascii"),
+            html_encoded,
+        ])
+        self._tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+
+    def render(self, to_email: str, unsub_url: str, footer_html: str, footer_text: str = "") -> bytes:
+        """수신자별 헤더와 푸터를 채운 완성 메시지(bytes)"""
+        if footer_text and not footer_text.endswith("\n"):
+            footer_text += "\n"
+        return b"".join([
+            self._head,
+            _header("To", to_email),
+            _header("List-Unsubscribe", f"<{unsub_url}>"),
+            self._body_head,
+            self._text_encode(footer_text),
+            self._html_head,
+            self._html_encode(footer_html),
+            self._tail,
+        ])
+
+
+# --- 동시 발송 스케줄러 ---
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class DeliveryReport:
+    """발송 결과 집계. results는 (이메일, 상태, 오류, 시도 횟수) 목록"""
+
+    def __init__(self):
+        self.results = []
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+        self.source_error = None
+        self._lock = threading.Lock()
+
+    def add(self, email, status, error=None, attempts=1):
+        with self._lock:
+            self.results.append((email, status, error, attempts))
+
+    def count(self, status) -> int:
+        return sum(1 for r in self.results if r[1] == status)
+
+    def failures(self):
+        return [(r[0], r[2]) for r in self.results if r[1] == "failed"]
+
+    def summary(self) -> str:
+        sent = self.count("sent")
+        rate = sent / self.elapsed if self.elapsed else 0.0
+        text = (f"발송 완료: 성공 {sent} / 실패 {self.count('failed')} / 보류 {self.count('deferred')} "
+                f"({self.elapsed:.1f}s, {rate:.1f}통/s)")
+        if self.source_error is not None:
+            text += f" - 수신자 조회 중단: {self.source_error!r}"
+        return text
+
+
+class DeliveryScheduler:
+    """구독자 발송을 여러 스레드로 나눠 처리하는 스케줄러.
+
+    send(recipient)를 worker 스레드에서 SMTP용 ServiceGuard(동시 발송 수 AIMD 조절, 차단기)를 거쳐
+    호출하고, 초당/일일 토큰 버킷으로 발송 속도를 제한합니다. 421/450/454 응답을 받으면 발송 속도를
+    절반으로 줄이고, 일시적 오류와 함께 무작위 지수 백오프 후 재시도하며, 이후 성공이 이어지면
+    원래 속도로 서서히 복구합니다. 차단기가 열려 있으면 half-open이 될 때까지 기다렸다가 같은 수신자로
+    다시 시도하고, 한 수신자에 대해 기다린 시간이 모두 max_breaker_wait초를 넘으면 실패로 기록합니다.
+    """
+
+    def __init__(self, send, workers: int = 4, per_second: float = 5.0, per_day: int = None,
+                 max_retries: int = 3, backoff: float = 5.0, guard: ServiceGuard = None,
+                 max_breaker_wait: float = 120.0):
+        self.send = send
+        self.guard = guard or get_guard("smtp")
+        self.workers = max(1, workers)
+        self.per_second = per_second
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_breaker_wait = max_breaker_wait
+        self._rate = TokenBucket(per_second)
+        self._daily = TokenBucket(per_day / 86400, capacity=per_day) if per_day else None
+        self._lock = threading.Lock()
+
+    def _slow_down(self):
+        with self._lock:
+            self._rate.rate = max(self.per_second / 16, self._rate.rate / 2)
+
+    def _speed_up(self):
+        with self._lock:
+            if self._rate.rate < self.per_second:
+                self._rate.rate = min(self.per_second, self._rate.rate + self.per_second / 20)
+
+    def _deliver(self, recipient, report):
+        email = recipient.get("email") if isinstance(recipient, dict) else recipient
+        if self._daily is not None and not self._daily.try_acquire():
+            report.add(email, "deferred", "일일 발송 한도 초과", 0)
+            return
+        attempt = 0
+        waited = 0.0
+        while True:
+            attempt += 1
+            self._rate.acquire()
+            try:
+                self.guard.attempt(self.send, recipient)
+            except CircuitOpenError as e:
+                # 보내지 못한 시도는 세지 않고, half-open(다른 worker가 시험 중이면 잠시 뒤)까지 기다렸다가 다시 시도
+                attempt -= 1
+                breaker = self.guard.breaker
+                wait = max(breaker.remaining(), min(1.0, breaker.reset_timeout)) * random.uniform(1.0, 1.1)
+                if waited + wait > self.max_breaker_wait:
+                    report.add(email, "failed", f"{e!r} ({waited:.0f}초 대기 후 포기)", attempt)
+                    return
+                waited += wait
+                time.sleep(wait)
+                continue
+            except Exception as e:
+                kind = self.guard.classify(e)
+                if kind is None or attempt > self.max_retries:
+                    report.add(email, "failed", repr(e), attempt)
+                    return
+                if kind == "throttle":
+                    self._slow_down()
+                time.sleep(self.guard.delay(attempt, e, base=self.backoff))
+                continue
+            self._speed_up()
+            report.add(email, "sent", None, attempt)
+            return
+
+    def run(self, recipients) -> DeliveryReport:
+        report = DeliveryReport()
+        source = iter(recipients)
+        source_lock = threading.Lock()
+
+        def worker():
+            while True:
+                with source_lock:
+                    try:
+                        recipient = next(source, None)
+                    except Exception as e:
+                        # 수신자 공급(조회) 실패 시 남은 발송을 멈추고 결과에 기록
+                        report.source_error = e
+                        recipient = None
+                if recipient is None:
+                    return
+                self._deliver(recipient, report)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        report.elapsed = time.monotonic() - report.started
+        return report
@@ -1,52 +1,86 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
 import os
-import json
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from openai import OpenAI
-from notion_client import Client as NotionClient
-import re
-import smtplib
-from email.message import EmailMessage
-import markdown
+from clients import check_import_budget, get_supabase
+from article_mirror import ArticleMirror
+import openai_batch
+from daily_digest import ROLLUP_LABEL, load_daily_digests, render_digests
+from link_refs import LinkRefs, REF_RULE
+from llm import SYSTEM_PROMPT
+from generation_policy import GenerationPolicy
+from llm_cache import ResponseCache
+from report_flow import ReportFlow, SubscriberDelivery, report_footer
+from run_metrics import RunMetrics
+from topics import DIGEST_LABEL, build_digest
 
 # 환경 변수 로드
 load_dotenv()
+check_import_budget(_IMPORT_STARTED)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")  # 권장: Service Role Key
-NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-EMAIL_SENDER = os.getenv("EMAIL_SENDER")
-EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
-
-# Edge Function(텍스트 응답)과 연동되는 구독/해지 URL
-UNSUB_BASE = "https://corocmnneqzimohtrhuf.supabase.co/functions/v1/unsubscribe"
-SUB_BASE   = "https://corocmnneqzimohtrhuf.supabase.co/functions/v1/subscribe"
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
-notion_client = NotionClient(auth=NOTION_TOKEN)
-
-def get_subscribers():
-    """구독자 목록(이메일+토큰) 조회"""
-    resp = supabase.table("subscribers").select("email, token").eq("subscribed", True).execute()
-    return resp.data or []
-
+# 1이면 LLM 응답을 스트리밍으로 받아 Notion 페이지를 생성과 동시에 작성
+NOTION_STREAMING = os.getenv("NOTION_STREAMING", "").lower() in ("1", "true", "yes")
+# 1이면 기사 목록을 토픽별로 묶고 기업별 언급 수를 붙여 프롬프트에 넣음 (NumPy 필요, 프롬프트 형태가 바뀌므로 기본은 끔)
+TOPIC_DIGEST = os.getenv("TOPIC_DIGEST", "").lower() in ("1", "true", "yes")
+# 1이면 원본 기사 대신 일간 실행이 저장한 일별 요약으로 보고서를 작성 (요약이 없는 날만 기사 원본 사용, 기본은 끔)
+ROLLUP_DIGESTS = os.getenv("ROLLUP_DIGESTS", "").lower() in ("1", "true", "yes")
+# OPENAI_BATCH에 weekly(또는 1)가 있으면 보고서 요청을 Batch API로 제출하고, 결과는 다음 실행에서 게시/발송
+OPENAI_BATCH = openai_batch.enabled("weekly")
+# 1이면 새 보고서는 시작하지 않고 제출해 둔 batch의 결과만 확인 (주기적 확인 워크플로용)
+OPENAI_BATCH_POLL = os.getenv("OPENAI_BATCH_POLL", "").lower() in ("1", "true", "yes")
+# 1이면 이번 기간의 체크포인트(보고서/Notion URL/발송 기록)를 지우고 처음부터 실행
+CHECKPOINT_RESET = os.getenv("CHECKPOINT_RESET", "").lower() in ("1", "true", "yes")
+
+REPORT_FOOTER = report_footer("1주일")
+
+# Supabase/OpenAI/Notion 클라이언트는 clients의 get_*()로 처음 쓸 때 생성 (기사가 없는 날은 SDK를 로드하지 않음)
+# LLM 응답 디스크 캐시 (LLM_CACHE_BYPASS=1 이면 캐시를 읽지 않음)
+llm_cache = ResponseCache.from_env()
+# 보고서 생성 지연 SLO (GEN_ATTEMPT_TIMEOUT, GEN_HEDGE_AFTER, GEN_FALLBACKS로 조정)
+gen_policy = GenerationPolicy.from_env()
+# 단계별 시간/토큰/발송 바이트 기록 (실행이 끝나면 runs/에 JSON으로 저장)
+metrics = RunMetrics("weekly")
+# 구독자 발송 (SEND_WORKERS, SEND_RATE_PER_SEC, SEND_DAILY_LIMIT, SUBSCRIBER_PAGE_SIZE로 조정)
+delivery = SubscriberDelivery.from_env(
+    metrics, ["안녕하세요,", "주간 AI 트렌드 분석 보고서가 생성되었습니다."], subject="[주간 AI 트렌드] {title}",
+)
+
+@metrics.timed("get_recent_articles")
 def get_recent_articles():
-    """최근 7일 기사"""
+    """최근 7일 기사 (로컬 미러를 증분 동기화한 뒤 조회)"""
     one_week_ago = datetime.now() - timedelta(days=7)
-    response = (
-        supabase.table("articles")
-        .select("title, link")
-        .gte("created_at", one_week_ago.isoformat() + "Z")
-        .execute()
-    )
-    return response.data if response.data else []
-
-def generate_ai_trend_report_with_gpt(articles):
-    article_list_str = "\n".join([f"- [{a['title']}]({a['link']})" for a in articles])
+    mirror = ArticleMirror()
+    try:
+        mirror.sync(get_supabase(), since=one_week_ago)
+        return mirror.recent(one_week_ago)
+    finally:
+        mirror.close()
+
+@metrics.timed("get_daily_digests")
+def get_daily_digests():
+    """최근 7일의 일별 요약 (일간 실행이 저장한 요약이 없는 날만 로컬 미러의 기사로 만듦)"""
+    return load_daily_digests(7, lambda: ArticleMirror(), lambda: get_supabase(), metrics)
+
+def build_report_request(articles, digests=None):
+    """보고서 생성 요청(Responses API 파라미터)과 기사 링크 표(LinkRefs)를 만듦.
+
+    digests([(날짜, 일별 요약), ...])를 넘기면 기사 목록 대신 일별 요약으로 작성합니다.
+    """
+    # URL 대신 짧은 기사 ID로 전달하고, 중복 제거 단계에서 묶인 기사 수를 함께 표시
+    refs = LinkRefs()
+    # 비슷한 기사를 토픽으로 미리 묶어 두면 모델이 분류에 쓰는 추론 토큰이 줄어듦
+    digest = build_digest(articles, refs) if TOPIC_DIGEST and not digests else None
+    if digests:
+        article_list_str = render_digests(digests, refs, max_topics=6, per_topic=2)
+        list_label = ROLLUP_LABEL
+    elif digest:
+        article_list_str = digest
+        list_label = DIGEST_LABEL
+    else:
+        article_list_str = "\n".join([refs.article_line(a) for a in articles])
+        list_label = "기사 목록 (\"유사 기사 N건\"은 같은 소식을 다룬 기사 수)"
 
     prompt = f"""
 당신의 역할:
@@ -90,240 +124,46 @@ google, Microsoft, OpenAI 등 주요 기업의 최근 동향을 포함해 주세
 
 **출력 규칙**:
 - 최종 보고서 전체 분량은 공백 포함 2000자 이내로 작성.
+{REF_RULE}
 
-기사 목록:
+{list_label}:
 {article_list_str}
 
 주간 AI 트렌드 분석 보고서:
 """
 
-    def _extract_text(resp):
-        if hasattr(resp, "output_text") and resp.output_text:
-            return resp.output_text
-        parts = []
-        for item in getattr(resp, "output", []) or []:
-            if getattr(item, "type", None) in ("message", "text", "output_text"):
-                content = getattr(item, "content", None)
-                if isinstance(content, list):
-                    for c in content:
-                        if getattr(c, "type", None) in ("text", "output_text"):
-                            parts.append(str(getattr(c, "text", "")))
-                elif content:
-                    parts.append(str(content))
-        return "\n".join(p for p in parts if p).strip()
-
-    try:
-        resp = openai_client.responses.create(
-            model="gpt-5",
-            input=[
-                {"role": "system", "content": "You are an expert AI trend analyst and report writer. Reply with Markdown only, no explanations."},
-                {"role": "user", "content": prompt},
-            ],
-            max_output_tokens=10000,
-            reasoning={"effort": "medium"},
-        )
-        text = _extract_text(resp)
-        if not text:
-            print("DEBUG raw response:", resp)
-            return None
-        return text
-    except Exception as e:
-        import traceback
-        print("ChatGPT API 호출 오류:", repr(e))
-        traceback.print_exc()
-        return None
-
-# --- Notion 변환 유틸 (그대로 사용) ---
-def parse_rich_text(text: str):
-    # Markdown 링크 및 bold 텍스트를 함께 처리
-    link_pattern = r'\[([^\]]+)\]\((https?://[^\)]+)\)'
-    bold_pattern = r'\*\*([^\*]+)\*\*'
-    segments = []
-    last_end = 0
-
-    # 링크 우선 처리
-    for match in re.finditer(link_pattern, text):
-        start, end = match.span()
-
-        # 이전 일반 텍스트 (굵게 포함 가능)
-        if start > last_end:
-            interim_text = text[last_end:start]
-            segments.extend(process_text_styles(interim_text))
-
-        # 링크 추가
-        link_text = match.group(1)
-        link_url = match.group(2)
-        segments.append({
-            "type": "text",
-            "text": {"content": link_text, "link": {"url": link_url}},
-            "annotations": {"bold": False}
-        })
-
-        last_end = end
-
-    # 남은 텍스트 처리
-    if last_end < len(text):
-        segments.extend(process_text_styles(text[last_end:]))
-
-    return segments
-
-def process_text_styles(text: str):
-    segments = []
-    last_end = 0
-
-    # **굵게** 또는 *기울임* 모두 처리
-    pattern = r'(\*\*.*?\*\*|\*.*?\*)'
-    for match in re.finditer(pattern, text):
-        start, end = match.span()
-        if start > last_end:
-            segments.append({
-                "type": "text",
-                "text": {"content": text[last_end:start]},
-                "annotations": {"bold": False, "italic": False}
-            })
-
-        content = match.group(0)
-        clean_content = content.strip('*')
-        is_bold = content.startswith('**')
-        is_italic = not is_bold  # 간단한 처리
-
-        segments.append({
-            "type": "text",
-            "text": {"content": clean_content},
-            "annotations": {"bold": is_bold, "italic": is_italic}
-        })
-
-        last_end = end
-
-    if last_end < len(text):
-        segments.append({
-            "type": "text",
-            "text": {"content": text[last_end:]},
-            "annotations": {"bold": False, "italic": False}
-        })
-
-    return segments
-
-def markdown_to_notion_blocks(md_text: str):
-    lines = md_text.splitlines()
-    blocks = []
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        if line == "---":
-            blocks.append({"object": "block", "type": "divider", "divider": {}})
-        elif line.startswith("### "):
-            blocks.append({"object": "block", "type": "heading_3", "heading_3": {"rich_text": parse_rich_text(line[4:])}})
-        elif line.startswith("## "):
-            blocks.append({"object": "block", "type": "heading_2", "heading_2": {"rich_text": parse_rich_text(line[3:])}})
-        elif line.startswith("# "):
-            blocks.append({"object": "block", "type": "heading_1", "heading_1": {"rich_text": parse_rich_text(line[2:])}})
-        elif line.startswith("- "):
-            blocks.append({"object": "block", "type": "bulleted_list_item", "bulleted_list_item": {"rich_text": parse_rich_text(line[2:])}})
-        else:
-            blocks.append({"object": "block", "type": "paragraph", "paragraph": {"rich_text": parse_rich_text(line)}})
-    return blocks
-
-def create_notion_page(title, content):
-    try:
-        children = markdown_to_notion_blocks(content)
-        response = notion_client.pages.create(
-            parent={"database_id": NOTION_DATABASE_ID},
-            properties={"제목": {"title": [{"text": {"content": title}}]}},
-            children=children
-        )
-        return response["url"]
-    except Exception as e:
-        print(f"Notion 페이지 생성 오류: {e}")
-        return None
-
-# --- 이메일 발송(구독자별) ---
-def build_footer(unsub_url: str, sub_url: str):
-    return f"""
-<hr>
-<p style="font-size:12px;color:#666">
-  이 메일은 구독자에게 발송되었습니다.
-  <a href="{sub_url}">구독하기</a> · <a href="{unsub_url}">구독취소</a>
-</p>"""
-
-def send_one(subject: str, html_body: str, to_email: str, token: str):
-    unsub_url = f"{UNSUB_BASE}?token={token}"
-    resub_url = f"{SUB_BASE}?token={token}"
-    full_html = html_body + build_footer(unsub_url, resub_url)
-
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = EMAIL_SENDER
-    msg["To"] = to_email
-    msg["List-Unsubscribe"] = f"<{unsub_url}>"
-    msg["List-Unsubscribe-Post"] = "List-Unsubscribe=One-Click"
-    msg.set_content("HTML email")
-    msg.add_alternative(full_html, subtype="html")
-
-    with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-        smtp.login(EMAIL_SENDER, EMAIL_PASSWORD)
-        smtp.send_message(msg)
+    request = {
+        "model": "gpt-5",
+        "input": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        "max_output_tokens": 10000,
+        "reasoning": {"effort": "medium"},
+    }
+    return request, refs
+
+flow = ReportFlow(
+    "weekly", metrics, llm_cache, gen_policy,
+    build_request=build_report_request,
+    fetch_articles=get_recent_articles,
+    fetch_digests=get_daily_digests if ROLLUP_DIGESTS else None,
+    send_report=delivery,
+    footer=REPORT_FOOTER,
+    database_id=NOTION_DATABASE_ID,
+    period="최근 7일",
+    streaming=NOTION_STREAMING,
+    batch=OPENAI_BATCH,
+    batch_poll=OPENAI_BATCH_POLL,
+    reset=CHECKPOINT_RESET,
+)
+
+def main():
+    # 주간 제목(오늘 기준 주차 끝일자 표기). Batch 결과를 기다리는 기간이 있으면 날짜가 바뀌었어도 그 기간을 이어서 처리
+    flow.run(f"주간 AI 트렌드 분석 보고서 ({(datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')})")
 
 if __name__ == "__main__":
-    print("Supabase에서 최근 7일 기사 제목과 링크를 가져옵니다...")
-    articles = get_recent_articles()
-
-    if not articles:
-        print("새로운 기사가 없습니다.")
-    else:
-        print(f"{len(articles)}개의 기사를 찾았습니다. ChatGPT로 보고서 생성을 시작합니다...")
-        report_content = generate_ai_trend_report_with_gpt(articles)
-
-        if report_content:
-            report_content += (
-                "\n\n---\n\n"
-                "본 보고서는 국내외 주요 AI 전문 언론사의 최근 1주일 기사 내용을 기반으로 **ChatGPT**가 종합·작성한 자료입니다.\n"
-                "*(국내: AI TIMES, Mirakle AI, 로봇신문 / 해외: MIT Technology Review, The Verge, VentureBeat, Techcrunch)*"
-            )
-
-            # 주간 제목(오늘 기준 주차 끝일자 표기)
-            page_title = f"주간 AI 트렌드 분석 보고서 ({(datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')})"
-            print("보고서 생성 완료. Notion 페이지를 생성합니다...")
-            notion_url = create_notion_page(page_title, report_content)
-
-            if notion_url:
-                print(f"Notion 페이지 생성 완료: {notion_url}")
-                html_report_content = markdown.markdown(report_content)
-                email_body = f"""<html>
-<head>
-  <meta charset="utf-8">
-  <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;700&display=swap');
-    body {{ font-family: 'Inter', sans-serif; }}
-  </style>
-</head>
-<body>
-  <p>안녕하세요,</p>
-  <p>주간 AI 트렌드 분석 보고서가 생성되었습니다.</p>
-  <p><a href="{notion_url}">Notion 링크</a></p>
-  {html_report_content}
-</body>
-</html>"""
-
-                subs = get_subscribers()
-                if not subs:
-                    print("구독자가 없습니다.")
-                else:
-                    for s in subs:
-                        try:
-                            if not s.get("email") or not s.get("token"):
-                                print(f"스킵: 잘못된 레코드 {s}")
-                                continue
-                            send_one(
-                                subject=f"[주간 AI 트렌드] {page_title}",
-                                html_body=email_body,
-                                to_email=s["email"],
-                                token=s["token"],
-                            )
-                        except Exception as e:
-                            print(f"발송 실패({s.get('email')}): {e}")
-            else:
-                print("Notion 페이지 생성에 실패했습니다.")
-        else:
-            print("ChatGPT 보고서 생성에 실패했습니다.")
+    try:
+        main()
+    finally:
+        metrics.write()
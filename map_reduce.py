@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from llm import SYSTEM_PROMPT, estimate_tokens, extract_text
+
+MAP_PROMPT = """다음은 AI 관련 뉴스 제목과 기사 ID 목록의 일부({index}/{total})입니다.
+이 목록에서 중요한 소식을 주제별로 묶어 불릿으로 요약해 주세요.
+
+규칙:
+- 불릿 하나에 한 가지 소식(또는 같은 주제의 여러 소식)을 한 문장으로 요약.
+- 각 불릿의 핵심 키워드에는 목록의 기사 ID를 그대로 사용해 [키워드](a17) 형식으로 링크를 남겨 주세요.
+- 기업명(google, Microsoft, OpenAI, meta 등)과 새 기술/제품/모델 이름은 빠뜨리지 마세요.
+- 중요도가 낮은 소식은 생략해도 됩니다. 불릿은 최대 {max_bullets}개.
+
+기사 목록:
+{articles}
+"""
+
+
+def chunk_lines(lines, max_tokens: int):
+    """줄 목록을 추정 토큰 수가 max_tokens를 넘지 않는 덩어리로 나눔"""
+    chunks, current, used = [], [], 0
+    for line in lines:
+        cost = estimate_tokens(line)
+        if current and used + cost > max_tokens:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(line)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def summarize_chunks(client, lines, chunk_tokens: int = 6000, model: str = "gpt-5-mini",
+                     workers: int = 8, max_bullets: int = 15, cache=None, on_usage=None) -> str:
+    """map 단계: 덩어리별 요약을 병렬로 만들고 최종(reduce) 프롬프트에 넣을 텍스트로 합침.
+
+    요약에 실패한 덩어리는 원본 줄을 그대로 넘겨 최종 보고서에서 빠지지 않도록 합니다.
+    cache(ResponseCache)를 넘기면 같은 덩어리의 요약은 재실행 시 다시 호출하지 않습니다.
+    on_usage를 넘기면 호출마다 응답의 토큰 사용량(usage)을 전달합니다.
+    """
+    chunks = chunk_lines(lines, chunk_tokens)
+
+    def summarize(index, chunk):
+        prompt = MAP_PROMPT.format(index=index, total=len(chunks), max_bullets=max_bullets,
+                                   articles="\n".join(chunk))
+        request = {
+            "model": model,
+            "input": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "max_output_tokens": 4000,
+            "reasoning": {"effort": "low"},
+        }
+        try:
+            text = cache.get(request) if cache is not None else None
+            if text:
+                return text
+            resp = client.responses.create(**request)
+            if on_usage is not None:
+                on_usage(getattr(resp, "usage", None))
+            text = extract_text(resp)
+            if text:
+                if cache is not None:
+                    cache.put(request, text)
+                return text
+            print(f"부분 요약 {index}/{len(chunks)}: 빈 응답, 원본 목록을 사용합니다.")
+        except Exception as e:
+            print(f"부분 요약 {index}/{len(chunks)} 실패, 원본 목록을 사용합니다: {e!r}")
+        return "\n".join(chunk)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as pool:
+        summaries = list(pool.map(summarize, range(1, len(chunks) + 1), chunks))
+    return "\n\n".join(f"[부분 요약 {i}]\n{s}" for i, s in enumerate(summaries, 1))
@@ -0,0 +1,70 @@
+import re
+from collections import namedtuple
+
+# 보고서 Markdown을 한 번만 파싱해 만든 중간 문서 트리.
+# Node.kind는 Notion 블록 종류 이름을 그대로 씀: heading_1~3, bulleted_list_item, paragraph, divider
+Node = namedtuple("Node", "kind spans")
+Span = namedtuple("Span", "text bold italic code url")
+
+# 인라인 문법을 한 번에 훑는 단일 정규식.
+# 각 분기는 다음 구분 문자(`, [, ], *)에서 멈추므로 백트래킹 없이 줄 길이에 선형으로 동작합니다.
+# 굵게 분기만 **a *b* c**처럼 안쪽의 *기울임* 한 쌍을 건너뛰어 닫는 **까지 읽습니다.
+_INLINE = re.compile(r"""
+    `(?P<code>[^`]+)`
+  | \[(?P<label>[^\[\]]+)\]\((?P<url>https?://[^)\s]+)\)
+  | \*\*(?P<bold>(?:[^*]|\*[^*]+\*)+)\*\*
+  | \*(?!\s)(?P<italic>[^*]+)(?<!\s)\*
+""", re.X)
+
+_PREFIXES = (
+    ("### ", "heading_3"),
+    ("## ", "heading_2"),
+    ("# ", "heading_1"),
+    ("- ", "bulleted_list_item"),
+)
+
+
+def _tokenize(text, out, bold=False, italic=False):
+    last = 0
+    for m in _INLINE.finditer(text):
+        start = m.start()
+        if start > last:
+            out.append(Span(text[last:start], bold, italic, False, None))
+        kind = m.lastgroup
+        if kind == "code":
+            out.append(Span(m.group("code"), bold, italic, True, None))
+        elif kind == "url":
+            out.append(Span(m.group("label"), bold, italic, False, m.group("url")))
+        elif kind == "bold":
+            # **[키워드](URL)**, **a *b* c** 처럼 굵게 안의 링크/기울임도 유지
+            _tokenize(m.group("bold"), out, True, italic)
+        else:
+            _tokenize(m.group("italic"), out, bold, True)
+        last = m.end()
+    if last < len(text):
+        out.append(Span(text[last:], bold, italic, False, None))
+    return out
+
+
+def parse_inline(text: str):
+    """한 줄의 Markdown 인라인(링크, **굵게**, *기울임*, `코드`)을 Span 목록으로 변환"""
+    return _tokenize(text, [])
+
+
+def parse_markdown(md_text: str):
+    """보고서 Markdown을 Node 목록으로 변환 (빈 줄은 버리고 한 줄이 블록 하나)"""
+    doc = []
+    for line in md_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line == "---":
+            doc.append(Node("divider", []))
+            continue
+        for prefix, kind in _PREFIXES:
+            if line.startswith(prefix):
+                doc.append(Node(kind, parse_inline(line[len(prefix):])))
+                break
+        else:
+            doc.append(Node("paragraph", parse_inline(line)))
+    return doc
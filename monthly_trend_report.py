@@ -1,40 +1,111 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
 import os
-import json
-from datetime import datetime, timedelta
+from datetime import datetime
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from openai import OpenAI
-from notion_client import Client as NotionClient
-import re
+from clients import check_import_budget, get_openai, get_supabase
 import smtplib
-from email.mime.text import MIMEText
-import markdown
+from email.message import EmailMessage
+from article_mirror import ArticleMirror
+import openai_batch
+from daily_digest import ROLLUP_LABEL, load_daily_digests, render_digests
+from link_refs import LinkRefs, REF_RULE
+from generation_policy import GenerationPolicy
+from llm_cache import ResponseCache
+from llm import SYSTEM_PROMPT, estimate_tokens
+from map_reduce import summarize_chunks
+from report_flow import ReportFlow, report_footer
+from report_html import email_parts
+from run_metrics import RunMetrics
+from service_guard import get_guard
+from topics import DIGEST_LABEL, build_digest
 from dateutil.relativedelta import relativedelta  # NEW
 
 # 환경 변수 로드
 load_dotenv()
+check_import_budget(_IMPORT_STARTED)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 EMAIL_SENDER = os.getenv("EMAIL_SENDER")
 EMAIL_RECIPIENT = os.getenv("EMAIL_RECIPIENT") # This will now contain comma-separated emails
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
-notion_client = NotionClient(auth=NOTION_TOKEN)
-
+# 1이면 LLM 응답을 스트리밍으로 받아 Notion 페이지를 생성과 동시에 작성
+NOTION_STREAMING = os.getenv("NOTION_STREAMING", "").lower() in ("1", "true", "yes")
+# 1이면 기사 목록을 토픽별로 묶고 기업별 언급 수를 붙여 프롬프트에 넣음 (NumPy 필요, 프롬프트 형태가 바뀌므로 기본은 끔)
+TOPIC_DIGEST = os.getenv("TOPIC_DIGEST", "").lower() in ("1", "true", "yes")
+# 1이면 원본 기사 대신 일간 실행이 저장한 일별 요약으로 보고서를 작성 (요약이 없는 날만 기사 원본 사용, 기본은 끔)
+ROLLUP_DIGESTS = os.getenv("ROLLUP_DIGESTS", "").lower() in ("1", "true", "yes")
+# 기사 목록이 이 토큰 수(추정)를 넘으면 map-reduce 요약 사용
+# (ROLLUP_DIGESTS=1이면 일별 요약이 이미 짧으므로 요약이 빠진 날이 많을 때만 넘음)
+MAP_REDUCE_TOKEN_BUDGET = int(os.getenv("MAP_REDUCE_TOKEN_BUDGET", "30000"))
+MAP_CHUNK_TOKENS = int(os.getenv("MAP_CHUNK_TOKENS", "6000"))
+MAP_MODEL = os.getenv("MAP_MODEL", "gpt-5-mini")
+MAP_WORKERS = int(os.getenv("MAP_WORKERS", "8"))
+# OPENAI_BATCH에 monthly(또는 1)가 있으면 보고서 요청을 Batch API로 제출하고, 결과는 다음 실행에서 게시/발송
+OPENAI_BATCH = openai_batch.enabled("monthly")
+# 1이면 새 보고서는 시작하지 않고 제출해 둔 batch의 결과만 확인 (주기적 확인 워크플로용)
+OPENAI_BATCH_POLL = os.getenv("OPENAI_BATCH_POLL", "").lower() in ("1", "true", "yes")
+# 1이면 이번 기간의 체크포인트(보고서/Notion URL/발송 기록)를 지우고 처음부터 실행
+CHECKPOINT_RESET = os.getenv("CHECKPOINT_RESET", "").lower() in ("1", "true", "yes")
+
+REPORT_FOOTER = report_footer("1개월")
+
+# Supabase/OpenAI/Notion 클라이언트는 clients의 get_*()로 처음 쓸 때 생성 (기사가 없는 날은 SDK를 로드하지 않음)
+# LLM 응답 디스크 캐시 (LLM_CACHE_BYPASS=1 이면 캐시를 읽지 않음)
+llm_cache = ResponseCache.from_env()
+# 보고서 생성 지연 SLO (GEN_ATTEMPT_TIMEOUT, GEN_HEDGE_AFTER, GEN_FALLBACKS로 조정)
+gen_policy = GenerationPolicy.from_env()
+# 단계별 시간/토큰/발송 바이트 기록 (실행이 끝나면 runs/에 JSON으로 저장)
+metrics = RunMetrics("monthly")
+
+@metrics.timed("get_recent_articles")
 def get_recent_articles():
     one_month_ago = datetime.now() - relativedelta(months=1)
-    response = supabase.table("articles").select("title, link").gte("created_at", one_month_ago.isoformat() + "Z").execute()
-    return response.data if response.data else []
+    # 일간 실행이 이미 받아 둔 기사는 로컬 미러에서 읽고, 그 이후 분만 새로 받음
+    mirror = ArticleMirror()
+    try:
+        mirror.sync(get_supabase(), since=one_month_ago)
+        return mirror.recent(one_month_ago)
+    finally:
+        mirror.close()
+
+@metrics.timed("get_daily_digests")
+def get_daily_digests():
+    """최근 1개월의 일별 요약 (일간 실행이 저장한 요약이 없는 날만 로컬 미러의 기사로 만듦)"""
+    now = datetime.now()
+    days = (now - (now - relativedelta(months=1))).days
+    return load_daily_digests(days, lambda: ArticleMirror(), lambda: get_supabase(), metrics, now=now)
+
+def build_report_request(articles, digests=None):
+    """보고서 생성 요청(Responses API 파라미터)과 기사 링크 표(LinkRefs)를 만듦.
+
+    digests([(날짜, 일별 요약), ...])를 넘기면 기사 목록 대신 일별 요약으로 작성합니다.
+    기사 목록이 길면 이 단계에서 map 요약을 먼저 실행합니다.
+    """
+    # URL 대신 짧은 기사 ID로 전달하고, 중복 제거 단계에서 묶인 기사 수를 함께 표시
+    refs = LinkRefs()
+    # 비슷한 기사를 토픽으로 미리 묶어 두면 모델이 분류에 쓰는 추론 토큰이 줄어듦
+    digest = build_digest(articles, refs, max_topics=25, per_topic=10) if TOPIC_DIGEST and not digests else None
+    if digests:
+        article_lines = render_digests(digests, refs, max_topics=4, per_topic=1).splitlines()
+        list_label = ROLLUP_LABEL
+    elif digest:
+        article_lines = digest.splitlines()
+        list_label = DIGEST_LABEL
+    else:
+        article_lines = [refs.article_line(article) for article in articles]
+        list_label = "기사 목록 (\"유사 기사 N건\"은 같은 소식을 다룬 기사 수)"
+    article_list_str = "\n".join(article_lines)
+    if estimate_tokens(article_list_str) > MAP_REDUCE_TOKEN_BUDGET:
+        # 한 번에 보내기엔 목록이 길면 덩어리별로 병렬 요약(map)한 뒤 최종 보고서(reduce)를 작성
+        print(f"기사 목록이 커서 부분 요약 후 보고서를 작성합니다 (추정 {estimate_tokens(article_list_str)} 토큰)...")
+        article_list_str = summarize_chunks(
+            get_openai(), article_lines,
+            chunk_tokens=MAP_CHUNK_TOKENS, model=MAP_MODEL, workers=MAP_WORKERS, cache=llm_cache,
+            on_usage=metrics.add_usage,
+        )
+        list_label = "기사 부분 요약 모음 (각 요약의 링크를 그대로 활용)"
 
-def generate_ai_trend_report_with_gpt(articles):
-    article_list_str = "\n".join([f"- [{article['title']}]({article['link']})" for article in articles])
-    
     prompt = f"""
 당신의 역할:
 당신은 인공지능(AI) 산업 전반의 기술, 비즈니스, 정책 흐름을 분석하는 전문 애널리스트입니다.
@@ -74,222 +145,86 @@ google, Microsoft, OpenAI, meta, alphabet 등 주요 기업의 최근 동향을
 
 **출력 규칙**:
 - 최종 보고서 전체 분량은 공백 포함 2000자 이내로 작성.
+{REF_RULE}
 
-기사 목록:
+{list_label}:
 {article_list_str}
 
 데일리 AI 트렌드 분석 보고서:
 """
-    def _extract_text(resp):
-        # 1) SDK 최신 경로
-        if hasattr(resp, "output_text") and resp.output_text:
-            return resp.output_text
-
-        # 2) 구조 파싱
-        parts = []
-        for item in getattr(resp, "output", []) or []:
-            if getattr(item, "type", None) in ("message", "text", "output_text"):
-                content = getattr(item, "content", None)
-                if isinstance(content, list):
-                    for c in content:
-                        if getattr(c, "type", None) in ("text", "output_text"):
-                            parts.append(str(getattr(c, "text", "")))
-                elif content:
-                    parts.append(str(content))
-        return "\n".join(p for p in parts if p).strip()
-
-    try:
-        resp = openai_client.responses.create(
-            model="gpt-5",
-            input=[
-                {"role": "system", "content": "You are an expert AI trend analyst and report writer. Reply with Markdown only, no explanations."},
-                {"role": "user", "content": prompt},
-            ],
-            max_output_tokens=10000,  # 배치 모드니까 넉넉하게
-            reasoning={"effort": "medium"},
-        )
-
-        text = _extract_text(resp)
-
-        # 만약 여전히 비면 raw 출력 확인
-        if not text:
-            print("DEBUG raw response:", resp)
-            return None
-
-        return text
-
-    except Exception as e:
-        import traceback
-        print("ChatGPT API 호출 오류:", repr(e))
-        traceback.print_exc()
-        return None
-
-def parse_rich_text(text: str):
-    # Markdown 링크 및 bold 텍스트를 함께 처리
-    link_pattern = r'\[([^\]]+)\]\((https?://[^\)]+)\)'
-    bold_pattern = r'\*\*([^\*]+)\*\*'
-    segments = []
-    last_end = 0
-
-    # 링크 우선 처리
-    for match in re.finditer(link_pattern, text):
-        start, end = match.span()
-
-        # 이전 일반 텍스트 (굵게 포함 가능)
-        if start > last_end:
-            interim_text = text[last_end:start]
-            segments.extend(process_text_styles(interim_text))
-
-        # 링크 추가
-        link_text = match.group(1)
-        link_url = match.group(2)
-        segments.append({
-            "type": "text",
-            "text": {"content": link_text, "link": {"url": link_url}},
-            "annotations": {"bold": False}
-        })
-
-        last_end = end
-
-    # 남은 텍스트 처리
-    if last_end < len(text):
-        segments.extend(process_text_styles(text[last_end:]))
-
-    return segments
-
-def process_text_styles(text: str):
-    segments = []
-    last_end = 0
-
-    # **굵게** 또는 *기울임* 모두 처리
-    pattern = r'(\*.\*\*|\*.*\*)'
-    for match in re.finditer(pattern, text):
-        start, end = match.span()
-        if start > last_end:
-            segments.append({
-                "type": "text",
-                "text": {"content": text[last_end:start]},
-                "annotations": {"bold": False, "italic": False}
-            })
-
-        content = match.group(0)
-        clean_content = content.strip('*')
-        is_bold = content.startswith('**')
-        is_italic = not is_bold  # 간단한 처리
-
-        segments.append({
-            "type": "text",
-            "text": {"content": clean_content},
-            "annotations": {"bold": is_bold, "italic": is_italic}
-        })
-
-        last_end = end
-
-    if last_end < len(text):
-        segments.append({
-            "type": "text",
-            "text": {"content": text[last_end:]},
-            "annotations": {"bold": False, "italic": False}
-        })
-
-    return segments
-
-def markdown_to_notion_blocks(md_text: str):
-    lines = md_text.splitlines()
-    blocks = []
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        if line == "---": # Check for horizontal rule
-            blocks.append({"object": "block", "type": "divider", "divider": {}})
-        elif line.startswith("### "):
-            blocks.append({"object": "block", "type": "heading_3", "heading_3": {"rich_text": parse_rich_text(line[4:])}})
-        elif line.startswith("## "):
-            blocks.append({"object": "block", "type": "heading_2", "heading_2": {"rich_text": parse_rich_text(line[3:])}})
-        elif line.startswith("# "):
-            blocks.append({"object": "block", "type": "heading_1", "heading_1": {"rich_text": parse_rich_text(line[2:])}})
-        elif line.startswith("- "):
-            blocks.append({"object": "block", "type": "bulleted_list_item", "bulleted_list_item": {"rich_text": parse_rich_text(line[2:])}})
-        else:
-            blocks.append({"object": "block", "type": "paragraph", "paragraph": {"rich_text": parse_rich_text(line)}})
-    return blocks
-
-def create_notion_page(title, content):
+    request = {
+        "model": "gpt-5",
+        "input": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        "max_output_tokens": 10000,  # 배치 모드니까 넉넉하게
+        "reasoning": {"effort": "medium"},
+    }
+    return request, refs
+
+@metrics.timed("send_email")
+def send_email(subject: str, html_body: str, text_body: str, to_emails: list[str]): # Changed to_email to to_emails (list)
     try:
-        children = markdown_to_notion_blocks(content)
-        response = notion_client.pages.create(
-            parent={"database_id": NOTION_DATABASE_ID},
-            properties={"제목": {"title": [{"text": {"content": title}}]}},
-            children=children
-        )
-        return response["url"]
-    except Exception as e:
-        print(f"Notion 페이지 생성 오류: {e}")
-        return None
-
-def send_email(subject: str, body: str, to_emails: list[str]): # Changed to_email to to_emails (list)
-    try:
-        msg = MIMEText(body, 'html')
+        # 텍스트/HTML 두 파트의 multipart/alternative (텍스트만 보는 클라이언트도 내용을 읽을 수 있음)
+        msg = EmailMessage()
+        msg.set_content(text_body)
+        msg.add_alternative(html_body, subtype="html")
         msg['Subject'] = subject
         msg['From'] = EMAIL_SENDER
         msg['To'] = ", ".join(to_emails) # Join the list of emails with comma and space
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-            smtp.login(EMAIL_SENDER, EMAIL_PASSWORD)
-            smtp.send_message(msg)
+        def deliver():
+            with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
+                smtp.login(EMAIL_SENDER, EMAIL_PASSWORD)
+                smtp.send_message(msg)
+        # 속도 제한(421/450/454)/연결 오류는 백오프 후 재시도
+        get_guard("smtp").call(deliver)
         print(f"이메일이 {', '.join(to_emails)} (으)로 성공적으로 발송되었습니다.") # Update print message
+        return True
     except Exception as e:
         print(f"이메일 발송 중 오류 발생: {e}")
+        return False
+
+def send_report(page_title, doc, notion_url, checkpoint):
+    email_html, email_text = email_parts(doc, ["안녕하세요,", "월간 AI 주요 트렌드가 생성되었습니다."], notion_url)
+    # Split the comma-separated recipient string into a list
+    recipient_list = [email.strip() for email in EMAIL_RECIPIENT.split(',')]
+    # 이전 실행에서 이미 받은 수신자는 건너뜀
+    delivered = checkpoint.delivered()
+    pending = [email for email in recipient_list if email not in delivered]
+    if not pending:
+        print("모든 수신자에게 이미 발송했습니다.")
+        return
+    if send_email(
+        subject=f"{page_title}",
+        html_body=email_html,
+        text_body=email_text,
+        to_emails=pending # Pass the list
+    ):
+        for email in pending:
+            checkpoint.mark_sent(email)
+
+flow = ReportFlow(
+    "monthly", metrics, llm_cache, gen_policy,
+    build_request=build_report_request,
+    fetch_articles=get_recent_articles,
+    fetch_digests=get_daily_digests if ROLLUP_DIGESTS else None,
+    send_report=send_report,
+    footer=REPORT_FOOTER,
+    database_id=NOTION_DATABASE_ID,
+    period="최근 1개월",
+    streaming=NOTION_STREAMING,
+    batch=OPENAI_BATCH,
+    batch_poll=OPENAI_BATCH_POLL,
+    reset=CHECKPOINT_RESET,
+)
+
+def main():
+    # Batch 결과를 기다리는 기간이 있으면 달이 바뀌었어도 그 기간을 이어서 처리
+    flow.run(f"월간 AI 트렌드 분석 보고서 ({datetime.now().strftime('%Y-%m')})")  # NEW
 
 if __name__ == "__main__":
-    print("Supabase에서 기사 제목과 링크를 가져옵니다...")
-    articles = get_recent_articles()
-    
-    if not articles:
-        print("새로운 기사가 없습니다.")
-    else:
-        print(f"{len(articles)}개의 기사를 찾았습니다. ChatGPT로 보고서 생성을 시작합니다...")
-        report_content = generate_ai_trend_report_with_gpt(articles)
-        
-        if report_content:
-            report_content += (
-                "\n\n---\n\n"
-                "본 보고서는 국내외 주요 AI 전문 언론사의 최근 1개월 기사 내용을 기반으로 **ChatGPT**가 종합·작성한 자료입니다.\n"
-                "*(국내: AI TIMES, Mirakle AI, 로봇신문 / 해외: MIT Technology Review, The Verge, VentureBeat, Techcrunch)*"
-            )
-            print("보고서 생성 완료. Notion 페이지를 생성합니다...")
-            page_title = f"월간 AI 트렌드 분석 보고서 ({datetime.now().strftime('%Y-%m')})"  # NEW
-            notion_url = create_notion_page(page_title, report_content)
-            
-            if notion_url:
-                print(f"Notion 페이지 생성 완료: {notion_url}")
-                # Convert markdown to HTML for email body
-                html_report_content = markdown.markdown(report_content)
-                email_body = f"""<html>
-<head>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;700&display=swap');
-        body {{
-            font-family: 'Inter', sans-serif;
-        }}
-    </style>
-</head>
-<body>
-    <p>안녕하세요,</p>
-    <p>월간 AI 주요 트렌드가 생성되었습니다.</p>
-    <p><a href=\"{notion_url}\">Notion 링크</a></p>
-    
-    {html_report_content}
-</body>
-</html>"""
-                # Split the comma-separated recipient string into a list
-                recipient_list = [email.strip() for email in EMAIL_RECIPIENT.split(',')]
-                send_email(
-                    subject=f"{page_title}",
-                    body=email_body,
-                    to_emails=recipient_list # Pass the list
-                )
-            else:
-                print("Notion 페이지 생성에 실패했습니다.")
-        else:
-            print("ChatGPT 보고서 생성에 실패했습니다.")
+    try:
+        main()
+    finally:
+        metrics.write()
@@ -0,0 +1,25 @@
+def rich_text(spans):
+    """Span 목록을 Notion rich_text 항목 목록으로 변환"""
+    items = []
+    for span in spans:
+        text = {"content": span.text}
+        if span.url:
+            text["link"] = {"url": span.url}
+        items.append({
+            "type": "text",
+            "text": text,
+            "annotations": {"bold": span.bold, "italic": span.italic, "code": span.code},
+        })
+    return items
+
+
+def doc_to_blocks(doc):
+    """md_doc 문서 트리를 Notion 블록 목록으로 변환"""
+    blocks = []
+    for node in doc:
+        if node.kind == "divider":
+            blocks.append({"object": "block", "type": "divider", "divider": {}})
+        else:
+            blocks.append({"object": "block", "type": node.kind, node.kind: {"rich_text": rich_text(node.spans)}})
+    return blocks
+
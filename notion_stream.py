@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from md_doc import parse_markdown
+from notion_markdown import doc_to_blocks
+from notion_upload import MAX_CHILDREN, archive_page, call_with_retry, normalize_blocks
+
+_HEADINGS = ("heading_1", "heading_2", "heading_3")
+# 이 제목이 나오면 앞 섹션이 끝난 것으로 보고 모인 블록을 올림
+_SECTION_HEADINGS = ("heading_1", "heading_2")
+
+
+class NotionStreamPage:
+    """Markdown 줄이 들어오는 대로 Notion 블록으로 바꿔 페이지를 점진적으로 만드는 작성기.
+
+    첫 제목(heading) 블록이 나오면 페이지를 만들고, 이후 블록은 batch_size개가 모이거나
+    새 섹션(#, ##)이 시작될 때(앞 섹션 완료) blocks.children.append로 이어 붙입니다.
+    Notion 호출은 단일 작업 스레드에서 순서대로 실행되므로 생성(LLM 스트림)을 막지 않습니다.
+    파싱한 문서 트리는 doc에 쌓아 두므로 이메일 렌더링에 그대로 다시 쓸 수 있습니다.
+    """
+
+    def __init__(self, notion, database_id, title, batch_size: int = 20):
+        self.notion = notion
+        self.database_id = database_id
+        self.title = title
+        self.batch_size = min(batch_size, MAX_CHILDREN)
+        self.page_id = None
+        self.url = None
+        self.error = None
+        self.doc = []
+        self._pending = []
+        self._started = False
+        self._submitted = False
+        self._worker = ThreadPoolExecutor(max_workers=1)
+
+    def add_markdown(self, md_text: str):
+        nodes = parse_markdown(md_text)
+        self.doc.extend(nodes)
+        for block in doc_to_blocks(nodes):
+            if self._started and block["type"] in _SECTION_HEADINGS:
+                self._flush()
+            self._pending.append(block)
+            if not self._started and block["type"] in _HEADINGS:
+                # 첫 제목이 나오면 바로 페이지를 만들어 URL을 확보
+                self._started = True
+                self._flush()
+            elif self._started and len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self._submitted = True
+        self._worker.submit(self._send, batch)
+
+    def _send(self, batch):
+        if self.error is not None:
+            return
+        try:
+            batch = normalize_blocks(batch)
+            chunks = [batch[i:i + MAX_CHILDREN] for i in range(0, len(batch), MAX_CHILDREN)] or [[]]
+            for chunk in chunks:
+                if self.page_id is None:
+                    response = call_with_retry(lambda: self.notion.pages.create(
+                        parent={"database_id": self.database_id},
+                        properties={"제목": {"title": [{"text": {"content": self.title}}]}},
+                        children=chunk,
+                    ), idempotent=False)
+                    self.page_id = response["id"]
+                    self.url = response["url"]
+                    print(f"Notion 페이지 생성(작성 중): {self.url}")
+                else:
+                    call_with_retry(lambda: self.notion.blocks.children.append(block_id=self.page_id, children=chunk),
+                                    idempotent=False)
+        except Exception as e:
+            self.error = e
+
+    def finish(self):
+        """남은 블록을 모두 올리고 페이지 URL을 반환.
+
+        실패하면 일부만 채워진 페이지를 보관(archive) 처리하고 None을 반환 (재실행 시 페이지가 둘 생기지 않도록)
+        """
+        self._started = True
+        self._flush()
+        if not self._submitted:
+            # 본문이 비어 있어도 페이지는 만듦
+            self._worker.submit(self._send, [])
+        self._worker.shutdown(wait=True)
+        if self.error is not None:
+            print(f"Notion 페이지 생성 오류: {self.error}")
+            self.abort()
+            return None
+        return self.url
+
+    def abort(self):
+        """생성 실패 시 작성 중이던 페이지를 보관(archive) 처리"""
+        self._pending = []
+        self._worker.shutdown(wait=True)
+        if self.page_id is not None:
+            archive_page(self.notion, self.page_id)
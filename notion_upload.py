@@ -0,0 +1,77 @@
+from service_guard import get_guard
+
+# Notion API 요청 한도
+MAX_CHILDREN = 100          # 요청 하나의 children 블록 수
+MAX_TEXT = 2000             # rich_text 항목 하나의 content 길이
+MAX_RICH_TEXT_ITEMS = 100   # 블록 하나의 rich_text 항목 수
+
+
+def split_rich_text(items):
+    """content가 MAX_TEXT를 넘는 rich_text 항목을 같은 서식/링크를 유지한 채 나눔"""
+    result = []
+    for item in items:
+        content = item.get("text", {}).get("content", "")
+        if len(content) <= MAX_TEXT:
+            result.append(item)
+            continue
+        for i in range(0, len(content), MAX_TEXT):
+            piece = dict(item, text=dict(item["text"], content=content[i:i + MAX_TEXT]))
+            result.append(piece)
+    return result
+
+
+def normalize_blocks(blocks):
+    """긴 rich_text를 나누고, 항목이 MAX_RICH_TEXT_ITEMS를 넘는 블록은 같은 종류의 블록 여러 개로 나눔"""
+    result = []
+    for block in blocks:
+        kind = block["type"]
+        body = block.get(kind, {})
+        if "rich_text" not in body:
+            result.append(block)
+            continue
+        items = split_rich_text(body["rich_text"])
+        for i in range(0, max(len(items), 1), MAX_RICH_TEXT_ITEMS):
+            result.append(dict(block, **{kind: dict(body, rich_text=items[i:i + MAX_RICH_TEXT_ITEMS])}))
+    return result
+
+
+def call_with_retry(fn, retries: int = 3, backoff: float = 1.0, idempotent: bool = True):
+    """Notion 공용 ServiceGuard로 호출: 동시 요청 수를 맞추고 429/일시적 5xx/네트워크 오류는
+    Retry-After(없으면 무작위 지수 백오프)만큼 기다렸다 다시 호출.
+
+    pages.create/blocks.children.append처럼 다시 보내면 중복이 생기는 요청은 idempotent=False로 호출해
+    이미 적용됐을 수 있는 오류(5xx, 응답 대기 시간 초과)에서는 재시도하지 않음
+    """
+    return get_guard("notion").call(fn, retries=retries, base_delay=backoff, idempotent=idempotent)
+
+
+def archive_page(notion, page_id):
+    """일부만 채워진 페이지를 보관(archive) 처리 (정리 실패는 출력만 하고 넘어감)"""
+    try:
+        call_with_retry(lambda: notion.pages.update(page_id=page_id, archived=True))
+    except Exception as e:
+        print(f"작성 중이던 Notion 페이지 정리 실패: {e}")
+
+
+def upload_page(notion, database_id, title, blocks, retries: int = 3) -> str:
+    """블록 수/길이 한도에 맞춰 나눈 뒤 첫 묶음으로 페이지를 만들고 나머지를 이어 붙여 URL을 반환.
+
+    묶음 단위로 재시도하므로 일부 요청이 실패해도 이미 올린 블록은 다시 보내지 않습니다.
+    생성/추가 요청은 이미 적용됐을 수 있는 오류에서는 재시도하지 않고, 추가가 실패하면
+    일부만 채워진 페이지를 보관 처리한 뒤 오류를 올립니다 (재실행 시 페이지가 둘 생기지 않도록).
+    """
+    blocks = normalize_blocks(blocks)
+    chunks = [blocks[i:i + MAX_CHILDREN] for i in range(0, len(blocks), MAX_CHILDREN)] or [[]]
+    page = call_with_retry(lambda: notion.pages.create(
+        parent={"database_id": database_id},
+        properties={"제목": {"title": [{"text": {"content": title}}]}},
+        children=chunks[0],
+    ), retries, idempotent=False)
+    for index, chunk in enumerate(chunks[1:], start=2):
+        try:
+            call_with_retry(lambda: notion.blocks.children.append(block_id=page["id"], children=chunk), retries,
+                            idempotent=False)
+        except Exception as e:
+            archive_page(notion, page["id"])
+            raise RuntimeError(f"블록 추가 실패 ({index}/{len(chunks)}번째 묶음, 페이지: {page['url']}): {e}") from e
+    return page["url"]
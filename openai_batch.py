@@ -0,0 +1,78 @@
+import json
+import os
+
+DEFAULT_DIR = os.getenv("BATCH_DIR", ".cache/batches")
+# 아직 결과가 나오지 않은 batch 상태
+PENDING = ("validating", "in_progress", "finalizing")
+
+
+def enabled(flow: str, value: str = None) -> bool:
+    """OPENAI_BATCH(예: "weekly monthly", "1")에 flow가 포함되는지 확인.
+
+    여러 보고서를 run_reports.py로 한 프로세스에서 실행하므로 보고서별로 켤 수 있게 목록으로 받습니다.
+    """
+    value = os.getenv("OPENAI_BATCH", "") if value is None else value
+    names = value.lower().replace(",", " ").split()
+    return flow in names or any(v in ("1", "true", "yes") for v in names)
+
+
+def write_jsonl(request: dict, custom_id: str, directory: str = DEFAULT_DIR) -> str:
+    """Responses API 요청 하나를 Batch 입력 형식(JSONL 한 줄)으로 저장하고 경로를 반환"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{custom_id}.jsonl")
+    line = {"custom_id": custom_id, "method": "POST", "url": "/v1/responses", "body": request}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return path
+
+
+def submit(client, request: dict, custom_id: str, directory: str = DEFAULT_DIR) -> str:
+    """요청을 JSONL로 올려 Batch API에 제출하고 batch ID를 반환 (결과는 collect()로 나중에 확인)"""
+    path = write_jsonl(request, custom_id, directory)
+    with open(path, "rb") as f:
+        uploaded = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint="/v1/responses",
+        completion_window="24h",
+        metadata={"custom_id": custom_id},
+    )
+    return batch.id
+
+
+def response_text(body: dict) -> str:
+    """Batch 출력의 Responses API 응답 본문(dict)에서 텍스트만 추출"""
+    if body.get("output_text"):
+        return body["output_text"]
+    parts = []
+    for item in body.get("output") or []:
+        if item.get("type") not in ("message", "text", "output_text"):
+            continue
+        for c in item.get("content") or []:
+            if c.get("type") in ("text", "output_text") and c.get("text"):
+                parts.append(c["text"])
+    return "\n".join(parts).strip()
+
+
+def collect(client, batch_id: str, custom_id: str):
+    """batch 상태를 확인해 (상태, 응답 본문 dict) 반환. 아직 진행 중이면 본문은 None.
+
+    batch가 실패/만료/취소됐거나 요청이 오류로 끝났으면 RuntimeError를 냅니다.
+    """
+    batch = client.batches.retrieve(batch_id)
+    if batch.status in PENDING:
+        return batch.status, None
+    if batch.status != "completed":
+        raise RuntimeError(f"batch {batch_id} 상태: {batch.status} {getattr(batch, 'errors', None)}")
+    for file_id in (batch.output_file_id, getattr(batch, "error_file_id", None)):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            row = json.loads(line) if line.strip() else None
+            if not row or row.get("custom_id") != custom_id:
+                continue
+            response = row.get("response") or {}
+            if row.get("error") or response.get("status_code") != 200:
+                raise RuntimeError(f"batch 요청 오류: {row.get('error') or response.get('body')}")
+            return batch.status, response["body"]
+    raise RuntimeError(f"batch {batch_id} 결과에 {custom_id} 응답이 없습니다.")
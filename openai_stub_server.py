@@ -0,0 +1,205 @@
+"""Batch 모드를 오프라인에서 확인하기 위한 OpenAI API 대역 서버.
+
+Files(/v1/files), Batches(/v1/batches), Responses(/v1/responses, 스트리밍 제외)를 흉내 내며,
+batch는 제출 후 --complete-after초가 지나면 완료되어 입력 JSONL의 요청마다 샘플 보고서를 돌려줍니다.
+openai SDK는 OPENAI_BASE_URL 환경 변수를 따르므로 스크립트를 고치지 않고 이 서버로 연결할 수 있습니다.
+
+    python openai_stub_server.py --port 8787 --complete-after 5
+    OPENAI_BASE_URL=http://127.0.0.1:8787/v1 OPENAI_API_KEY=x OPENAI_BATCH=monthly python monthly_trend_report.py
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def sample_report(request: dict) -> str:
+    """요청 프롬프트의 기사 ID로 링크를 건 짧은 Markdown 보고서"""
+    prompt = json.dumps(request.get("input", ""), ensure_ascii=False)
+    ids = sorted(set(re.findall(r"\b(a\d+)\b", prompt)), key=lambda ref: int(ref[1:]))[:12] or ["a1"]
+    lines = ["# AI Trend Report", "", "## 주요 트렌드"]
+    for n, ref in enumerate(ids[:3], 1):
+        lines += [f"### {n}. 샘플 트렌드 {n}", f"- [샘플 기사 {ref}]({ref})에서 다룬 소식을 요약했습니다."]
+    lines += ["", "---", "## 마무리 인사이트", "대역 서버가 만든 샘플 보고서입니다."]
+    return "\n".join(lines)
+
+
+def response_body(request: dict, response_id: str) -> dict:
+    text = sample_report(request)
+    prompt_bytes = len(json.dumps(request.get("input", ""), ensure_ascii=False).encode("utf-8"))
+    output_tokens = len(text.encode("utf-8")) // 3
+    return {
+        "id": response_id,
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": request.get("model", "gpt-5"),
+        "output": [{
+            "type": "message",
+            "id": f"msg_{response_id}",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "usage": {"input_tokens": prompt_bytes // 3, "output_tokens": output_tokens,
+                  "total_tokens": prompt_bytes // 3 + output_tokens},
+    }
+
+
+class StubState:
+    def __init__(self, complete_after: float):
+        self.complete_after = complete_after
+        self.files = {}
+        self.batches = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def new_id(self, prefix):
+        return f"{prefix}_{next(self.ids)}"
+
+    def add_file(self, data: bytes, filename: str, purpose: str) -> dict:
+        with self.lock:
+            file_id = self.new_id("file")
+            meta = {"id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+                    "filename": filename, "purpose": purpose, "status": "processed"}
+            self.files[file_id] = (meta, data)
+        return meta
+
+    def create_batch(self, params: dict) -> dict:
+        with self.lock:
+            if params.get("input_file_id") not in self.files:
+                raise KeyError(params.get("input_file_id"))
+            batch_id = self.new_id("batch")
+            batch = {
+                "id": batch_id, "object": "batch", "endpoint": params["endpoint"],
+                "input_file_id": params["input_file_id"], "completion_window": params["completion_window"],
+                "status": "validating", "created_at": int(time.time()), "output_file_id": None,
+                "error_file_id": None, "metadata": params.get("metadata"),
+                "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            }
+            self.batches[batch_id] = (batch, time.time())
+        return batch
+
+    def get_batch(self, batch_id: str) -> dict:
+        with self.lock:
+            batch, submitted = self.batches[batch_id]
+            if batch["status"] in ("validating", "in_progress") and time.time() - submitted >= self.complete_after:
+                self._complete(batch)
+            elif batch["status"] == "validating":
+                batch["status"] = "in_progress"
+            return batch
+
+    def _complete(self, batch):
+        lines = self.files[batch["input_file_id"]][1].decode("utf-8").splitlines()
+        out = []
+        for line in filter(str.strip, lines):
+            row = json.loads(line)
+            out.append(json.dumps({
+                "id": self.new_id("batch_req"),
+                "custom_id": row["custom_id"],
+                "response": {"status_code": 200, "request_id": self.new_id("req"),
+                             "body": response_body(row["body"], self.new_id("resp"))},
+                "error": None,
+            }, ensure_ascii=False))
+        data = ("\n".join(out) + "\n").encode("utf-8")
+        file_id = self.new_id("file")
+        self.files[file_id] = ({"id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+                                "filename": "batch_output.jsonl", "purpose": "batch_output",
+                                "status": "processed"}, data)
+        batch.update(status="completed", output_file_id=file_id, completed_at=int(time.time()),
+                     request_counts={"total": len(out), "completed": len(out), "failed": 0})
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state: StubState = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        data = body if isinstance(body, bytes) else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message):
+        self._send(status, {"error": {"message": message, "type": "invalid_request_error"}})
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        body = self._body()
+        if path == "/v1/files":
+            header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+            message = BytesParser(policy=default_policy).parsebytes(header + body)
+            fields, data, filename = {}, None, "upload.jsonl"
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                if name == "file":
+                    data = part.get_payload(decode=True)
+                    filename = part.get_filename() or filename
+                else:
+                    fields[name] = part.get_content().strip()
+            if data is None:
+                return self._error(400, "file is required")
+            return self._send(200, self.state.add_file(data, filename, fields.get("purpose", "batch")))
+        if path == "/v1/batches":
+            try:
+                return self._send(200, self.state.create_batch(json.loads(body)))
+            except KeyError as e:
+                return self._error(404, f"No such File object: {e}")
+        if path == "/v1/responses":
+            request = json.loads(body)
+            if request.get("stream"):
+                return self._error(400, "stream is not supported by the stub server")
+            return self._send(200, response_body(request, self.state.new_id("resp")))
+        self._error(404, f"unknown path {path}")
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        match = re.fullmatch(r"/v1/batches/([\w-]+)", path)
+        if match:
+            try:
+                return self._send(200, self.state.get_batch(match.group(1)))
+            except KeyError:
+                return self._error(404, f"No such Batch object: {match.group(1)}")
+        match = re.fullmatch(r"/v1/files/([\w-]+)/content", path)
+        if match and match.group(1) in self.state.files:
+            return self._send(200, self.state.files[match.group(1)][1], "application/octet-stream")
+        self._error(404, f"unknown path {path}")
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, complete_after: float = 5.0):
+    """대역 서버를 백그라운드 스레드로 띄우고 서버 객체를 반환 (server.server_address로 주소 확인)"""
+    handler = type("Handler", (StubHandler,), {"state": StubState(complete_after)})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--complete-after", type=float, default=5.0, help="batch 제출 후 완료까지 걸리는 시간(초)")
+    args = parser.parse_args(argv)
+    server = serve(args.host, args.port, args.complete_after)
+    host, port = server.server_address[:2]
+    print(f"OpenAI 대역 서버 실행 중: OPENAI_BASE_URL=http://{host}:{port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
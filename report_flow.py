@@ -0,0 +1,375 @@
+import itertools
+import json
+import os
+import time
+import traceback
+from datetime import datetime
+
+import openai_batch
+from checkpoint import RunCheckpoint
+from clients import get_notion, get_openai, get_supabase
+from dedup import dedupe_articles
+from link_refs import LinkRefs
+from llm import stream_text
+from mailer import DeliveryScheduler, MessageTemplate, SMTPPool
+from md_doc import parse_markdown
+from notion_markdown import doc_to_blocks
+from notion_stream import NotionStreamPage
+from notion_upload import upload_page
+from report_html import email_parts, footer_parts
+from subscriber_source import buffered, iter_subscribers, valid_subscribers
+
+# Edge Function(텍스트 응답)과 연동되는 구독/해지 URL
+UNSUB_BASE = "https://corocmnneqzimohtrhuf.supabase.co/functions/v1/unsubscribe"  # 프로젝트 도메인으로 교체
+SUB_BASE = "https://corocmnneqzimohtrhuf.supabase.co/functions/v1/subscribe"
+
+
+def report_footer(period: str) -> str:
+    """보고서 끝에 붙이는 출처 안내 (period: "24시간", "1주일", "1개월")"""
+    return (
+        "\n\n---\n\n"
+        f"본 보고서는 국내외 주요 AI 전문 언론사의 최근 {period} 기사 내용을 기반으로 **ChatGPT**가 종합·작성한 자료입니다.\n"
+        "*(국내: AI TIMES, Mirakle AI, 로봇신문 / 해외: MIT Technology Review, The Verge, VentureBeat, Techcrunch)*"
+    )
+
+
+class ReportFlow:
+    """일간/주간/월간 보고서가 함께 쓰는 생성 → Notion 게시 → 발송 흐름.
+
+    보고서마다 다른 부분(기사 조회 기간, 프롬프트, 발송 방식)은 스크립트가 함수로 넘깁니다.
+    build_request(articles, digests)는 (Responses API 요청, LinkRefs)를, fetch_articles()는 기사 목록을,
+    fetch_digests()는 [(날짜, 일별 요약), ...]를 반환하고, send_report(page_title, doc, notion_url, checkpoint)가
+    발송(구독자 발송은 SubscriberDelivery)을, on_generated(articles, doc)가 새로 생성한 보고서의 후처리를 맡습니다.
+    각 단계는 인스턴스 속성이므로 benchmark.py처럼 바깥에서 감싸거나 바꿀 수 있습니다.
+    """
+
+    def __init__(self, cadence: str, metrics, cache, policy, build_request, fetch_articles, send_report,
+                 footer: str, database_id: str, period: str, fetch_digests=None, on_generated=None,
+                 streaming: bool = False, batch: bool = False, batch_poll: bool = False, reset: bool = False):
+        self.cadence = cadence
+        self.metrics = metrics
+        self.cache = cache
+        self.policy = policy
+        self.build_request = build_request
+        self.fetch_articles = fetch_articles
+        self.fetch_digests = fetch_digests
+        self.send_report = send_report
+        self.on_generated = on_generated
+        self.footer = footer
+        self.database_id = database_id
+        self.period = period
+        self.streaming = streaming
+        self.batch = batch
+        self.batch_poll = batch_poll
+        self.reset = reset
+        self.get_openai = get_openai
+        self.get_notion = get_notion
+        self.dedupe = dedupe_articles
+        self.stream_page = NotionStreamPage
+
+    def generate_report(self, articles, on_line=None, digests=None):
+        """on_line을 넘기면 응답을 스트리밍으로 받아 완성된 줄(링크 복원 후)마다 호출"""
+        with self.metrics.span("generate_report"):
+            request, refs = self.build_request(articles, digests)
+            try:
+                # 같은 요청(모델/파라미터/프롬프트)으로 재실행하면 API 호출 없이 저장된 응답을 사용
+                text = self.cache.get(request)
+                if text is not None:
+                    print("캐시된 보고서 응답을 사용합니다.")
+                    self.metrics.incr("llm_cache.hit")
+                    if on_line is not None:
+                        for line in text.splitlines():
+                            on_line(refs.expand(line))
+                    return refs.expand(text)
+
+                path = "primary"
+                if on_line is None:
+                    # 시도별 제한 시간, 늦어지면 hedge 요청, 실패 시 대체 경로 (먼저 온 유효한 응답 사용)
+                    text, path = self.policy.run(self.get_openai(), request, self.metrics)
+                else:
+                    # 스트리밍은 Notion에 바로 쓰므로 hedge 없이 제한 시간만 적용
+                    text = stream_text(self.get_openai(), dict(request, timeout=self.policy.attempt_timeout),
+                                       lambda line: on_line(refs.expand(line)), self.metrics.add_usage)
+                if not text:
+                    print(f"보고서 응답이 비어 있습니다 (경로: {path})")
+                    return None
+                if path == "primary":
+                    # 대체 경로의 응답은 캐시하지 않아 재실행 때 주 경로를 다시 시도
+                    self.cache.put(request, text)
+                return refs.expand(text)
+            except Exception as e:
+                print("ChatGPT API 호출 오류:", repr(e))
+                traceback.print_exc()
+                return None
+
+    def create_notion_page(self, title, doc):
+        with self.metrics.span("create_notion_page"):
+            try:
+                children = doc_to_blocks(doc)
+                # 블록 100개/텍스트 2000자 한도에 맞춰 나눠 올림 (실패한 묶음만 재시도)
+                return upload_page(self.get_notion(), self.database_id, title, children)
+            except Exception as e:
+                print(f"Notion 페이지 생성 오류: {e}")
+                return None
+
+    def submit_batch(self, articles, digests, checkpoint):
+        """보고서 요청을 Batch API로 제출하고 batch ID와 기사 링크 표를 체크포인트에 저장"""
+        with self.metrics.span("submit_batch"):
+            request, refs = self.build_request(articles, digests)
+            custom_id = f"{self.cadence}-{datetime.now():%Y%m%d%H%M%S}"
+            try:
+                batch_id = openai_batch.submit(self.get_openai(), request, custom_id)
+            except Exception as e:
+                print("Batch 제출 오류:", repr(e))
+                return None
+            checkpoint.set("batch", json.dumps({"id": batch_id, "custom_id": custom_id, "urls": refs.urls}))
+            return batch_id
+
+    def collect_batch(self, checkpoint):
+        """제출해 둔 batch의 결과로 보고서 Markdown을 반환 (아직 진행 중이거나 실패하면 None, 실패하면 batch 기록도 지움)"""
+        with self.metrics.span("collect_batch"):
+            batch = json.loads(checkpoint.get("batch"))
+            try:
+                status, body = openai_batch.collect(self.get_openai(), batch["id"], batch["custom_id"])
+            except Exception as e:
+                # 실패/만료된 batch는 지우고, prepare_report가 같은 기간의 보고서를 바로 생성
+                print("Batch 결과 확인 오류:", repr(e))
+                checkpoint.delete("batch")
+                return None
+            if body is None:
+                print(f"Batch {batch['id']}가 아직 {status} 상태입니다. 다음 확인 때 이어서 진행합니다.")
+                return None
+            self.metrics.add_usage(body.get("usage"))
+            text = openai_batch.response_text(body)
+            if not text:
+                print("Batch 응답이 비어 있습니다:", body)
+                checkpoint.delete("batch")
+                return None
+            refs = LinkRefs()
+            for url in batch["urls"]:
+                refs.ref(url)
+            return refs.expand(text)
+
+    def load_sources(self):
+        """보고서 재료 (articles, digests). fetch_digests가 있으면 일별 요약을, 없으면 중복 제거한 기사를 씀"""
+        if self.fetch_digests is not None:
+            print(f"{self.period}의 일별 요약을 모읍니다...")
+            digests = self.fetch_digests()
+            if not digests:
+                return None, None
+            total = sum(d["articles"] for _, d in digests)
+            self.metrics.incr("articles", total)
+            print(f"{len(digests)}일치 요약(기사 {total}개)으로 ChatGPT 보고서 생성을 시작합니다...")
+            return None, digests
+
+        print(f"Supabase에서 {self.period} 기사 제목과 링크를 가져옵니다...")
+        articles = self.fetch_articles()
+        if not articles:
+            return None, None
+        total = len(articles)
+        with self.metrics.span("dedupe_articles"):
+            articles = self.dedupe(articles)
+        self.metrics.incr("articles", total)
+        self.metrics.incr("articles.deduped", len(articles))
+        print(f"{total}개의 기사를 찾았습니다 (중복 제거 후 {len(articles)}개). ChatGPT로 보고서 생성을 시작합니다...")
+        return articles, None
+
+    def prepare_report(self, page_title, checkpoint):
+        """보고서 Markdown의 문서 트리와 Notion URL을 반환 (체크포인트에 완료된 단계가 있으면 재사용)"""
+        report_content = checkpoint.get("report")
+        notion_url = checkpoint.get("notion_url")
+        notion_page = None
+        batch_failed = False
+        if report_content is not None:
+            print("체크포인트에 저장된 보고서를 사용합니다.")
+        elif checkpoint.get("batch"):
+            print("제출해 둔 Batch 결과를 확인합니다...")
+            report_content = self.collect_batch(checkpoint)
+            if report_content:
+                report_content += self.footer
+                checkpoint.set("report", report_content)
+            elif checkpoint.get("batch"):
+                return None, None
+            else:
+                # 실패/만료/빈 응답이면 이 기간의 보고서를 잃지 않도록 이번 실행에서 바로 생성
+                print("Batch로 보고서를 받지 못해 이번 실행에서 바로 생성합니다...")
+                batch_failed = True
+        if report_content is not None:
+            doc = parse_markdown(report_content)
+        else:
+            articles, digests = self.load_sources()
+            if articles is None and digests is None:
+                print("새로운 기사가 없습니다.")
+                return None, None
+            if self.batch and not batch_failed:
+                # 결과를 기다리지 않고 종료하고, 다음 실행(OPENAI_BATCH_POLL)이 게시/발송을 이어서 함
+                batch_id = self.submit_batch(articles, digests, checkpoint)
+                if batch_id:
+                    print(f"보고서 요청을 Batch {batch_id}로 제출했습니다. 결과는 다음 확인 실행에서 게시/발송합니다.")
+                    return None, None
+                # 제출에 실패하면 이 기간의 보고서를 잃지 않도록 이번 실행에서 바로 생성
+                print("Batch 제출에 실패해 이번 실행에서 바로 생성합니다...")
+            # 스트리밍 모드: 응답이 생성되는 대로 Notion 페이지를 만들고 블록을 이어 붙임
+            if self.streaming and notion_url is None:
+                notion_page = self.stream_page(self.get_notion(), self.database_id, page_title)
+            report_content = self.generate_report(
+                articles, on_line=notion_page.add_markdown if notion_page else None, digests=digests
+            )
+            if not report_content:
+                if notion_page:
+                    notion_page.abort()
+                print("ChatGPT 보고서 생성에 실패했습니다.")
+                return None, None
+
+            report_content += self.footer
+            checkpoint.set("report", report_content)
+            if notion_page:
+                notion_page.add_markdown(self.footer)
+                # 스트리밍하며 파싱한 문서 트리를 이메일에도 그대로 사용
+                doc = notion_page.doc
+                with self.metrics.span("notion_stream_finish"):
+                    notion_url = notion_page.finish()
+            else:
+                doc = parse_markdown(report_content)
+            if self.on_generated is not None and articles:
+                self.on_generated(articles, doc)
+
+        if notion_url is None and notion_page is None:
+            print("보고서 생성 완료. Notion 페이지를 생성합니다...")
+            notion_url = self.create_notion_page(page_title, doc)
+        elif notion_page is None:
+            print("체크포인트에 저장된 Notion 페이지를 사용합니다.")
+        if notion_url is None:
+            print("Notion 페이지 생성에 실패했습니다.")
+            return doc, None
+        checkpoint.set("notion_url", notion_url)
+        print(f"Notion 페이지 생성 완료: {notion_url}")
+        return doc, notion_url
+
+    def run(self, page_title):
+        """page_title 기간의 보고서를 생성/게시/발송. Batch 결과를 기다리는 기간이 있으면 그 기간을 먼저 이어서 처리.
+
+        Batch가 실패하면 prepare_report가 같은 기간의 보고서를 바로 생성하고, 그래도 게시하지 못하면
+        기다리던 기간 기록을 지우지 않은 채 RuntimeError로 실패합니다.
+        """
+        pending = RunCheckpoint(f"{self.cadence}:batch")
+        if self.reset:
+            pending.reset()
+        waiting = pending.get("page_title")
+        if waiting is None and self.batch_poll:
+            print("결과를 기다리는 Batch가 없습니다.")
+            pending.close()
+            return
+        page_title = waiting or page_title
+        # 같은 기간을 다시 실행하면 완료된 단계(보고서, Notion 페이지, 발송한 수신자)는 건너뜀
+        checkpoint = RunCheckpoint(f"{self.cadence}:{page_title}")
+        try:
+            if self.reset:
+                checkpoint.reset()
+            doc, notion_url = self.prepare_report(page_title, checkpoint)
+            if checkpoint.get("report") is None and checkpoint.get("batch"):
+                pending.set("page_title", page_title)
+                return
+            if waiting and notion_url is None:
+                # Batch로 미뤄 둔 기간은 기록을 남겨 다음 실행이 같은 기간을 다시 처리하고, 실패로 종료
+                raise RuntimeError(f"{page_title} 보고서를 게시하지 못했습니다. 다음 실행에서 같은 기간을 다시 처리합니다.")
+            if notion_url:
+                self.send_report(page_title, doc, notion_url, checkpoint)
+            pending.reset()
+        finally:
+            checkpoint.close()
+            pending.close()
+
+
+class SubscriberDelivery:
+    """구독자 전체에게 보고서를 보내는 send_report 구현 (일간/주간 공용).
+
+    구독자를 페이지 단위로 읽으며 첫 페이지가 오면 바로 발송을 시작하고, 본문은 MessageTemplate로
+    한 번만 인코딩해 수신자별 헤더/푸터만 채웁니다. 이전 실행에서 받은 수신자는 체크포인트로 건너뛰고,
+    동시성/속도 제한은 DeliveryScheduler가 맡습니다. 보고서마다 다른 것은 인사말(greeting)과 제목 형식뿐입니다.
+    구독자 조회(get_supabase), SMTP 풀, 스케줄러는 인스턴스 속성이므로 benchmark.py처럼 바꿔 끼울 수 있습니다.
+    """
+
+    def __init__(self, metrics, greeting, subject: str = "{title}", sender: str = None, password: str = None,
+                 workers: int = 4, per_second: float = 5.0, per_day: int = None, page_size: int = 1000):
+        self.metrics = metrics
+        self.greeting = list(greeting)
+        self.subject = subject
+        self.sender = sender
+        self.workers = workers
+        self.per_second = per_second
+        self.per_day = per_day
+        self.page_size = page_size
+        # 로그인된 SMTP 세션을 구독자 발송 전체에서 재사용
+        self.smtp_pool = SMTPPool(sender, password, size=workers)
+        self.get_supabase = get_supabase
+        self.scheduler = DeliveryScheduler
+
+    @classmethod
+    def from_env(cls, metrics, greeting, subject: str = "{title}"):
+        """EMAIL_SENDER/EMAIL_PASSWORD와 발송 동시성/속도 제한(SEND_WORKERS, SEND_RATE_PER_SEC, SEND_DAILY_LIMIT,
+        SUBSCRIBER_PAGE_SIZE; Gmail 한도에 맞춰 조정)을 환경 변수에서 읽음"""
+        return cls(
+            metrics, greeting, subject,
+            sender=os.getenv("EMAIL_SENDER"),
+            password=os.getenv("EMAIL_PASSWORD"),
+            workers=int(os.getenv("SEND_WORKERS", "4")),
+            per_second=float(os.getenv("SEND_RATE_PER_SEC", "5")),
+            per_day=int(os.getenv("SEND_DAILY_LIMIT", "0")) or None,
+            page_size=int(os.getenv("SUBSCRIBER_PAGE_SIZE", "1000")),
+        )
+
+    def subscribers(self):
+        """구독자 목록(이메일+토큰)을 페이지 단위로 스트리밍 조회"""
+        return self.metrics.timed_iter("get_subscribers", iter_subscribers(self.get_supabase(), page_size=self.page_size))
+
+    def send_one(self, template: MessageTemplate, to_email: str, token: str):
+        unsub_url = f"{UNSUB_BASE}?token={token}"
+        resub_url = f"{SUB_BASE}?token={token}"
+        raw = template.render(to_email, unsub_url, *footer_parts(unsub_url, resub_url))
+        started = time.perf_counter()
+        try:
+            self.smtp_pool.send(raw, self.sender, [to_email])
+        finally:
+            self.metrics.observe("send_latency_seconds", time.perf_counter() - started)
+        self.metrics.incr("email.sent")
+        self.metrics.incr("email.bytes", len(raw))
+
+    def __call__(self, page_title, doc, notion_url, checkpoint):
+        email_html, email_text = email_parts(doc, self.greeting, notion_url)
+
+        # 이전 실행에서 이미 받은 수신자는 건너뜀
+        delivered = checkpoint.delivered()
+        if delivered:
+            print(f"이전 실행에서 발송을 마친 {len(delivered)}명은 건너뜁니다.")
+
+        # 첫 페이지가 도착하는 즉시 발송을 시작하고 나머지는 백그라운드에서 읽음
+        subs = buffered(self.subscribers(), maxsize=self.page_size * 2)
+        first = next(subs, None)
+        if first is None:
+            print("구독자가 없습니다.")
+            return
+
+        # 본문은 한 번만 인코딩하고 수신자별로 헤더/푸터만 채움
+        template = MessageTemplate(self.subject.format(title=page_title), self.sender, email_html, email_text)
+
+        def deliver(s):
+            self.send_one(template, to_email=s["email"], token=s["token"])
+            checkpoint.mark_sent(s["email"])
+
+        pending = (s for s in valid_subscribers(itertools.chain([first], subs)) if s["email"] not in delivered)
+        scheduler = self.scheduler(
+            deliver,
+            workers=self.workers,
+            per_second=self.per_second,
+            per_day=self.per_day,
+        )
+        try:
+            with self.metrics.span("send_all") as span:
+                report = scheduler.run(pending)
+                span.update(sent=report.count("sent"), failed=report.count("failed"))
+        finally:
+            self.smtp_pool.close()
+        for email, err in report.failures():
+            print(f"발송 실패({email}): {err}")
+        print(report.summary())
@@ -0,0 +1,104 @@
+import re
+from html import escape
+
+_HTML_TAGS = {
+    "heading_1": "h1",
+    "heading_2": "h2",
+    "heading_3": "h3",
+    "paragraph": "p",
+}
+
+
+def _inline_html(spans):
+    parts = []
+    for span in spans:
+        text = escape(span.text)
+        if span.code:
+            text = f"<code>{text}</code>"
+        if span.italic:
+            text = f"<em>{text}</em>"
+        if span.bold:
+            text = f"<strong>{text}</strong>"
+        if span.url:
+            text = f'<a href="{escape(span.url)}">{text}</a>'
+        parts.append(text)
+    return "".join(parts)
+
+
+def doc_to_html(doc) -> str:
+    """md_doc 문서 트리를 이메일 본문용 HTML로 변환 (연속된 불릿은 하나의 <ul>로 묶음)"""
+    lines = []
+    in_list = False
+    for node in doc:
+        if node.kind == "bulleted_list_item":
+            if not in_list:
+                lines.append("<ul>")
+                in_list = True
+            lines.append(f"<li>{_inline_html(node.spans)}</li>")
+            continue
+        if in_list:
+            lines.append("</ul>")
+            in_list = False
+        if node.kind == "divider":
+            lines.append("<hr>")
+        else:
+            tag = _HTML_TAGS[node.kind]
+            lines.append(f"<{tag}>{_inline_html(node.spans)}</{tag}>")
+    if in_list:
+        lines.append("</ul>")
+    return "\n".join(lines)
+
+
+def doc_to_text(doc) -> str:
+    """md_doc 문서 트리를 서식 없는 텍스트로 변환 (링크는 '텍스트 (URL)')"""
+    lines = []
+    for node in doc:
+        text = "".join(f"{s.text} ({s.url})" if s.url else s.text for s in node.spans)
+        if node.kind == "divider":
+            lines.append("")
+            lines.append("-" * 40)
+        elif node.kind.startswith("heading_"):
+            lines.append("")
+            lines.append(text)
+        elif node.kind == "bulleted_list_item":
+            lines.append(f"- {text}")
+        else:
+            lines.append(text)
+    return "\n".join(lines).strip() + "\n"
+
+
+# 웹 폰트를 받지 않고 설치된 글꼴로 바로 렌더링 (Inter가 없으면 시스템 기본 글꼴)
+EMAIL_FONT = "Inter,-apple-system,'Segoe UI',Roboto,Arial,sans-serif"
+
+# 블록 태그 앞뒤 공백은 렌더링에 영향이 없으므로 지움 (인라인 태그 사이 공백은 단어 구분이라 남김)
+_BLOCK_GAP = re.compile(r"\s*(</?(?:html|head|meta|body|div|h[1-6]|p|ul|li|hr)\b[^>]*>)\s*")
+
+
+def minify_html(html: str) -> str:
+    """연속 공백을 하나로 줄이고 블록 태그 주변 공백을 없앰 (<pre>는 쓰지 않으므로 따로 보존하지 않음)"""
+    return _BLOCK_GAP.sub(r"\1", re.sub(r"\s+", " ", html)).strip()
+
+
+def email_parts(doc, intro_lines, notion_url: str):
+    """구독 메일 본문 (HTML, 텍스트) 쌍.
+
+    HTML은 <style>/웹 폰트 없이 글꼴만 감싸는 div에 인라인으로 지정하고 공백을 줄입니다.
+    수신자별 푸터를 뒤에 이어 붙이므로 </div></body></html>은 닫지 않습니다 (HTML에서 생략 가능).
+    텍스트는 multipart/alternative의 text/plain 파트로 쓰입니다.
+    """
+    intro = "".join(f"<p>{escape(line)}</p>" for line in intro_lines)
+    html = minify_html(
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>'
+        f'<div style="font-family:{EMAIL_FONT};line-height:1.6">'
+        f'{intro}<p><a href="{escape(notion_url or "")}">Notion 링크</a></p>{doc_to_html(doc)}'
+    )
+    text = "\n".join(intro_lines) + f"\nNotion 링크: {notion_url}\n\n" + doc_to_text(doc)
+    return html + "\n", text
+
+
+def footer_parts(unsub_url: str, sub_url: str):
+    """수신자별 푸터 (HTML, 텍스트) 쌍"""
+    html = (f'<hr><p style="font-size:12px;color:#666">이 메일은 구독자에게 발송되었습니다. '
+            f'<a href="{escape(sub_url)}">구독하기</a> · <a href="{escape(unsub_url)}">구독취소</a></p>\n')
+    text = f"\n{'-' * 40}\n이 메일은 구독자에게 발송되었습니다.\n구독하기: {sub_url}\n구독취소: {unsub_url}\n"
+    return html, text
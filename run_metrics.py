@@ -0,0 +1,191 @@
+import json
+import math
+import os
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+DEFAULT_DIR = os.getenv("RUN_METRICS_DIR", "runs")
+# 설정하면 run 기록을 OTLP/HTTP(JSON) 트레이스로도 전송 (예: http://localhost:4318)
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+
+
+def percentile(values, p: float):
+    """nearest-rank 백분위수 (값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class RunMetrics:
+    """한 번의 실행에서 단계별 시간(span), 카운터, 토큰 사용량, 지연 분포를 모아 JSON으로 남기는 기록기.
+
+    여러 스레드(구독자 발송 worker 등)에서 동시에 호출해도 됩니다.
+    """
+
+    def __init__(self, flow: str):
+        self.flow = flow
+        self.started = time.time()
+        self.spans = []
+        self.counters = {}
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        start = time.time()
+        t0 = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except GeneratorExit:
+            # 제너레이터를 끝까지 읽지 않고 닫은 경우는 오류가 아님
+            raise
+        except BaseException as e:
+            error = repr(e)
+            raise
+        finally:
+            record = {"name": name, "start": start, "seconds": round(time.perf_counter() - t0, 6)}
+            if attrs:
+                record["attrs"] = attrs
+            if error:
+                record["error"] = error
+            with self._lock:
+                self.spans.append(record)
+
+    def timed(self, name: str):
+        """함수 호출 전체를 span으로 기록하는 데코레이터"""
+        def decorator(fn):
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            wrapper.__name__ = fn.__name__
+            wrapper.__doc__ = fn.__doc__
+            return wrapper
+        return decorator
+
+    def timed_iter(self, name: str, iterable):
+        """iterable을 끝까지 읽는 데 걸린 시간과 항목 수를 span으로 기록"""
+        with self.span(name) as attrs:
+            count = 0
+            for item in iterable:
+                count += 1
+                yield item
+            attrs["count"] = count
+
+    def incr(self, name: str, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self.samples.setdefault(name, []).append(value)
+
+    def add_usage(self, usage, prefix: str = "openai"):
+        """Responses API의 usage(input_tokens/output_tokens)를 카운터에 더함"""
+        if usage is None:
+            return
+        for field in ("input_tokens", "output_tokens", "total_tokens"):
+            value = getattr(usage, field, None)
+            if value is None and isinstance(usage, dict):
+                value = usage.get(field)
+            if value:
+                self.incr(f"{prefix}.{field}", value)
+
+    def record(self) -> dict:
+        with self._lock:
+            distributions = {
+                name: {
+                    "count": len(values),
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "max": max(values),
+                }
+                for name, values in self.samples.items()
+            }
+            return {
+                "flow": self.flow,
+                "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+                "seconds": round(time.time() - self.started, 3),
+                "spans": list(self.spans),
+                "counters": dict(self.counters),
+                "distributions": distributions,
+            }
+
+    def write(self, directory: str = DEFAULT_DIR):
+        """run 기록을 directory/{flow}-{시각}.json에 저장하고, OTLP 주소가 있으면 함께 전송"""
+        record = self.record()
+        path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            stamp = datetime.fromtimestamp(self.started, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            path = os.path.join(directory, f"{self.flow}-{stamp}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False, indent=2)
+            print(f"실행 기록 저장: {path}")
+        except OSError as e:
+            print(f"실행 기록 저장 실패: {e}")
+        if OTLP_ENDPOINT:
+            try:
+                export_otlp(record, OTLP_ENDPOINT)
+            except Exception as e:
+                print(f"OTLP 전송 실패: {e}")
+        return path
+
+
+def _attr(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def export_otlp(record: dict, endpoint: str, timeout: float = 10):
+    """run 기록을 OTLP/HTTP JSON 트레이스(루트 span + 단계별 하위 span)로 전송"""
+    trace_id = os.urandom(16).hex()
+    root_id = os.urandom(8).hex()
+    start_ns = int(datetime.fromisoformat(record["started"]).timestamp() * 1e9)
+    root_attrs = {f"counter.{k}": v for k, v in record["counters"].items()}
+    for name, dist in record["distributions"].items():
+        for stat in ("p50", "p95"):
+            root_attrs[f"{name}.{stat}"] = float(dist[stat])
+    spans = [{
+        "traceId": trace_id,
+        "spanId": root_id,
+        "name": f"report.{record['flow']}",
+        "kind": 1,
+        "startTimeUnixNano": str(start_ns),
+        "endTimeUnixNano": str(start_ns + int(record["seconds"] * 1e9)),
+        "attributes": [_attr(k, v) for k, v in root_attrs.items()],
+    }]
+    for s in record["spans"]:
+        begin = int(s["start"] * 1e9)
+        spans.append({
+            "traceId": trace_id,
+            "spanId": os.urandom(8).hex(),
+            "parentSpanId": root_id,
+            "name": s["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(begin),
+            "endTimeUnixNano": str(begin + int(s["seconds"] * 1e9)),
+            "attributes": [_attr(k, v) for k, v in s.get("attrs", {}).items()],
+            "status": {"code": 2, "message": s["error"]} if "error" in s else {},
+        })
+    body = {"resourceSpans": [{
+        "resource": {"attributes": [_attr("service.name", "ai-trend-report")]},
+        "scopeSpans": [{"scope": {"name": "run_metrics"}, "spans": spans}],
+    }]}
+    request = urllib.request.Request(
+        endpoint.rstrip("/") + "/v1/traces",
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=timeout):
+        pass
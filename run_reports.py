@@ -0,0 +1,91 @@
+"""일간/주간/월간 보고서를 한 프로세스에서 함께 실행하는 진입점.
+
+기사는 요청한 보고서 중 가장 긴 기간으로 한 번만 받아 메모리에서 보고서별 기간으로 나눠 쓰고,
+보고서별 생성/Notion 게시/발송은 스레드로 동시에 진행합니다.
+Supabase/OpenAI/Notion 클라이언트도 clients의 get_*()를 통해 한 번만 만듭니다.
+
+사용: python run_reports.py daily weekly monthly
+"""
+import time
+_IMPORT_STARTED = time.perf_counter()
+import argparse
+import importlib
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from dateutil.relativedelta import relativedelta
+from article_mirror import ArticleMirror
+from clients import check_import_budget, get_supabase
+from run_metrics import RunMetrics
+
+load_dotenv()
+check_import_budget(_IMPORT_STARTED)
+
+# 보고서 종류별 스크립트 모듈과 기사 조회 기간
+CADENCES = {
+    "daily": ("daily_trend_report", relativedelta(days=1)),
+    "weekly": ("main", relativedelta(days=7)),
+    "monthly": ("monthly_trend_report", relativedelta(months=1)),
+}
+
+metrics = RunMetrics("runner")
+
+
+@metrics.timed("fetch_articles")
+def fetch_shared_articles(since):
+    """since 이후 기사를 로컬 미러에 한 번 동기화하고 메모리 스냅샷으로 반환"""
+    mirror = ArticleMirror()
+    try:
+        mirror.sync(get_supabase(), since=since)
+        return mirror.snapshot(since)
+    finally:
+        mirror.close()
+
+
+def run_cadence(name, mod):
+    try:
+        with metrics.span(f"report.{name}"):
+            mod.main()
+    finally:
+        mod.metrics.write()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="일간/주간/월간 보고서를 기사 조회를 공유하며 동시에 실행")
+    parser.add_argument("cadences", nargs="+", choices=list(CADENCES))
+    args = parser.parse_args(argv)
+    cadences = list(dict.fromkeys(args.cadences))
+
+    modules = {name: importlib.import_module(CADENCES[name][0]) for name in cadences}
+    now = datetime.now()
+    since = min(now - CADENCES[name][1] for name in cadences) - timedelta(minutes=10)
+    print(f"{', '.join(cadences)} 보고서용 기사를 {since:%Y-%m-%d %H:%M} 이후로 한 번에 가져옵니다...")
+    snapshot = fetch_shared_articles(since)
+    metrics.incr("articles", len(snapshot.rows))
+    print(f"기사 {len(snapshot.rows)}개를 가져왔습니다. 보고서 생성을 시작합니다...")
+
+    for mod in modules.values():
+        # 각 스크립트의 기사 조회가 Supabase 대신 공유 스냅샷을 잘라 쓰도록 교체
+        mod.ArticleMirror = lambda: snapshot
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=len(modules)) as pool:
+        futures = {name: pool.submit(run_cadence, name, mod) for name, mod in modules.items()}
+        for name, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                failed.append(name)
+                print(f"{name} 보고서 실행 오류: {e!r}")
+                traceback.print_exception(e)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    try:
+        code = main()
+    finally:
+        metrics.write()
+    sys.exit(code)
@@ -0,0 +1,292 @@
+import functools
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# 서비스별 기본 설정. throttle: 요청 과다(동시 요청 수를 줄이고 재시도), retry: 일시적 장애(재시도)
+SERVICES = {
+    # Notion은 통합(integration)당 평균 초당 3요청
+    "notion": dict(initial=2, max_limit=3, throttle=(429,), retry=(409, 500, 502, 503, 504)),
+    "supabase": dict(initial=4, max_limit=16, throttle=(429,), retry=(408, 500, 502, 503, 504)),
+    # Gmail SMTP는 421/450/454로 속도 제한을 알림
+    "smtp": dict(initial=2, max_limit=8, throttle=(421, 450, 454), retry=(451,), base_delay=5.0),
+}
+
+# 서버가 Retry-After로 더 오래 기다리라고 해도 이 시간(초)까지만 기다림
+RETRY_AFTER_CAP = 60.0
+
+
+class CircuitOpenError(RuntimeError):
+    """서비스 장애가 이어져 차단기가 열린 동안 요청을 보내지 않고 바로 실패"""
+
+
+def error_status(e):
+    """예외에서 HTTP/SMTP 상태 코드를 추출 (없으면 None)"""
+    for attr in ("status", "status_code", "smtp_code"):
+        value = getattr(e, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(e, "response", None)
+    if isinstance(getattr(response, "status_code", None), int):
+        return response.status_code
+    recipients = getattr(e, "recipients", None)
+    if isinstance(recipients, dict) and recipients:
+        # SMTPRecipientsRefused: 수신자별 응답 중 첫 번째 코드
+        return next(iter(recipients.values()))[0]
+    # postgrest APIError는 JSON이 아닌 오류 응답이면 HTTP 상태를 code에 담음
+    code = getattr(e, "code", None)
+    if isinstance(code, int) or (isinstance(code, str) and code.isdigit()):
+        return int(code)
+    return None
+
+
+def retry_after(e):
+    """예외에 담긴 응답의 Retry-After(초 또는 HTTP 날짜)를 초로 변환 (없으면 None)"""
+    headers = getattr(e, "headers", None) or getattr(getattr(e, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_network_error(e) -> bool:
+    """연결/시간 초과 오류 (httpx 예외는 OSError를 상속하지 않으므로 모듈/클래스 이름으로도 판별)"""
+    if isinstance(e, (OSError, TimeoutError)):
+        return True
+    return type(e).__module__.split(".")[0] in ("httpx", "httpcore") or "Timeout" in type(e).__name__
+
+
+def is_unsent_error(e) -> bool:
+    """요청이 서버에 전달되기 전에 실패한 연결 오류 (연결 거부, 연결/풀 대기 시간 초과)"""
+    if isinstance(e, ConnectionRefusedError):
+        return True
+    return type(e).__name__ in ("ConnectError", "ConnectTimeout", "PoolTimeout")
+
+
+class AIMDLimiter:
+    """동시 요청 수 한도를 AIMD로 조절하는 세마포어.
+
+    한도까지 요청이 차 있는 동안 성공할 때마다 한도를 1/한도씩 늘리고(한 바퀴에 +1),
+    요청 과다/장애 신호를 받으면 한도를 ratio배로 줄입니다. 같은 순간에 보낸 요청들이
+    한꺼번에 실패해도 한 번만 줄도록 cooldown초 안의 감소는 무시합니다.
+    """
+
+    def __init__(self, initial: float, min_limit: float = 1, max_limit: float = None,
+                 ratio: float = 0.5, cooldown: float = 1.0):
+        self.min_limit = min_limit
+        self.max_limit = max_limit if max_limit is not None else initial
+        self.limit = min(max(initial, min_limit), self.max_limit)
+        self.ratio = ratio
+        self.cooldown = cooldown
+        self.inflight = 0
+        self._decreased = -cooldown
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+
+    def release(self):
+        with self._cond:
+            self.inflight -= 1
+            self._cond.notify()
+
+    def on_success(self):
+        with self._cond:
+            # 한도를 다 쓰지 않는 동안에는 늘리지 않음 (여유가 있다는 근거가 아님)
+            if self.inflight >= int(self.limit) - 1 and self.limit < self.max_limit:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                self._cond.notify_all()
+
+    def on_overload(self):
+        with self._cond:
+            now = time.monotonic()
+            if now - self._decreased < self.cooldown:
+                return
+            self._decreased = now
+            self.limit = max(self.min_limit, self.limit * self.ratio)
+
+
+class CircuitBreaker:
+    """연속 failure_threshold번 장애가 나면 reset_timeout초 동안 요청을 막는 차단기.
+
+    시간이 지나면 요청 하나만 시험 삼아 보내고(half-open), 성공하면 다시 닫고 실패하면 다시 엽니다.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def remaining(self) -> float:
+        """half-open이 될 때까지 남은 시간(초). 닫혀 있거나 이미 지났으면 0"""
+        opened_at = self.opened_at
+        if opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - opened_at))
+
+    def before(self):
+        """요청을 보내도 되는지 확인 (막혀 있으면 CircuitOpenError)"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset_timeout or self._probing:
+                raise CircuitOpenError(f"연속 장애 {self.failures}회로 차단 중 ({max(0.0, self.reset_timeout - waited):.0f}초 후 재시도)")
+            self._probing = True
+
+    def on_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def on_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def on_neutral(self):
+        # 요청 과다/요청 자체의 오류는 서비스 장애로 세지 않음
+        with self._lock:
+            self._probing = False
+
+
+class ServiceGuard:
+    """외부 서비스 호출 하나하나에 동시 요청 수 제한(AIMD), 재시도, 차단기를 적용.
+
+    throttle 상태 코드는 한도를 줄이고 재시도, retry 상태 코드와 네트워크 오류는 장애로 세고 재시도,
+    그 밖의 오류는 바로 올립니다. 재시도 대기는 Retry-After가 있으면 그 값을,
+    없으면 base_delay * 2^(n-1) (max_delay 이하) 안의 무작위 시간(full jitter)을 씁니다.
+    """
+
+    def __init__(self, name: str, initial: float = 4, max_limit: float = None, throttle=(429,),
+                 retry=(500, 502, 503, 504), retries: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 breaker: CircuitBreaker = None):
+        self.name = name
+        self.limiter = AIMDLimiter(initial, max_limit=max_limit)
+        self.breaker = breaker or CircuitBreaker()
+        self.throttle = tuple(throttle)
+        self.retry = tuple(retry)
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"calls": 0, "throttled": 0, "failed": 0, "retried": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def classify(self, e):
+        """"throttle"(요청 과다), "retry"(일시적 장애), None(재시도하지 않음)"""
+        if isinstance(e, CircuitOpenError):
+            return None
+        status = error_status(e)
+        if status in self.throttle:
+            return "throttle"
+        if status in self.retry:
+            return "retry"
+        if status is None and is_network_error(e):
+            return "retry"
+        return None
+
+    def delay(self, attempt: int, e=None, base: float = None) -> float:
+        """attempt번째 재시도 전 대기 시간(초)"""
+        wait = retry_after(e) if e is not None else None
+        if wait is not None:
+            # 같은 시각에 몰려 재시도하지 않도록 약간 흩뜨림
+            return min(wait, RETRY_AFTER_CAP) * random.uniform(1.0, 1.1)
+        base = self.base_delay if base is None else base
+        return random.uniform(0, min(self.max_delay, base * 2 ** (attempt - 1)))
+
+    def attempt(self, fn, *args, **kwargs):
+        """재시도 없이 한 번 호출 (차단기 확인, 동시 요청 슬롯 확보, 결과를 한도/차단기에 반영)"""
+        try:
+            self.breaker.before()
+        except CircuitOpenError:
+            self._count("rejected")
+            raise
+        self.limiter.acquire()
+        self._count("calls")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            kind = self.classify(e)
+            if kind == "throttle":
+                self._count("throttled")
+                self.limiter.on_overload()
+                self.breaker.on_neutral()
+            elif kind == "retry":
+                self._count("failed")
+                self.limiter.on_overload()
+                self.breaker.on_failure()
+            else:
+                self.breaker.on_neutral()
+            raise
+        finally:
+            self.limiter.release()
+        self.limiter.on_success()
+        self.breaker.on_success()
+        return result
+
+    def call(self, fn, *args, retries: int = None, base_delay: float = None, idempotent: bool = True, **kwargs):
+        """attempt()를 재시도 가능한 오류에 한해 최대 retries번 더 반복.
+
+        idempotent=False(생성/추가처럼 두 번 적용되면 안 되는 요청)이면 서버가 처리하지 않은 것이
+        확실한 경우(throttle 상태 코드, 전송 전 연결 오류)에만 재시도하고, 5xx나 응답 대기 시간 초과처럼
+        이미 적용됐을 수 있는 오류는 바로 올립니다.
+        """
+        retries = self.retries if retries is None else retries
+        attempt = 0
+        while True:
+            try:
+                return self.attempt(fn, *args, **kwargs)
+            except Exception as e:
+                kind = self.classify(e)
+                if not idempotent and kind == "retry" and not is_unsent_error(e):
+                    raise
+                if kind is None or attempt >= retries:
+                    raise
+                attempt += 1
+                self._count("retried")
+                time.sleep(self.delay(attempt, e, base_delay))
+
+    def snapshot(self) -> dict:
+        return dict(self.stats, limit=round(self.limiter.limit, 2), state=self.breaker.state)
+
+
+@functools.lru_cache(maxsize=None)
+def get_guard(name: str) -> ServiceGuard:
+    """서비스별로 프로세스 전체가 공유하는 ServiceGuard (run_reports.py의 여러 보고서도 같은 한도를 씀).
+
+    최대 동시 요청 수는 <NAME>_MAX_CONCURRENCY 환경 변수로 바꿀 수 있습니다.
+    """
+    options = dict(SERVICES.get(name, {}))
+    env = os.getenv(f"{name.upper()}_MAX_CONCURRENCY")
+    if env:
+        options["max_limit"] = float(env)
+        options["initial"] = min(options.get("initial", 4), float(env))
+    return ServiceGuard(name, **options)
@@ -0,0 +1,74 @@
+import queue
+import threading
+
+from service_guard import get_guard
+
+_DONE = object()
+
+
+def iter_subscribers(supabase, page_size: int = 1000):
+    """활성 구독자(이메일+토큰)를 email 기준 keyset 페이지네이션으로 조회하는 제너레이터.
+
+    offset 대신 마지막 email 이후를 조회하므로 페이지가 늘어나도 쿼리 비용이 일정하고,
+    PostgREST의 max-rows 제한에 걸려도 빈 페이지가 나올 때까지 계속 읽습니다.
+    """
+    last_email = None
+    while True:
+        query = supabase.table("subscribers").select("email, token").eq("subscribed", True)
+        if last_email is not None:
+            query = query.gt("email", last_email)
+        rows = get_guard("supabase").call(query.order("email").limit(page_size).execute).data or []
+        if not rows:
+            return
+        yield from rows
+        last_email = rows[-1]["email"]
+
+
+def valid_subscribers(subs):
+    """이메일/토큰이 없는 레코드는 로그만 남기고 건너뜀"""
+    for s in subs:
+        if not s.get("email") or not s.get("token"):
+            print(f"스킵: 잘못된 레코드 {s}")
+            continue
+        yield s
+
+
+def buffered(iterable, maxsize: int = 2000):
+    """별도 스레드에서 iterable을 미리 읽어 크기 제한 큐로 넘겨주는 제너레이터.
+
+    큐가 가득 차면 생산자가 멈추므로(backpressure) 메모리는 maxsize 이내로 유지되고,
+    소비자는 다음 페이지를 읽는 동안에도 이미 받은 항목을 처리할 수 있습니다.
+    """
+    q = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producer():
+        try:
+            for item in iterable:
+                if not _put(item):
+                    return
+        except BaseException as e:
+            _put((_DONE, e))
+            return
+        _put((_DONE, None))
+
+    threading.Thread(target=producer, daemon=True).start()
+    try:
+        while True:
+            item = q.get()
+            if isinstance(item, tuple) and len(item) == 2 and item[0] is _DONE:
+                if item[1] is not None:
+                    raise item[1]
+                return
+            yield item
+    finally:
+        stop.set()
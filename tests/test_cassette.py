@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 녹화/재생 대상 스크립트: HTTP 요청 하나, SMTP 발송 하나, 설정 값을 출력
+SCRIPT = """
+import json, os, smtplib
+import httpx
+
+with smtplib.SMTP_SSL("smtp.example.com", 465) as smtp:
+    smtp.login("sender@example.com", "password")
+    refused = smtp.sendmail("sender@example.com", ["to@example.com"], b"Subject: hi\\r\\n\\r\\nbody")
+body = httpx.get(os.environ["TEST_URL"]).json()
+print("RESULT " + json.dumps({
+    "body": body,
+    "refused": refused,
+    "env": {name: os.getenv(name) for name in ("LLM_CACHE_BYPASS", "CHECKPOINT_RESET", "TOPIC_DIGEST")},
+}))
+"""
+
+# 실제 Gmail 대신 녹화 때 감쌀 SMTP 서버 대역
+RECORD = """
+import smtplib, sys
+import cassette
+
+class FakeSMTP:
+    def __init__(self, *args, **kwargs):
+        pass
+    def login(self, user, password):
+        return (235, b"accepted")
+    def sendmail(self, from_addr, to_addrs, msg):
+        return {}
+    def quit(self):
+        return (221, b"bye")
+    def close(self):
+        pass
+
+smtplib.SMTP_SSL = FakeSMTP
+sys.exit(cassette.record(sys.argv[1], sys.argv[2], []))
+"""
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({"articles": ["a", "b"]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(args, env, cwd):
+    result = subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stdout + result.stderr
+    line = next(line for line in result.stdout.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):]), result.stdout
+
+
+def test_record_then_replay_without_network(tmp_path):
+    pytest.importorskip("httpx")
+    script = tmp_path / "script.py"
+    script.write_text(SCRIPT, encoding="utf-8")
+    path = str(tmp_path / "cassette")
+    base = {k: v for k, v in os.environ.items() if k not in ("LLM_CACHE_BYPASS", "CHECKPOINT_RESET", "TOPIC_DIGEST")}
+    base["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/articles"
+    try:
+        recorded, _ = run(["-c", RECORD, path, str(script)],
+                          dict(base, TEST_URL=url, LLM_CACHE_BYPASS="1", CHECKPOINT_RESET="1", TOPIC_DIGEST="1"),
+                          tmp_path)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    meta = json.loads((tmp_path / "cassette" / "meta.json").read_text(encoding="utf-8"))
+    assert meta["env"] == {"LLM_CACHE_BYPASS": "1", "CHECKPOINT_RESET": "1", "TOPIC_DIGEST": "1"}
+
+    # 서버를 닫은 뒤 설정 환경 변수 없이 재생해도 같은 응답과 설정으로 실행됨
+    replayed, output = run([os.path.join(ROOT, "cassette.py"), "replay", path, "--latency-scale", "0"],
+                           dict(base, TEST_URL=url), tmp_path)
+    assert replayed == recorded
+    assert recorded["body"] == {"articles": ["a", "b"]}
+    assert "녹화에 없던 요청" not in output
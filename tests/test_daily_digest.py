@@ -0,0 +1,62 @@
+import functools
+from datetime import datetime
+
+import pytest
+
+import daily_digest
+from daily_digest import DigestStore, day_windows, load_daily_digests
+from run_metrics import RunMetrics
+
+NOW = datetime(2026, 10, 17, 9, 0)
+
+
+class FakeMirror:
+    """구간마다 기사 하나를 돌려주고 sync/close 호출을 기록하는 기사 미러"""
+
+    opened = []
+
+    def __init__(self):
+        self.synced = None
+        self.closed = False
+        FakeMirror.opened.append(self)
+
+    def sync(self, supabase, since):
+        self.synced = since
+
+    def between(self, start, end):
+        return [{"title": f"OpenAI 소식 {end:%m%d}", "link": f"https://example.com/{end:%m%d}"}]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def store_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "digests.sqlite3")
+    monkeypatch.setattr(daily_digest, "DigestStore", functools.partial(DigestStore, path=path))
+    FakeMirror.opened = []
+    return path
+
+
+def test_rebuilds_only_missing_days_from_one_mirror(store_path):
+    stored_day = day_windows(NOW, 7)[-1][0]
+    store = DigestStore(store_path)
+    store.put(stored_day, {"articles": 3, "companies": [], "headlines": ["저장된 요약"], "topics": []})
+    store.close()
+
+    metrics = RunMetrics("weekly")
+    digests = load_daily_digests(7, FakeMirror, lambda: "supabase", metrics, now=NOW)
+
+    assert [day for day, _ in digests] == [day for day, _, _ in day_windows(NOW, 7)]
+    assert dict(digests)[stored_day]["headlines"] == ["저장된 요약"]
+    assert len(FakeMirror.opened) == 1 and FakeMirror.opened[0].closed
+    assert FakeMirror.opened[0].synced == datetime(2026, 10, 10, 9, 0)
+    assert metrics.record()["counters"] == {"digests.stored": 1, "digests.rebuilt": 6}
+
+
+def test_does_not_open_mirror_when_all_days_are_stored(store_path):
+    load_daily_digests(3, FakeMirror, lambda: "supabase", now=NOW)
+    FakeMirror.opened = []
+    digests = load_daily_digests(3, FakeMirror, lambda: "supabase", now=NOW)
+    assert len(digests) == 3
+    assert FakeMirror.opened == []
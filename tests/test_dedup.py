@@ -0,0 +1,52 @@
+from dedup import canonicalize_url, dedupe_articles
+
+
+def article(title, link):
+    return {"title": title, "link": link}
+
+
+def test_canonicalize_url_drops_tracking_and_cosmetic_parts():
+    assert canonicalize_url("http://www.Example.com/news/1/?utm_source=x&id=7&fbclid=y#top") == \
+        "https://example.com/news/1?id=7"
+    assert canonicalize_url("https://example.com") == "https://example.com/"
+
+
+def test_same_article_with_tracking_params_is_merged():
+    result = dedupe_articles([
+        article("OpenAI, 새 모델 공개", "https://example.com/a?utm_source=rss"),
+        article("OpenAI, 새 모델 공개 (업데이트)", "https://www.example.com/a/"),
+    ])
+    assert len(result) == 1
+    assert result[0]["title"] == "OpenAI, 새 모델 공개"
+    assert result[0]["dup_count"] == 2
+
+
+def test_near_duplicate_titles_are_merged():
+    result = dedupe_articles([
+        article("구글, 차세대 AI 모델 제미나이 3 공개", "https://a.example.com/1"),
+        article("엔비디아 실적 발표", "https://b.example.com/2"),
+        article("구글, 차세대 AI 모델 '제미나이 3' 공개", "https://c.example.com/3"),
+    ])
+    assert [a["link"] for a in result] == ["https://a.example.com/1", "https://b.example.com/2"]
+    assert [a["dup_count"] for a in result] == [2, 1]
+
+
+def test_distinct_titles_are_kept_in_order():
+    articles = [article(f"서로 다른 기사 제목 {i} {'가나다라마바사'[i % 7] * 5}", f"https://example.com/{i}")
+                for i in range(20)]
+    result = dedupe_articles(articles)
+    assert [a["link"] for a in result] == [a["link"] for a in articles]
+    assert all(a["dup_count"] == 1 for a in result)
+
+
+def test_input_is_not_modified():
+    articles = [article("같은 제목", "https://example.com/1"), article("같은 제목", "https://example.com/2")]
+    result = dedupe_articles(articles)
+    assert len(result) == 1 and result[0]["dup_count"] == 2
+    assert all("dup_count" not in a for a in articles)
+
+
+def test_empty_titles_and_input():
+    assert dedupe_articles([]) == []
+    result = dedupe_articles([article("", "https://example.com/1"), article("", "https://example.com/2")])
+    assert len(result) == 2
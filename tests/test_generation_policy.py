@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+from types import SimpleNamespace
+
+from generation_policy import GenerationPolicy, parse_fallbacks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 주 요청은 오래 걸리고 hedge(대체 경로)는 바로 응답하는 가짜 OpenAI 클라이언트
+FAKE_CLIENT = '''
+import time
+from types import SimpleNamespace
+
+
+class FakeResponses:
+    def __init__(self, slow_seconds):
+        self.slow_seconds = slow_seconds
+        self.models = []
+
+    def create(self, model, timeout=None, **request):
+        self.models.append(model)
+        if model == "slow":
+            time.sleep(self.slow_seconds)
+        return SimpleNamespace(output_text="# 보고서\\n## 주요 트렌드\\n- " + model, usage=None)
+
+
+class FakeClient:
+    def __init__(self, slow_seconds=5.0):
+        self.responses = FakeResponses(slow_seconds)
+        self.options = []
+
+    def with_options(self, **options):
+        self.options.append(options)
+        return self
+'''
+namespace = {}
+exec(FAKE_CLIENT, namespace)
+FakeClient = namespace["FakeClient"]
+
+
+def test_parse_fallbacks():
+    assert parse_fallbacks(":low, gpt-5-mini:low") == [
+        ("effort-low", {"reasoning": {"effort": "low"}}),
+        ("gpt-5-mini-effort-low", {"model": "gpt-5-mini", "reasoning": {"effort": "low"}}),
+    ]
+
+
+def test_hedge_wins_without_waiting_for_slow_attempt():
+    client = FakeClient(slow_seconds=3.0)
+    policy = GenerationPolicy(fallbacks=[("fast", {"model": "fast"})], attempt_timeout=10, hedge_after=0.1)
+    started = time.perf_counter()
+    text, path = policy.run(client, {"model": "slow", "input": "x"})
+    assert path == "fast"
+    assert text.endswith("fast")
+    assert time.perf_counter() - started < 1.0
+    # SDK 자체 재시도는 끄고 정책만 재시도를 결정
+    assert client.options == [{"max_retries": 0}]
+
+
+def test_timed_out_attempt_moves_to_next_path():
+    client = FakeClient(slow_seconds=3.0)
+    policy = GenerationPolicy(fallbacks=[("fast", {"model": "fast"})], attempt_timeout=0.2, hedge_after=0)
+    started = time.perf_counter()
+    text, path = policy.run(client, {"model": "slow"})
+    assert path == "fast"
+    assert time.perf_counter() - started < 1.0
+
+
+def test_invalid_responses_fail_all_paths():
+    client = SimpleNamespace(responses=SimpleNamespace(
+        create=lambda **request: SimpleNamespace(output_text="짧은 답", usage=None)))
+    policy = GenerationPolicy(fallbacks=[("b", {"model": "b"})], attempt_timeout=1, hedge_after=0)
+    assert policy.run(client, {"model": "a"}) == (None, None)
+
+
+def test_abandoned_attempt_does_not_delay_process_exit(tmp_path):
+    script = tmp_path / "run_policy.py"
+    script.write_text(FAKE_CLIENT + textwrap.dedent('''
+        from generation_policy import GenerationPolicy
+
+        policy = GenerationPolicy(fallbacks=[("fast", {"model": "fast"})], attempt_timeout=30, hedge_after=0.2)
+        print(policy.run(FakeClient(slow_seconds=5.0), {"model": "slow"})[1])
+    '''))
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=30,
+                            cwd=str(tmp_path), env={"PYTHONPATH": ROOT})
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("fast")
+    assert time.perf_counter() - started < 3.0
@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from clients import IMPORT_BUDGET_MS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SDKS = ("openai", "supabase", "notion_client")
+# 모듈 로드 시점에 읽는 설정만 채움 (실제 서비스에는 연결하지 않음)
+ENV_STUBS = {
+    "NOTION_DATABASE_ID": "db",
+    "EMAIL_SENDER": "sender@example.com",
+    "EMAIL_PASSWORD": "password",
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_KEY": "key",
+    "OPENAI_API_KEY": "sk-test",
+    "NOTION_TOKEN": "token",
+}
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+__import__(sys.argv[1])
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({"elapsed_ms": elapsed_ms, "loaded": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+@pytest.mark.parametrize("module", ["main", "daily_trend_report", "monthly_trend_report", "run_reports"])
+def test_entry_script_imports_within_budget_without_sdks(module, tmp_path):
+    pytest.importorskip("dotenv")
+    pytest.importorskip("dateutil")
+    env = dict(os.environ, **ENV_STUBS)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, module, *SDKS],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe["loaded"] == []
+    assert probe["elapsed_ms"] < IMPORT_BUDGET_MS
@@ -0,0 +1,61 @@
+import os
+import time
+
+from llm_cache import ResponseCache
+
+REQUEST = {"model": "gpt-5", "input": "hello"}
+
+
+def make_cache(tmp_path, **kwargs):
+    return ResponseCache(str(tmp_path), **kwargs)
+
+
+def test_get_returns_stored_text(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put(REQUEST, "report")
+    assert cache.get(REQUEST) == "report"
+    assert cache.get(dict(REQUEST, input="other")) is None
+
+
+def test_entry_expires_after_ttl_from_creation(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, ttl_hours=1)
+    cache.put(REQUEST, "report")
+    now = time.time()
+    # 만료 직전까지 여러 번 읽어도(mtime 갱신) 만료 시각은 저장 시각 기준으로 고정
+    monkeypatch.setattr(time, "time", lambda: now + 3000)
+    assert cache.get(REQUEST) == "report"
+    monkeypatch.setattr(time, "time", lambda: now + 3500)
+    assert cache.get(REQUEST) == "report"
+    monkeypatch.setattr(time, "time", lambda: now + 3700)
+    assert cache.get(REQUEST) is None
+    assert not os.listdir(tmp_path)
+
+
+def test_evict_removes_expired_entries_despite_recent_reads(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, ttl_hours=1)
+    cache.put(REQUEST, "old")
+    path = cache._file(cache.key(REQUEST))
+    now = time.time()
+    os.utime(path, (now + 3500, now + 3500))
+    monkeypatch.setattr(time, "time", lambda: now + 3700)
+    cache.put(dict(REQUEST, input="new"), "new")
+    assert not os.path.exists(path)
+    assert cache.get(dict(REQUEST, input="new")) == "new"
+
+
+def test_evict_drops_least_recently_used_over_max_bytes(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=350)
+    first, second = dict(REQUEST, input="a"), dict(REQUEST, input="b")
+    cache.put(first, "x" * 100)
+    cache.put(second, "y" * 100)
+    now = time.time()
+    os.utime(cache._file(cache.key(second)), (now - 100, now - 100))
+    cache.put(dict(REQUEST, input="c"), "z" * 100)
+    assert cache.get(first) == "x" * 100
+    assert cache.get(second) is None
+
+
+def test_bypass_skips_reads(tmp_path):
+    cache = make_cache(tmp_path, bypass=True)
+    cache.put(REQUEST, "report")
+    assert cache.get(REQUEST) is None
@@ -0,0 +1,74 @@
+import email
+from email import policy
+
+import pytest
+
+from mailer import MessageTemplate
+from report_html import footer_parts
+
+UNSUB = "https://example.com/unsubscribe?token=abc"
+SUB = "https://example.com/subscribe?token=abc"
+
+BODIES = {
+    # 한글 위주면 base64, 영문 위주면 quoted-printable을 고름
+    "korean": ("<p>" + "이번 주 AI 업계의 주요 흐름입니다. " * 40 + "</p>", "이번 주 AI 업계의 주요 흐름입니다.\n" * 40),
+    "ascii": ("<p>" + "Weekly AI trends = summary. " * 40 + "</p>", "Weekly AI trends = summary.\n" * 40),
+    "long_line": ("<p>" + "x" * 500 + "</p>", "y" * 500),
+}
+
+
+def render(html, text, to="reader@example.com"):
+    template = MessageTemplate("[주간 AI 트렌드] 주간 AI 트렌드 분석 보고서 (2026-10-17)",
+                               "sender@example.com", html, text)
+    raw = template.render(to, UNSUB, *footer_parts(UNSUB, SUB))
+    return raw, email.message_from_bytes(raw, policy=policy.default)
+
+
+def all_defects(msg):
+    return [d for part in msg.walk() for d in part.defects]
+
+
+@pytest.mark.parametrize("name", list(BODIES))
+def test_render_produces_valid_multipart(name):
+    html, text = BODIES[name]
+    raw, msg = render(html, text)
+
+    assert all_defects(msg) == []
+    assert all(len(line) <= 998 for line in raw.split(b"\r\n"))
+    assert msg.get_content_type() == "multipart/alternative"
+    plain, rich = msg.get_payload()
+    assert plain.get_content_type() == "text/plain"
+    assert rich.get_content_type() == "text/html"
+
+    footer_html, footer_text = footer_parts(UNSUB, SUB)
+    # base64 본문은 3바이트 단위로 공백을 채운 뒤 푸터를 이어 붙이므로 공백을 빼고 비교
+    plain_text = plain.get_content().replace("\r\n", "\n")
+    assert plain_text.startswith(text.rstrip("\n"))
+    assert plain_text.rstrip(" \n").endswith(footer_text.rstrip("\n"))
+    html_text = rich.get_content().replace("\r\n", "\n")
+    assert html_text.startswith(html)
+    assert html_text.rstrip(" \n").endswith(footer_html.rstrip("\n"))
+
+
+def test_render_sets_recipient_headers():
+    _, msg = render(*BODIES["korean"])
+    assert msg["Subject"] == "[주간 AI 트렌드] 주간 AI 트렌드 분석 보고서 (2026-10-17)"
+    assert msg["From"] == "sender@example.com"
+    assert msg["To"] == "reader@example.com"
+    assert msg["List-Unsubscribe"] == f"<{UNSUB}>"
+    assert msg["List-Unsubscribe-Post"] == "List-Unsubscribe=One-Click"
+
+
+def test_template_is_reused_per_recipient():
+    html, text = BODIES["korean"]
+    template = MessageTemplate("제목", "sender@example.com", html, text)
+    first = email.message_from_bytes(template.render("a@example.com", UNSUB, "<p>a</p>", "a"), policy=policy.default)
+    second = email.message_from_bytes(template.render("b@example.com", UNSUB, "<p>b</p>", "b"), policy=policy.default)
+    assert first["To"] == "a@example.com" and second["To"] == "b@example.com"
+    assert first.get_payload()[1].get_content().rstrip(" \r\n").endswith("<p>a</p>")
+    assert second.get_payload()[1].get_content().rstrip(" \r\n").endswith("<p>b</p>")
+
+
+def test_header_injection_is_rejected():
+    with pytest.raises(ValueError):
+        render(*BODIES["ascii"], to="reader@example.com\r\nBcc: victim@example.com")
@@ -0,0 +1,50 @@
+from md_doc import Node, Span, parse_inline, parse_markdown
+
+
+def plain(text):
+    return Span(text, False, False, False, None)
+
+
+def test_plain_text():
+    assert parse_inline("그냥 텍스트") == [plain("그냥 텍스트")]
+
+
+def test_link_bold_italic_code():
+    assert parse_inline("[제목](https://example.com/a) **굵게** *기울임* `code`") == [
+        Span("제목", False, False, False, "https://example.com/a"),
+        plain(" "),
+        Span("굵게", True, False, False, None),
+        plain(" "),
+        Span("기울임", False, True, False, None),
+        plain(" "),
+        Span("code", False, False, True, None),
+    ]
+
+
+def test_italic_inside_bold():
+    assert parse_inline("a **b *c* d** e") == [
+        plain("a "),
+        Span("b ", True, False, False, None),
+        Span("c", True, True, False, None),
+        Span(" d", True, False, False, None),
+        plain(" e"),
+    ]
+
+
+def test_link_inside_bold_and_italic():
+    assert parse_inline("**[키워드](https://example.com) *[링크](https://example.org)***") == [
+        Span("키워드", True, False, False, "https://example.com"),
+        Span(" ", True, False, False, None),
+        Span("링크", True, True, False, "https://example.org"),
+    ]
+
+
+def test_unmatched_markers_stay_literal():
+    assert parse_inline("a ** b * c") == [plain("a ** b * c")]
+    assert parse_inline("[라벨](ftp://example.com)") == [plain("[라벨](ftp://example.com)")]
+
+
+def test_parse_markdown_blocks():
+    doc = parse_markdown("# 제목\n\n## 소제목\n- **항목**\n---\n본문")
+    assert [node.kind for node in doc] == ["heading_1", "heading_2", "bulleted_list_item", "divider", "paragraph"]
+    assert doc[2] == Node("bulleted_list_item", [Span("항목", True, False, False, None)])
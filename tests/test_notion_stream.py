@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from notion_stream import NotionStreamPage
+
+
+class FakeNotion:
+    """pages.create/update, blocks.children.append 호출을 기록하는 Notion 클라이언트"""
+
+    def __init__(self, fail_append=False):
+        self.fail_append = fail_append
+        self.appended = []
+        self.archived = []
+        self.pages = SimpleNamespace(create=self._create, update=self._update)
+        self.blocks = SimpleNamespace(children=SimpleNamespace(append=self._append))
+
+    def _create(self, parent, properties, children):
+        return {"id": "page-1", "url": "https://notion.so/page-1"}
+
+    def _update(self, page_id, archived):
+        self.archived.append(page_id)
+
+    def _append(self, block_id, children):
+        if self.fail_append:
+            raise ValueError("validation_error")
+        self.appended.append(children)
+
+
+def write(page):
+    page.add_markdown("# 제목\n")
+    page.add_markdown("## 주요 트렌드\n- 첫 번째\n")
+    page.add_markdown("## 마무리\n본문\n")
+
+
+def test_finish_returns_url_after_appending_sections():
+    notion = FakeNotion()
+    page = NotionStreamPage(notion, "db", "제목")
+    write(page)
+    assert page.finish() == "https://notion.so/page-1"
+    assert len(notion.appended) == 2
+    assert notion.archived == []
+
+
+def test_finish_archives_partial_page_when_append_fails():
+    notion = FakeNotion(fail_append=True)
+    page = NotionStreamPage(notion, "db", "제목")
+    write(page)
+    assert page.finish() is None
+    assert notion.archived == ["page-1"]
@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import pytest
+
+import notion_upload
+from notion_upload import MAX_CHILDREN, MAX_RICH_TEXT_ITEMS, MAX_TEXT, normalize_blocks, upload_page
+from service_guard import ServiceGuard
+
+
+class BadGateway(Exception):
+    status = 502
+
+
+class RateLimited(Exception):
+    status = 429
+    headers = {"retry-after": "0"}
+
+
+class FakeNotion:
+    """pages.create/update, blocks.children.append 호출을 기록하고 지정한 호출에서 오류를 내는 Notion 클라이언트"""
+
+    def __init__(self, fail_append=(), fail_create=()):
+        self.fail_append = list(fail_append)
+        self.fail_create = list(fail_create)
+        self.created = []
+        self.appended = []
+        self.archived = []
+        self.pages = SimpleNamespace(create=self._create, update=self._update)
+        self.blocks = SimpleNamespace(children=SimpleNamespace(append=self._append))
+
+    def _create(self, parent, properties, children):
+        if self.fail_create:
+            raise self.fail_create.pop(0)
+        self.created.append(children)
+        return {"id": f"page-{len(self.created)}", "url": f"https://notion.so/page-{len(self.created)}"}
+
+    def _update(self, page_id, archived):
+        self.archived.append(page_id)
+
+    def _append(self, block_id, children):
+        if self.fail_append:
+            raise self.fail_append.pop(0)
+        self.appended.append(children)
+
+
+@pytest.fixture(autouse=True)
+def guard(monkeypatch):
+    # 프로세스 공용 가드 대신 대기 없는 가드를 씀
+    guard = ServiceGuard("notion", initial=2, max_limit=3, throttle=(429,), retry=(409, 500, 502, 503, 504),
+                         base_delay=0)
+    monkeypatch.setattr(notion_upload, "get_guard", lambda name: guard)
+    return guard
+
+
+def paragraph(text):
+    return {"type": "paragraph", "paragraph": {"rich_text": [{"type": "text", "text": {"content": text}}]}}
+
+
+def test_normalize_splits_long_text_and_rich_text_items():
+    long_block = paragraph("가" * (MAX_TEXT * 2 + 1))
+    assert [len(item["text"]["content"]) for item in normalize_blocks([long_block])[0]["paragraph"]["rich_text"]] \
+        == [MAX_TEXT, MAX_TEXT, 1]
+    many = {"type": "paragraph", "paragraph": {"rich_text": paragraph("x")["paragraph"]["rich_text"] * 150}}
+    assert [len(b["paragraph"]["rich_text"]) for b in normalize_blocks([many])] == [MAX_RICH_TEXT_ITEMS, 50]
+
+
+def test_upload_creates_page_with_first_chunk_and_appends_rest():
+    notion = FakeNotion()
+    url = upload_page(notion, "db", "제목", [paragraph(str(i)) for i in range(MAX_CHILDREN * 2 + 5)])
+    assert url == "https://notion.so/page-1"
+    assert [len(c) for c in notion.created] == [MAX_CHILDREN]
+    assert [len(c) for c in notion.appended] == [MAX_CHILDREN, 5]
+
+
+def test_upload_empty_document_still_creates_page():
+    notion = FakeNotion()
+    assert upload_page(notion, "db", "제목", []) == "https://notion.so/page-1"
+    assert notion.created == [[]]
+
+
+def test_failed_append_archives_partial_page():
+    notion = FakeNotion(fail_append=[BadGateway()])
+    with pytest.raises(RuntimeError, match="2/2"):
+        upload_page(notion, "db", "제목", [paragraph(str(i)) for i in range(MAX_CHILDREN + 1)])
+    assert notion.appended == []  # 이미 적용됐을 수 있으므로 다시 보내지 않음
+    assert notion.archived == ["page-1"]
+
+
+def test_create_is_not_retried_on_timeout():
+    notion = FakeNotion(fail_create=[TimeoutError("read timed out")])
+    with pytest.raises(TimeoutError):
+        upload_page(notion, "db", "제목", [paragraph("본문")])
+    assert notion.created == []
+    assert notion.archived == []
+
+
+def test_non_idempotent_calls_retry_only_when_not_applied():
+    notion = FakeNotion(fail_create=[RateLimited(), ConnectionRefusedError()])
+    assert upload_page(notion, "db", "제목", [paragraph("본문")]) == "https://notion.so/page-1"
+    assert len(notion.created) == 1
+
+
+def test_idempotent_calls_still_retry_transient_failures(guard):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            raise BadGateway()
+        return "ok"
+
+    assert notion_upload.call_with_retry(flaky, backoff=0) == "ok"
+    assert len(calls) == 2
@@ -0,0 +1,182 @@
+import email
+import email.policy
+import functools
+import json
+
+import pytest
+
+import openai_batch
+import report_flow
+from checkpoint import RunCheckpoint
+from link_refs import LinkRefs
+from llm_cache import ResponseCache
+from md_doc import parse_markdown
+from run_metrics import RunMetrics
+
+REPORT = "# 주간 AI 트렌드 분석 보고서\n## 주요 트렌드\n- 내용"
+
+
+class FakePolicy:
+    attempt_timeout = 1
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def run(self, client, request, metrics=None):
+        self.calls += 1
+        return (self.text, "primary") if self.text else (None, None)
+
+
+@pytest.fixture
+def make_flow(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_flow, "RunCheckpoint",
+                        functools.partial(RunCheckpoint, path=str(tmp_path / "checkpoints.sqlite3")))
+
+    def make(text=REPORT, batch=False):
+        sent = []
+        flow = report_flow.ReportFlow(
+            "weekly", RunMetrics("weekly"), ResponseCache(str(tmp_path / "llm")), FakePolicy(text),
+            build_request=lambda articles, digests: ({"model": "m", "input": repr(articles)}, LinkRefs()),
+            fetch_articles=lambda: [{"title": "기사", "link": "https://example.com/a"}],
+            send_report=lambda title, doc, url, checkpoint: sent.append((title, url)),
+            footer=report_flow.report_footer("1주일"),
+            database_id="db",
+            period="최근 7일",
+            batch=batch,
+        )
+        flow.get_openai = lambda: None
+        flow.dedupe = lambda articles: articles
+        flow.create_notion_page = lambda title, doc: "https://notion.so/page"
+        flow.sent = sent
+        return flow
+
+    return make
+
+
+def submit_pending_batch(period="주간 보고서 (2026-10-01)"):
+    pending = report_flow.RunCheckpoint("weekly:batch")
+    pending.set("page_title", period)
+    pending.close()
+    checkpoint = report_flow.RunCheckpoint(f"weekly:{period}")
+    checkpoint.set("batch", json.dumps({"id": "batch_1", "custom_id": "weekly-1", "urls": []}))
+    checkpoint.close()
+    return period
+
+
+def waiting_period():
+    pending = report_flow.RunCheckpoint("weekly:batch")
+    try:
+        return pending.get("page_title")
+    finally:
+        pending.close()
+
+
+def expired(client, batch_id, custom_id):
+    raise RuntimeError(f"batch {batch_id} 상태: expired")
+
+
+def test_failed_batch_falls_back_to_synchronous_generation(make_flow, monkeypatch):
+    monkeypatch.setattr(openai_batch, "collect", expired)
+    period = submit_pending_batch()
+    flow = make_flow(batch=True)
+
+    flow.run("주간 보고서 (2026-10-08)")
+
+    assert flow.policy.calls == 1
+    assert flow.sent == [(period, "https://notion.so/page")]
+    assert waiting_period() is None
+
+
+def test_failed_batch_submit_falls_back_to_synchronous_generation(make_flow, monkeypatch):
+    def unavailable(client, request, custom_id):
+        raise RuntimeError("503 Service Unavailable")
+
+    monkeypatch.setattr(openai_batch, "submit", unavailable)
+    flow = make_flow(batch=True)
+
+    flow.run("주간 보고서 (2026-10-08)")
+
+    assert flow.policy.calls == 1
+    assert flow.sent == [("주간 보고서 (2026-10-08)", "https://notion.so/page")]
+    assert waiting_period() is None
+
+
+def test_empty_batch_response_falls_back(make_flow, monkeypatch):
+    monkeypatch.setattr(openai_batch, "collect", lambda client, batch_id, custom_id: ("completed", {"output": []}))
+    period = submit_pending_batch()
+    flow = make_flow(batch=True)
+
+    flow.run("주간 보고서 (2026-10-08)")
+
+    assert flow.sent == [(period, "https://notion.so/page")]
+
+
+def test_failed_fallback_keeps_period_and_fails(make_flow, monkeypatch):
+    monkeypatch.setattr(openai_batch, "collect", expired)
+    period = submit_pending_batch()
+    flow = make_flow(text=None, batch=True)
+
+    with pytest.raises(RuntimeError):
+        flow.run("주간 보고서 (2026-10-08)")
+
+    assert flow.sent == []
+    assert waiting_period() == period
+
+
+def test_pending_batch_waits_for_next_run(make_flow, monkeypatch):
+    monkeypatch.setattr(openai_batch, "collect", lambda client, batch_id, custom_id: ("in_progress", None))
+    period = submit_pending_batch()
+    flow = make_flow(batch=True)
+
+    flow.run("주간 보고서 (2026-10-08)")
+
+    assert flow.policy.calls == 0
+    assert flow.sent == []
+    assert waiting_period() == period
+
+
+def test_run_without_batch_generates_and_sends(make_flow):
+    flow = make_flow()
+
+    flow.run("주간 보고서 (2026-10-08)")
+
+    assert flow.sent == [("주간 보고서 (2026-10-08)", "https://notion.so/page")]
+
+
+class FakePool:
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+
+    def send(self, raw, from_addr, to_addrs):
+        self.sent.append((to_addrs[0], raw))
+
+    def close(self):
+        self.closed = True
+
+
+def test_subscriber_delivery_skips_delivered_and_invalid_recipients(tmp_path):
+    delivery = report_flow.SubscriberDelivery(
+        RunMetrics("weekly"), ["안녕하세요,", "주간 보고서입니다."], subject="[주간] {title}",
+        sender="sender@example.com", per_second=1000,
+    )
+    pool = delivery.smtp_pool = FakePool()
+    subscribers = [{"email": "a@example.com", "token": "ta"}, {"email": "b@example.com", "token": "tb"},
+                   {"email": "c@example.com", "token": None}]
+    delivery.subscribers = lambda: iter(subscribers)
+    checkpoint = RunCheckpoint("weekly:주간 보고서", path=str(tmp_path / "checkpoints.sqlite3"))
+    checkpoint.mark_sent("a@example.com")
+    try:
+        delivery("주간 보고서", parse_markdown(REPORT), "https://notion.so/page", checkpoint)
+        assert checkpoint.delivered() == {"a@example.com", "b@example.com"}
+    finally:
+        checkpoint.close()
+
+    assert [to for to, _ in pool.sent] == ["b@example.com"]
+    message = email.message_from_bytes(pool.sent[0][1], policy=email.policy.default)
+    assert message["Subject"] == "[주간] 주간 보고서"
+    assert "token=tb" in message["List-Unsubscribe"]
+    assert "주간 보고서입니다." in message.get_body(("plain",)).get_content()
+    assert pool.closed
+    assert delivery.metrics.record()["counters"]["email.sent"] == 1
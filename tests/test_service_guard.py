@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from mailer import DeliveryScheduler
+from service_guard import AIMDLimiter, CircuitBreaker, CircuitOpenError, ServiceGuard
+
+
+class Unavailable(Exception):
+    status = 503
+
+
+def test_breaker_opens_after_threshold_and_probes_once():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.before()
+    breaker.on_failure()
+    assert breaker.state == "closed"
+    breaker.on_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+    assert 0 < breaker.remaining() <= 0.05
+
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    assert breaker.remaining() == 0
+    breaker.before()  # 시험 요청 하나만 통과
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+    breaker.on_success()
+    assert breaker.state == "closed"
+    breaker.before()
+
+
+def test_breaker_reopens_when_probe_fails():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.on_failure()
+    time.sleep(0.06)
+    breaker.before()
+    breaker.on_failure()
+    assert breaker.state == "open"
+
+
+def test_neutral_errors_do_not_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.before()
+    breaker.on_neutral()
+    assert breaker.state == "closed"
+
+
+def test_limiter_grows_additively_when_saturated():
+    limiter = AIMDLimiter(2, max_limit=4)
+    limiter.on_success()
+    assert limiter.limit == 2  # 한도를 다 쓰지 않으면 늘리지 않음
+    limiter.acquire()
+    limiter.acquire()
+    limiter.on_success()
+    assert limiter.limit == pytest.approx(2.5)
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.limit == 4
+
+
+def test_limiter_backs_off_once_per_cooldown():
+    limiter = AIMDLimiter(8, max_limit=8, cooldown=60)
+    limiter.on_overload()
+    limiter.on_overload()
+    assert limiter.limit == 4
+    limiter._decreased -= 60
+    limiter.on_overload()
+    assert limiter.limit == 2
+    for _ in range(5):
+        limiter._decreased -= 60
+        limiter.on_overload()
+    assert limiter.limit == 1
+
+
+def test_limiter_blocks_beyond_limit():
+    limiter = AIMDLimiter(1)
+    limiter.acquire()
+    acquired = threading.Event()
+    t = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()), daemon=True)
+    t.start()
+    assert not acquired.wait(0.05)
+    limiter.release()
+    assert acquired.wait(1)
+
+
+def test_guard_retries_transient_failures():
+    guard = ServiceGuard("test", retries=2, base_delay=0)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise Unavailable()
+        return "ok"
+
+    assert guard.call(flaky) == "ok"
+    assert guard.stats["retried"] == 2
+
+
+def test_scheduler_waits_for_half_open_instead_of_deferring():
+    guard = ServiceGuard("smtp-test", retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.2))
+    sent = []
+
+    def send(email):
+        if not sent and email == "a@example.com":
+            sent.append(None)
+            raise Unavailable()
+        sent.append(email)
+
+    scheduler = DeliveryScheduler(send, workers=1, per_second=1000, max_retries=1, backoff=0, guard=guard)
+    report = scheduler.run(["a@example.com", "b@example.com", "c@example.com"])
+    assert report.count("sent") == 3
+    assert report.count("deferred") == 0
+    assert report.elapsed >= 0.2
+
+
+def test_scheduler_gives_up_after_bounded_breaker_wait():
+    guard = ServiceGuard("smtp-test", retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.1))
+
+    def send(email):
+        raise Unavailable()
+
+    scheduler = DeliveryScheduler(send, workers=2, per_second=1000, max_retries=5, backoff=0, guard=guard,
+                                  max_breaker_wait=0.3)
+    report = scheduler.run([f"{i}@example.com" for i in range(4)])
+    assert report.count("failed") == 4
+    assert report.count("sent") == 0
+    assert report.elapsed < 5
@@ -0,0 +1,36 @@
+import pytest
+
+from link_refs import LinkRefs
+from topics import build_digest, count_companies
+
+
+def test_korean_aliases_do_not_match_inside_longer_words():
+    titles = ["애플리케이션 보안 강화", "비즈니스 인텔리전스 시장 확대", "메타버스 플랫폼 재편", "AI 에이전트 메타데이터 관리"]
+    assert count_companies(titles) == []
+
+
+def test_korean_aliases_match_with_particles():
+    titles = ["메타가 라마 4 공개", "애플의 AI 전략", "구글은 제미나이를 확대", "삼성전자, HBM 공급", "엔비디아·인텔 협력"]
+    assert dict(count_companies(titles)) == {
+        "Meta": 1, "Apple": 1, "Google": 1, "Samsung": 1, "NVIDIA": 1, "Intel": 1,
+    }
+
+
+def test_english_aliases_respect_word_boundaries():
+    assert count_companies(["Metadata tools", "Pineapple AI", "Meta and OpenAI sign deal"]) == [("Meta", 1), ("OpenAI", 1)]
+
+
+def test_counts_are_per_article_and_weighted():
+    titles = ["OpenAI ChatGPT update", "오픈AI, 새 모델"]
+    assert count_companies(titles) == [("OpenAI", 2)]
+    assert count_companies(titles, weights=[3, 1]) == [("OpenAI", 4)]
+
+
+def test_build_digest_groups_articles():
+    pytest.importorskip("numpy")
+    articles = [{"title": f"OpenAI GPT model launch {i}", "link": f"https://example.com/o{i}", "dup_count": 1}
+                for i in range(4)]
+    articles += [{"title": f"엔비디아 GPU 공급 확대 {i}", "link": f"https://example.com/n{i}", "dup_count": 1}
+                 for i in range(4)]
+    digest = build_digest(articles, LinkRefs())
+    assert digest and "OpenAI" in digest and "NVIDIA" in digest
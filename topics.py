@@ -0,0 +1,231 @@
+import math
+import re
+import zlib
+
+# 해시 n-gram 특징 공간 크기
+_DIM = 1 << 16
+_WORD = re.compile(r"[a-z0-9][a-z0-9+.\-]*[a-z0-9+]|[가-힣]+")
+_STOPWORDS = {
+    "the", "a", "an", "of", "to", "in", "for", "and", "on", "with", "is", "its", "at", "by", "from", "as",
+    "new", "how", "why", "what", "it", "be", "are", "will", "this", "that", "after", "over", "into", "you",
+    "있다", "위해", "위한", "대한", "통해", "관련", "발표", "공개", "출시", "기자", "속보", "단독",
+}
+
+# build_digest 결과를 프롬프트에 넣을 때 쓰는 목록 설명
+DIGEST_LABEL = ("토픽별 기사 목록 ([토픽 n]은 비슷한 기사 묶음과 전체 기사 수이며 각 토픽에는 대표 기사만 표시, "
+                "\"유사 기사 N건\"은 같은 소식을 다룬 기사 수)")
+
+# 기업별 언급 수 집계용 별칭 (소문자 기준)
+COMPANIES = {
+    "OpenAI": ("openai", "오픈ai", "오픈에이아이", "chatgpt", "챗gpt"),
+    "Google": ("google", "구글", "alphabet", "알파벳", "deepmind", "딥마인드", "gemini", "제미나이"),
+    "Microsoft": ("microsoft", "마이크로소프트", "copilot", "코파일럿"),
+    "Meta": ("meta", "메타", "llama"),
+    "Apple": ("apple", "애플"),
+    "Amazon": ("amazon", "아마존", "aws"),
+    "NVIDIA": ("nvidia", "엔비디아"),
+    "Anthropic": ("anthropic", "앤트로픽", "claude", "클로드"),
+    "xAI": ("xai", "grok", "그록"),
+    "Tesla": ("tesla", "테슬라"),
+    "Intel": ("intel", "인텔"),
+    "AMD": ("amd",),
+    "TSMC": ("tsmc",),
+    "DeepSeek": ("deepseek", "딥시크"),
+    "Alibaba": ("alibaba", "알리바바", "qwen", "큐웬"),
+    "Mistral": ("mistral", "미스트랄"),
+    "Samsung": ("samsung", "삼성", "삼성전자"),
+    "SK": ("sk하이닉스", "sk텔레콤", "skt", "hynix", "하이닉스"),
+    "LG": ("lg", "lg전자", "lg유플러스"),
+    "Naver": ("naver", "네이버", "네이버클라우드"),
+    "Kakao": ("kakao", "카카오", "카카오브레인"),
+}
+_ALIAS = {alias: name for name, aliases in COMPANIES.items() for alias in aliases}
+# 별칭 뒤에 붙는 조사 (애플의, 메타가) — 조사가 아닌 한글이 이어지면 다른 단어(애플리케이션, 메타버스)로 봄
+_JOSA = "은|는|이|가|을|를|의|와|과|도|에|에서|에게|로|으로|만|까지|부터|보다|처럼|이나|나"
+_COMPANY = re.compile(
+    r"(?<![a-z0-9가-힣])(" + "|".join(sorted(map(re.escape, _ALIAS), key=len, reverse=True)) + r")"
+    r"(?=(?:" + _JOSA + r")?(?![a-z0-9가-힣]))"
+)
+
+
+def _numpy():
+    # 수치 연산 라이브러리는 토픽 묶기를 실제로 할 때만 로드 (기사가 없는 날의 시작 시간 유지)
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _features(title: str, names: dict):
+    """영어는 단어, 한국어는 단어 + 글자 bigram (띄어쓰기/조사 차이를 흡수)"""
+    out = []
+    for word in _WORD.findall(title.lower()):
+        if word in _STOPWORDS:
+            continue
+        h = zlib.crc32(word.encode("utf-8")) % _DIM
+        names.setdefault(h, word)
+        out.append(h)
+        if "가" <= word[0] <= "힣" and len(word) > 2:
+            out.extend(zlib.crc32(word[i:i + 2].encode("utf-8")) % _DIM for i in range(len(word) - 1))
+    return out
+
+
+def _tfidf(np, titles, names):
+    """해시 n-gram TF-IDF 희소 행렬을 (rows, cols, vals) 좌표 형식으로 만들어 행마다 L2 정규화"""
+    rows, cols = [], []
+    for i, title in enumerate(titles):
+        feats = _features(title, names)
+        rows.extend([i] * len(feats))
+        cols.extend(feats)
+    n = len(titles)
+    if not cols:
+        return None
+    keys, tf = np.unique(np.asarray(rows, dtype=np.int64) * _DIM + np.asarray(cols, dtype=np.int64),
+                         return_counts=True)
+    rows, cols = keys // _DIM, keys % _DIM
+    df = np.bincount(cols, minlength=_DIM)
+    # 한 기사에만 나오는 특징은 묶는 데 도움이 안 되고, 절반 넘게 나오는 특징은 구분력이 없음
+    keep = (df[cols] >= 2) & (df[cols] <= max(2, n // 2))
+    rows, cols, tf = rows[keep], cols[keep], tf[keep]
+    vals = (1 + np.log(tf)) * (np.log((1 + n) / (1 + df[cols])) + 1)
+    norms = np.sqrt(np.bincount(rows, weights=vals * vals, minlength=n))
+    vals = vals / norms[rows]
+    return rows, cols, vals
+
+
+def _similarity(np, rows, cols, vals, centroids, n):
+    """희소 X(n x DIM)와 중심 C(k x DIM)의 코사인 유사도 n x k (중심마다 bincount 한 번)"""
+    return np.stack([np.bincount(rows, weights=vals * c[cols], minlength=n) for c in centroids], axis=1)
+
+
+def _centroids(np, rows, cols, vals, labels, k):
+    sums = np.bincount(labels[rows] * _DIM + cols, weights=vals, minlength=k * _DIM).reshape(k, _DIM)
+    norms = np.linalg.norm(sums, axis=1, keepdims=True)
+    return np.divide(sums, norms, out=np.zeros_like(sums), where=norms > 0)
+
+
+def _merge_similar(np, centroids, threshold):
+    """중심끼리 코사인 유사도가 threshold 이상인 토픽을 하나로 합치는 번호 매핑"""
+    k = len(centroids)
+    parent = list(range(k))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.triu(centroids @ centroids.T, 1) >= threshold)):
+        parent[find(j)] = find(i)
+    return np.array([find(i) for i in range(k)])
+
+
+def cluster_titles(titles, k: int = None, iterations: int = 12, seed: int = 0, merge_threshold: float = 0.5):
+    """제목을 spherical k-means로 묶어 (labels, scores, 토픽별 대표 단어 목록)을 반환.
+
+    labels[i]는 토픽 번호(특징이 없는 제목은 -1), scores[i]는 토픽 중심과의 코사인 유사도.
+    k를 넉넉히 잡은 뒤 중심이 merge_threshold 이상 비슷한 토픽은 합칩니다.
+    NumPy가 없으면 None을 반환합니다.
+    """
+    np = _numpy()
+    if np is None or not titles:
+        return None
+    names = {}
+    matrix = _tfidf(np, titles, names)
+    n = len(titles)
+    if matrix is None:
+        return [-1] * n, [0.0] * n, []
+    rows, cols, vals = matrix
+    has_features = np.bincount(rows, minlength=n) > 0
+    candidates = np.flatnonzero(has_features)
+    if k is None:
+        k = int(min(40, max(2, round(math.sqrt(len(candidates) / 2)))))
+    k = min(k, len(candidates))
+    if k == 0:
+        return [-1] * n, [0.0] * n, []
+
+    rng = np.random.default_rng(seed)
+    seeds = rng.choice(candidates, size=k, replace=False)
+    centroids = np.zeros((k, _DIM))
+    for j, i in enumerate(seeds):
+        mask = rows == i
+        centroids[j, cols[mask]] = vals[mask]
+
+    labels = None
+    for _ in range(iterations):
+        sims = _similarity(np, rows, cols, vals, centroids, n)
+        new_labels = sims.argmax(axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        centroids = _centroids(np, rows, cols, vals, labels, k)
+
+    mapping = _merge_similar(np, centroids, merge_threshold)
+    if (mapping != np.arange(k)).any():
+        labels = mapping[labels]
+        centroids = _centroids(np, rows, cols, vals, labels, k)
+        sims = _similarity(np, rows, cols, vals, centroids, n)
+    scores = sims[np.arange(n), labels]
+    labels = np.where(has_features, labels, -1)
+    terms = []
+    for c in centroids:
+        top = [names[h] for h in np.argsort(c)[::-1][:12] if c[h] > 0 and h in names]
+        terms.append(top[:3])
+    return labels.tolist(), scores.tolist(), terms
+
+
+def count_companies(titles, weights=None):
+    """기업별로 언급된 기사 수를 많은 순으로 [(기업, 기사 수), ...] 반환 (기사 하나에서 여러 번 나와도 1회).
+
+    weights를 넘기면 기사마다 그 값(예: 중복 묶음 수)만큼 셉니다.
+    """
+    counts = {}
+    for i, title in enumerate(titles):
+        for name in {_ALIAS[m] for m in _COMPANY.findall(title.lower())}:
+            counts[name] = counts.get(name, 0) + (weights[i] if weights else 1)
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def build_digest(articles, refs, max_topics: int = 20, per_topic: int = 6):
+    """기사를 토픽별로 묶은 프롬프트용 요약 목록. NumPy가 없으면 None (평면 목록을 그대로 사용).
+
+    토픽은 기사 수(중복 묶음 포함) 순으로 나열하고, 각 토픽에는 대표 기사 per_topic개만
+    refs.article_line 형식으로 넣습니다. 묶이지 않은 기사는 '기타'로 모읍니다.
+    """
+    titles = [a["title"] for a in articles]
+    result = cluster_titles(titles)
+    if result is None:
+        return None
+    labels, scores, terms = result
+
+    groups = {}
+    central = {}
+    for article, label, score in zip(articles, labels, scores):
+        groups.setdefault(label, []).append(article)
+        central[id(article)] = score
+    weight = lambda group: sum(a.get("dup_count", 1) for a in group)  # noqa: E731
+    topics = sorted(
+        ((label, group) for label, group in groups.items() if label >= 0 and len(group) >= 2),
+        key=lambda item: -weight(item[1]),
+    )
+    rest = [a for label, group in groups.items() if label < 0 or len(group) < 2 for a in group]
+    rest += [a for _, group in topics[max_topics:] for a in group]
+    topics = topics[:max_topics]
+
+    lines = []
+    companies = count_companies(titles, [a.get("dup_count", 1) for a in articles])
+    if companies:
+        lines.append("기업별 언급 기사 수: " + ", ".join(f"{name} {count}" for name, count in companies))
+        lines.append("")
+    for index, (label, group) in enumerate(topics, 1):
+        name = " · ".join(terms[label]) or "기타"
+        lines.append(f"[토픽 {index}] {name} (기사 {weight(group)}건)")
+        # 토픽 중심에 가깝고 여러 매체가 다룬 기사를 대표로
+        group = sorted(group, key=lambda a: -central[id(a)] * (1 + math.log(a.get("dup_count", 1))))
+        lines.extend(refs.article_line(a) for a in group[:per_topic])
+    if rest:
+        rest = sorted(rest, key=lambda a: -a.get("dup_count", 1))
+        lines.append(f"[기타] (기사 {weight(rest)}건)")
+        lines.extend(refs.article_line(a) for a in rest[:per_topic * 2])
+    return "\n".join(lines)